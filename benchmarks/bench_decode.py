@@ -0,0 +1,67 @@
+"""
+比较动作响应的解码路径（解析 + 写入 Combatant）：
+- legacy: json.loads 整个响应后按字符串键逐层取值（原 response.json() + update_status）
+- json / orjson / msgspec: decoder.decode_action_response 的各个后端
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_decode --iterations 20000
+"""
+import argparse
+import json
+import time
+
+from benchmarks.payloads import action_response
+from src.model.gigaverse.decoder import DECODERS, decode_action_response
+from src.model.gigaverse.state import Combatant
+
+
+def legacy_decode(content: bytes, player: Combatant, enemy: Combatant):
+    result = json.loads(content)
+    players = result["data"]["run"]["players"]
+    player.update(players[0])
+    enemy.update(players[1])
+    return (
+        str(result.get("actionToken", "")),
+        result["data"]["run"].get("lootOptions", []),
+        players[1].get("lastMove", "未知"),
+        result.get("message"),
+    )
+
+
+def typed_decode(backend: str):
+    def run(content: bytes, player: Combatant, enemy: Combatant):
+        result = decode_action_response(content, backend)
+        player.set(*result.player)
+        enemy.set(*result.enemy)
+        return result
+
+    return run
+
+
+def bench(fn, bodies: list[bytes], iterations: int) -> float:
+    player, enemy = Combatant(), Combatant()
+    for body in bodies:
+        fn(body, player, enemy)
+    started = time.perf_counter()
+    for i in range(iterations):
+        fn(bodies[i % len(bodies)], player, enemy)
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    bodies = [json.dumps(action_response(seed, loot=seed % 4 == 0)).encode() for seed in range(64)]
+    print(f"payload size: {sum(map(len, bodies)) // len(bodies)} bytes")
+
+    baseline = bench(legacy_decode, bodies, args.iterations)
+    print(f"{'legacy':8s} {baseline:7.2f} us/response")
+    for backend in DECODERS:
+        elapsed = bench(typed_decode(backend), bodies, args.iterations)
+        print(f"{backend:8s} {elapsed:7.2f} us/response  ({baseline / elapsed:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+端到端吞吐量基准：启动本地替身服务器（benchmarks/dungeon_server.py），
+用 N 个模拟账户通过 process.run_account_loops 运行 GameClient，
+输出 runs/s、turns/s 以及动作请求延迟的 p50/p99。
+
+替身服务器的战斗规则与求解器依据同一份规则说明，胜率、推测命中率等战斗结果
+只反映与规则说明的一致性，不代表真实服务器上的效果（见 dungeon_server 的说明）。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_e2e --accounts 200 --duration 30 --latency-ms 20 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+import process
+from benchmarks.dungeon_server import LIMITATION_NOTE
+from src.utils.config import get_config
+from src.utils.constants import Account
+from src.utils.log import setup_logging
+from src.utils.metrics import REGISTRY, Histogram
+from src.utils.transport import get_transport_pool
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for_server(url: str, timeout: float = 15):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"Stand-in server did not start: {url}")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+
+def configure(args, base_url: str):
+    """将配置指向替身服务器并关闭与压测无关的等待"""
+    config = get_config()
+    config.TASK = "AI Giga"
+    config.SETTINGS.THREADS = args.workers or args.accounts
+    config.SETTINGS.RANDOM_INITIALIZATION_PAUSE = (0, 0)
+    config.SETTINGS.RANDOM_PAUSE_BETWEEN_ACTIONS = (0, 0)
+    config.SCHEDULER.SLEEP_AFTER_RUN = (0, 0)
+    # 模拟账户不能被 data/accounts.csv 中的 token 覆盖，也不能把状态写入真实的账户存储
+    config.ACCOUNTS.WATCH = False
+    config.ACCOUNTS.STORE_FILE = ""
+    config.NETWORK.GAME_API_URL = f"{base_url}/api/game/dungeon/action"
+    config.DEEPSEEK.API_URL = f"{base_url}/v1/chat/completions"
+    config.DEEPSEEK.PROXY_FOR_DEEPSEEK = ""
+    config.DEEPSEEK.REQUESTS_PER_SECOND = 0
+    config.DECISION.LLM_PROVIDER = "deepseek"
+    config.DECISION.USE_LLM_FOR_MOVES = False
+    config.DECISION_CACHE.SNAPSHOT_FILE = ""
+    config.LOGGING.LEVEL = args.log_level
+    config.METRICS.PORT = args.metrics_port
+    if args.record:
+        config.RECORDER.ENABLED = True
+        config.RECORDER.DIRECTORY = args.record
+    if args.action_delay is not None:
+        config.PACING.BASELINE_DELAY = args.action_delay
+        config.PACING.MIN_DELAY = min(config.PACING.MIN_DELAY, args.action_delay)
+    return config
+
+
+def instrument_transport(latencies: list[float]):
+    """在共享的游戏API客户端上挂载事件钩子，记录每个动作请求从发出到收到响应头的时间"""
+    client = get_transport_pool().get("")
+
+    async def on_request(request: httpx.Request):
+        request.extensions["bench_started"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response):
+        started = response.request.extensions.get("bench_started")
+        if started is not None:
+            latencies.append(time.perf_counter() - started)
+
+    client.event_hooks["request"].append(on_request)
+    client.event_hooks["response"].append(on_response)
+
+
+async def run_benchmark(args):
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen([
+        sys.executable, "-m", "benchmarks.dungeon_server",
+        "--port", str(port),
+        "--seed", str(args.seed),
+        "--latency-ms", str(args.latency_ms),
+        "--jitter-ms", str(args.jitter_ms),
+        "--error-rate", str(args.error_rate),
+        "--throttle-rate", str(args.throttle_rate),
+        "--llm-latency-ms", str(args.llm_latency_ms),
+    ])
+    try:
+        await _wait_for_server(f"{base_url}/stats")
+        config = configure(args, base_url)
+        setup_logging(config)
+
+        latencies: list[float] = []
+        instrument_transport(latencies)
+        accounts = [Account(index, f"bench-token-{index}", "") for index in range(1, args.accounts + 1)]
+        scheduler = process.AccountScheduler.from_config(accounts, config)
+
+        started = time.perf_counter()
+        task = asyncio.create_task(process.run_account_loops(accounts, config, scheduler))
+        await asyncio.sleep(args.duration)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+
+        async with httpx.AsyncClient() as client:
+            server_stats = (await client.get(f"{base_url}/stats")).json()
+        await process.shutdown()
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    print(f"\naccounts={args.accounts} workers={config.SETTINGS.THREADS} duration={elapsed:.1f}s "
+          f"latency={args.latency_ms}±{args.jitter_ms}ms error_rate={args.error_rate} throttle_rate={args.throttle_rate}")
+    print(f"runs completed : {scheduler.completed} ({scheduler.completed / elapsed:.2f} runs/s), failed: {scheduler.failed}")
+    print(f"turns          : {server_stats['turns']} ({server_stats['turns'] / elapsed:.2f} turns/s)")
+    print(f"actions        : {len(latencies)} ({len(latencies) / elapsed:.2f} req/s)")
+    print(f"action latency : p50={_percentile(latencies, 50) * 1000:.2f} ms  p99={_percentile(latencies, 99) * 1000:.2f} ms")
+    print(f"server         : {server_stats}")
+    print(LIMITATION_NOTE)
+    print("phases (bucket upper bounds):")
+    for metric in REGISTRY.metrics:
+        if isinstance(metric, Histogram):
+            for labels, values in metric.snapshot().items():
+                print(f"  {metric.name}[{labels}]: n={values['count']} avg={values['avg'] * 1000:.3f} ms "
+                      f"p50<={values['p50'] * 1000:g} ms p99<={values['p99'] * 1000:g} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end GameClient throughput against the local stand-in server")
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=0, help="concurrent accounts (default: all)")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=20)
+    parser.add_argument("--jitter-ms", type=float, default=5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=50)
+    parser.add_argument("--action-delay", type=float, default=None,
+                        help="override PACING.BASELINE_DELAY (seconds between actions per account)")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--record", default="", help="record every action/response into this directory")
+    parser.add_argument("--metrics-port", type=int, default=0, help="serve /metrics on this port during the run")
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+离线策略评估器的吞吐量：用随机生成的回合/房间状态代替录制数据，
+测量 evaluate_turns（每个策略）和房间模拟的耗时。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_evaluator --turns 2000000 --rooms 100000 --rollouts 8
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.model.gigaverse.evaluator import (
+    LOOT_POLICIES, MOVE_POLICIES, STATE_COLUMNS, History, Sides, evaluate_loot, evaluate_turns, simulate,
+)
+
+
+def random_sides(rng: np.random.Generator, n: int) -> np.ndarray:
+    data = np.empty((n, STATE_COLUMNS), dtype=np.int32)
+    data[:, 2] = rng.integers(8, 30, n)
+    data[:, 0] = rng.integers(1, data[:, 2] + 1)
+    data[:, 1] = rng.integers(0, 4, n)
+    data[:, 3:6] = rng.integers(0, 8, (n, 3))
+    data[:, 6:9] = rng.integers(0, 4, (n, 3))
+    data[:, 9:12] = rng.choice([-1, 1, 2, 3], (n, 3))
+    return data
+
+
+def random_history(rng: np.random.Generator, turns: int, rooms: int) -> History:
+    options = np.stack([
+        rng.integers(0, 6, (rooms, 3)), rng.integers(1, 5, (rooms, 3)),
+        rng.integers(0, 3, (rooms, 3)), rng.integers(0, 5, (rooms, 3)),
+    ], axis=2).astype(np.int32)
+    return History(
+        turn_player=random_sides(rng, turns),
+        turn_enemy=random_sides(rng, turns),
+        turn_move=rng.integers(0, 3, turns),
+        turn_reply=rng.integers(0, 3, turns),
+        turn_next_player=random_sides(rng, turns),
+        turn_next_enemy=random_sides(rng, turns),
+        turn_run=np.arange(turns) // 20,
+        room_player=random_sides(rng, rooms),
+        room_enemy=random_sides(rng, rooms),
+        room_run=np.arange(rooms) // 5,
+        room_number=np.arange(rooms) % 5 + 1,
+        room_won=rng.random(rooms) < 0.8,
+        loot_player=random_sides(rng, rooms),
+        loot_options=options,
+        loot_choice=rng.integers(0, 3, rooms),
+        loot_next_player=random_sides(rng, rooms),
+        loot_next_enemy=random_sides(rng, rooms),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=2_000_000)
+    parser.add_argument("--rooms", type=int, default=100_000)
+    parser.add_argument("--rollouts", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    history = random_history(rng, args.turns, args.rooms)
+    player, enemy = Sides(history.turn_player), Sides(history.turn_enemy)
+
+    for name in ("fallback", "greedy", "random"):
+        policy = MOVE_POLICIES[name]
+        started = time.perf_counter()
+        moves = policy(player, enemy, rng)
+        evaluate_turns(history, moves, "recorded")
+        evaluate_turns(history, moves, "uniform")
+        elapsed = time.perf_counter() - started
+        print(f"turns  {name:10s} {args.turns:>10,} turns  {elapsed:6.2f}s  ({args.turns / elapsed / 1e6:.2f} M turns/s)")
+
+    for name in ("fallback", "greedy"):
+        started = time.perf_counter()
+        simulate(Sides(history.room_player), Sides(history.room_enemy), MOVE_POLICIES[name], args.rollouts)
+        elapsed = time.perf_counter() - started
+        battles = args.rooms * args.rollouts
+        print(f"rooms  {name:10s} {battles:>10,} battles {elapsed:6.2f}s  ({battles / elapsed / 1e3:.0f} k battles/s)")
+
+    for name, policy in LOOT_POLICIES.items():
+        started = time.perf_counter()
+        evaluate_loot(history, policy, rollouts=args.rollouts)
+        print(f"loot   {name:10s} {args.rooms:>10,} choices {time.perf_counter() - started:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
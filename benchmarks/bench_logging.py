@@ -0,0 +1,72 @@
+"""
+比较每回合日志开销：
+- legacy: 标准库 logging 同步输出两条完整状态 f-string（原 fight_enemy 的写法）
+- events: EventLog.event（通过写出线程输出；级别/采样未通过时只记入环形缓冲区）
+
+输出目标为 os.devnull，只衡量调用方在事件循环中付出的时间。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_logging --turns 100000
+"""
+import argparse
+import logging
+import os
+import time
+
+from loguru import logger
+
+from benchmarks.payloads import action_response
+from src.model.gigaverse.state import Combatant
+from src.utils.log import INFO, EventLog, EventWriter
+
+
+def legacy_turn(log: logging.Logger, index: int, player: Combatant, enemy: Combatant):
+    log.info(f"{index} | 双方动作 - 我方: rock, 敌方: paper")
+    log.info(f"{index} | 当前状态 - 我方血量: {player.health}, 护盾: {player.shield}, "
+             f"出招: [{player.moves_text()}], 敌人血量: {enemy.health}, 护盾: {enemy.shield}, "
+             f"出招: [{enemy.moves_text()}]")
+
+
+def event_turn(events: EventLog, sample: float, player: Combatant, enemy: Combatant):
+    events.event(INFO, "turn", sample=sample, move="rock", enemy_move="paper",
+                 player=player.snapshot(), enemy=enemy.snapshot())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=100000)
+    args = parser.parse_args()
+
+    players = action_response(0)["data"]["run"]["players"]
+    player, enemy = Combatant(), Combatant()
+    player.update(players[0])
+    enemy.update(players[1])
+
+    devnull = open(os.devnull, "w")
+    std_logger = logging.getLogger("bench")
+    std_logger.addHandler(logging.StreamHandler(devnull))
+    std_logger.setLevel(logging.INFO)
+    std_logger.propagate = False
+
+    started = time.perf_counter()
+    for _ in range(args.turns):
+        legacy_turn(std_logger, 1, player, enemy)
+    print(f"{'legacy stdlib f-string':34s} {(time.perf_counter() - started) / args.turns * 1e6:7.2f} us/turn")
+
+    logger.remove()
+    logger.add(devnull, level="INFO", enqueue=True, format="{time} | {level} | {message}")
+    for sample in (1.0, 0.1, 0.0):
+        writer = EventWriter()
+        events = EventLog("1", writer, INFO, ring_size=100)
+        started = time.perf_counter()
+        for _ in range(args.turns):
+            event_turn(events, sample, player, enemy)
+        elapsed = (time.perf_counter() - started) / args.turns * 1e6
+        print(f"events (writer thread, sample={sample:<4}) {elapsed:8.2f} us/turn")
+        # 等待写出线程处理完积压，避免影响下一组测量
+        writer.close()
+    logger.complete()
+
+
+if __name__ == "__main__":
+    main()
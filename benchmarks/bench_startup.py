@@ -0,0 +1,112 @@
+"""
+无界面模式启动时间基准：在临时目录中生成模拟账户，重复运行
+python main.py --task "AI Giga" --dry-run（加载配置、账户、账户存储并创建调度器后退出），
+输出墙钟时间，并用 -X importtime 列出导入最慢的包。
+
+以下情况返回非零退出码，可用于防止启动时间回退：
+- 启动时间中位数超过 --max-seconds
+- 启动过程中导入了只在用到时才需要的重型模块（openai、aiohttp、rich、prompt_toolkit、curl_cffi、tabulate）
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_startup --runs 5 --accounts 1000 --max-seconds 1.0
+"""
+import argparse
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 无界面启动路径上不应出现的模块
+LAZY_MODULES = ("openai", "aiohttp", "rich", "prompt_toolkit", "curl_cffi", "tabulate")
+
+
+def _fake_token(index: int, expires_at: int) -> str:
+    def encode(data: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+    return f"{encode({'alg': 'HS256'})}.{encode({'address': f'0x{index:040x}', 'exp': expires_at})}.signature"
+
+
+def write_accounts(directory: str, count: int):
+    os.makedirs(os.path.join(directory, "data"), exist_ok=True)
+    expires_at = int(time.time()) + 86400
+    with open(os.path.join(directory, "data", "accounts.csv"), "w", encoding="utf-8") as file:
+        file.write("GIGA_TOKEN,PROXY\n")
+        for index in range(1, count + 1):
+            file.write(f"{_fake_token(index, expires_at)},user:pass@10.0.{index // 250}.{index % 250}:8080\n")
+
+
+def _command(config: str, importtime: bool = False) -> list[str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    return command + [os.path.join(ROOT, "main.py"), "--task", "AI Giga", "--dry-run", "--config", config]
+
+
+def time_startup(directory: str, config: str, runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(_command(config), cwd=directory, check=True, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def import_profile(directory: str, config: str) -> dict[str, int]:
+    """返回 {顶层包: 累计导入微秒}，包括间接导入的包"""
+    result = subprocess.run(_command(config, importtime=True), cwd=directory, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    packages = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        packages[package] = max(packages.get(package, 0), int(cumulative))
+    return packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless startup time of main.py --dry-run")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--config", default=os.path.join(ROOT, "config.yaml"))
+    parser.add_argument("--top", type=int, default=15, help="slowest packages to show")
+    parser.add_argument("--max-seconds", type=float, default=1.0, help="fail when the median startup is slower")
+    args = parser.parse_args()
+
+    config = os.path.abspath(args.config)
+    with tempfile.TemporaryDirectory() as directory:
+        write_accounts(directory, args.accounts)
+        # 第一次运行创建账户存储并预热文件缓存，不计入结果
+        time_startup(directory, config, 1)
+        timings = time_startup(directory, config, args.runs)
+        packages = import_profile(directory, config)
+
+    median = statistics.median(timings)
+    print(f"startup ({args.accounts} accounts, {args.runs} runs): "
+          f"median {median:.3f}s  min {min(timings):.3f}s  max {max(timings):.3f}s")
+    print("slowest packages (cumulative import time):")
+    for name, cumulative in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    loaded = sorted(packages.keys() & set(LAZY_MODULES))
+    failed = False
+    if loaded:
+        print(f"FAIL: imported on the headless start path: {', '.join(loaded)}")
+        failed = True
+    if median > args.max_seconds:
+        print(f"FAIL: median startup {median:.3f}s exceeds {args.max_seconds:.3f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
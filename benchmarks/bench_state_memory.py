@@ -0,0 +1,94 @@
+"""
+比较每个账户保留的对战状态内存：旧的嵌套字典 + result_json 与 Combatant 原地更新。
+
+用法（在项目根目录）：
+    python -m benchmarks.bench_state_memory --accounts 2000 --turns 20
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from benchmarks.payloads import action_response
+from src.model.gigaverse.state import Combatant
+
+
+class LegacyState:
+    """旧版 GameClient.update_status 的状态布局"""
+
+    def __init__(self):
+        self.player = {}
+        self.enemy = {}
+        self.result_json = None
+
+    @staticmethod
+    def _side(data: dict) -> dict:
+        return {
+            "health": data["health"]["current"],
+            "shield": data["shield"]["current"],
+            "moves": {
+                name: {
+                    "currentATK": data[name]["currentATK"],
+                    "currentDEF": data[name]["currentDEF"],
+                    "currentCharges": data[name]["currentCharges"],
+                }
+                for name in ("rock", "paper", "scissor")
+            },
+        }
+
+    def update(self, result: dict):
+        player, enemy = result["data"]["run"]["players"]
+        self.player.update(self._side(player))
+        self.player["max_health"] = player["health"].get("currentMax", player["health"]["current"])
+        self.enemy.update(self._side(enemy))
+        self.result_json = result
+
+
+class SlottedState:
+    def __init__(self):
+        self.player = Combatant()
+        self.enemy = Combatant()
+
+    def update(self, result: dict):
+        player, enemy = result["data"]["run"]["players"]
+        self.player.update(player)
+        self.enemy.update(enemy)
+
+
+def measure(factory, bodies: list[bytes], accounts: int, turns: int) -> dict:
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    states = [factory() for _ in range(accounts)]
+    started = time.perf_counter()
+    for turn in range(turns):
+        for i, state in enumerate(states):
+            state.update(json.loads(bodies[(i + turn) % len(bodies)]))
+    elapsed = time.perf_counter() - started
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "retained_per_account": (retained - before) / accounts,
+        "peak_mb": (peak - before) / 1024 / 1024,
+        "update_us": elapsed / (accounts * turns) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+
+    bodies = [json.dumps(action_response(seed)).encode() for seed in range(64)]
+    for name, factory in (("legacy dict + result_json", LegacyState), ("slotted Combatant", SlottedState)):
+        result = measure(factory, bodies, args.accounts, args.turns)
+        print(f"{name:28s} retained/account={result['retained_per_account']:8.0f} B  "
+              f"peak={result['peak_mb']:6.2f} MB  update(incl. json.loads)={result['update_us']:6.2f} us")
+
+    sample = Combatant()
+    sample.update(action_response(0)["data"]["run"]["players"][0])
+    print(f"Combatant.nbytes() = {sample.nbytes()} B")
+
+
+if __name__ == "__main__":
+    main()
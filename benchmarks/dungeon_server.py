@@ -0,0 +1,332 @@
+"""
+本地 Gigaverse 地牢替身服务器，用于在不访问 gigaverse.io、不使用真实 token 的情况下压测 GameClient。
+
+实现 POST /api/game/dungeon/action：
+- start_run：开始新的一局，进入第 1 个房间
+- rock / paper / scissor：结算一回合，敌人随机出可用招式；
+  任一方倒下时返回 "Dungeon run room result reported"，敌人倒下时给出三个战利品
+- loot_one / loot_two / loot_three：应用战利品并进入下一个房间（敌人随房间变强）
+
+敌人属性与出招由 --seed、token、局数和房间号决定，可复现。
+
+战斗规则（克制、ATK/DEF 伤害、护盾、Charges）在本文件中独立实现，不调用 solver，
+因此求解器的实现错误会表现为推测命中率下降。但两者依据的是同一份规则说明
+（REFERENCED_MESSAGES_SYSTEM_PROMPT），并非真实服务器：在替身服务器上测得的推测命中率、
+胜率以及由其录制数据得到的评估结果，只说明求解器与规则说明一致，不能代表在 gigaverse.io 上的效果。
+另外提供兼容 DeepSeek 的 POST /v1/chat/completions（总是选择第一个选项）和 GET /stats。
+
+用法（在项目根目录）：
+    python -m benchmarks.dungeon_server --port 8787 --latency-ms 20 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from aiohttp import web
+
+ROOM_RESULT = "Dungeon run room result reported"
+LOOT_ACTIONS = ("loot_one", "loot_two", "loot_three")
+BOONS = ("AddMaxHealth", "AddMaxArmor", "Heal", "UpgradeRock", "UpgradePaper", "UpgradeScissor")
+MOVES = ("rock", "paper", "scissor")
+MAX_CHARGES = 3
+FULL_CHARGES = ((MAX_CHARGES,) * 3)
+# 招式 -> 被它克制的招式
+WINS_AGAINST = {"rock": "scissor", "paper": "rock", "scissor": "paper"}
+
+LIMITATION_NOTE = (
+    "note: the stand-in server implements the combat rules from the same rule description the solver uses; "
+    "speculation hit rate and win rates measure agreement with that description, not the real game"
+)
+
+
+@dataclass
+class Run:
+    number: int
+    rng: random.Random
+    player: tuple
+    max_health: int
+    max_shield: int
+    enemy: tuple = ()
+    enemy_max_health: int = 0
+    room: int = 1
+    action_token: int = 1
+    last_enemy_move: Optional[str] = None
+    loot_options: list = field(default_factory=list)
+
+
+# ---------- 战斗规则（与 solver 分开实现） ----------
+
+def _usable_moves(side: tuple) -> list[int]:
+    return [i for i, (_, _, charges) in enumerate(side[2]) if charges > 0]
+
+
+def _hit(health: int, shield: int, damage: int) -> tuple[int, int]:
+    """伤害先由护盾吸收"""
+    if damage <= 0:
+        return health, shield
+    if damage <= shield:
+        return health, shield - damage
+    return health - (damage - shield), 0
+
+
+def _recharge(moves: tuple, used: int) -> tuple:
+    """使用的招式消耗 1 点（耗尽时进入 -1 的冷却），其余未满的招式恢复 1 点"""
+    result = []
+    for i, (atk, df, charges) in enumerate(moves):
+        if i == used:
+            charges = charges - 1 if charges > 1 else -1
+        elif charges < MAX_CHARGES:
+            charges += 1
+        result.append((atk, df, charges))
+    return tuple(result)
+
+
+def _play_round(player: tuple, enemy: tuple, p_move: int, e_move: int) -> tuple[tuple, tuple]:
+    """被克制的一方不造成伤害，平局时双方都造成 ATK - 对方 DEF 的伤害"""
+    p_name, e_name = MOVES[p_move], MOVES[e_move]
+    p_atk, p_def, _ = player[2][p_move]
+    e_atk, e_def, _ = enemy[2][e_move]
+    to_enemy = max(0, p_atk - e_def) if WINS_AGAINST[e_name] != p_name else 0
+    to_player = max(0, e_atk - p_def) if WINS_AGAINST[p_name] != e_name else 0
+    return (
+        (*_hit(player[0], player[1], to_player), _recharge(player[2], p_move)),
+        (*_hit(enemy[0], enemy[1], to_enemy), _recharge(enemy[2], e_move)),
+    )
+
+
+def _with_charges(moves: tuple, charges: tuple = FULL_CHARGES) -> tuple:
+    return tuple((atk, df, c) for (atk, df, _), c in zip(moves, charges))
+
+
+class DungeonServer:
+    def __init__(self, seed: int = 0, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, llm_latency_ms: float = 0):
+        self.seed = seed
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.llm_latency = llm_latency_ms / 1000
+        self.noise = random.Random(seed)
+        self.runs: dict[str, Run] = {}
+        self.run_counts: dict[str, int] = {}
+        self.stats = {
+            "requests": 0, "runs_started": 0, "runs_finished": 0, "rooms_cleared": 0,
+            "turns": 0, "loots": 0, "injected_errors": 0, "throttled": 0, "bad_requests": 0, "llm_requests": 0,
+        }
+
+    # ---------- 游戏逻辑 ----------
+
+    def _spawn_enemy(self, token: str, run: Run):
+        rng = random.Random(f"{self.seed}:{token}:{run.number}:{run.room}")
+        room = run.room
+        moves = tuple(
+            (rng.randint(1, 2 + room), rng.randint(0, 1 + room // 2), MAX_CHARGES)
+            for _ in MOVES
+        )
+        run.enemy_max_health = 4 + 2 * room + rng.randint(0, room)
+        run.enemy = (run.enemy_max_health, rng.randint(0, room // 2), moves)
+        run.last_enemy_move = None
+        run.loot_options = []
+
+    def start_run(self, token: str) -> Run:
+        number = self.run_counts.get(token, 0) + 1
+        self.run_counts[token] = number
+        rng = random.Random(f"{self.seed}:{token}:{number}")
+        run = Run(
+            number=number,
+            rng=rng,
+            player=(12, 2, ((3, 1, MAX_CHARGES), (1, 3, MAX_CHARGES), (2, 2, MAX_CHARGES))),
+            max_health=12,
+            max_shield=2,
+        )
+        self._spawn_enemy(token, run)
+        self.runs[token] = run
+        self.stats["runs_started"] += 1
+        return run
+
+    def play_turn(self, token: str, run: Run, move: str) -> str:
+        p_move = MOVES.index(move)
+        if run.player[2][p_move][2] <= 0:
+            raise web.HTTPBadRequest(text=f"Move {move} has no charges")
+        reply = run.rng.choice(_usable_moves(run.enemy) or [0, 1, 2])
+        run.player, run.enemy = _play_round(run.player, run.enemy, p_move, reply)
+        run.last_enemy_move = MOVES[reply]
+        self.stats["turns"] += 1
+
+        if run.player[0] <= 0:
+            self.runs.pop(token, None)
+            self.stats["runs_finished"] += 1
+            return ROOM_RESULT
+        if run.enemy[0] <= 0:
+            run.enemy = (0, 0, run.enemy[2])
+            run.loot_options = [self._loot_option(run.rng) for _ in LOOT_ACTIONS]
+            self.stats["rooms_cleared"] += 1
+            return ROOM_RESULT
+        return ""
+
+    @staticmethod
+    def _loot_option(rng: random.Random) -> dict:
+        return {
+            "docId": str(rng.randint(1, 500)),
+            "RARITY_CID": rng.randint(0, 4),
+            "boonTypeString": rng.choice(BOONS),
+            "selectedVal1": rng.randint(1, 4),
+            "selectedVal2": rng.randint(0, 2),
+        }
+
+    def choose_loot(self, token: str, run: Run, action: str):
+        if not run.loot_options:
+            raise web.HTTPBadRequest(text="No loot to choose")
+        option = run.loot_options[LOOT_ACTIONS.index(action)]
+        health, shield, moves = run.player
+        boon, val1, val2 = option["boonTypeString"], option["selectedVal1"], option["selectedVal2"]
+        if boon == "AddMaxHealth":
+            run.max_health += val1
+            health += val1
+        elif boon == "AddMaxArmor":
+            run.max_shield += val1
+            shield += val1
+        elif boon == "Heal":
+            health = min(run.max_health, health + val1)
+        else:
+            index = MOVES.index(boon.removeprefix("Upgrade").lower())
+            moves = tuple(
+                (atk + val1, df + val2, c) if i == index else (atk, df, c)
+                for i, (atk, df, c) in enumerate(moves)
+            )
+        # 进入下一个房间时招式次数和护盾恢复
+        run.player = (health, run.max_shield, _with_charges(moves))
+        run.room += 1
+        self._spawn_enemy(token, run)
+        self.stats["loots"] += 1
+
+    # ---------- 响应 ----------
+
+    @staticmethod
+    def _side_json(side: tuple, max_health: int, max_shield: int, last_move: Optional[str] = None) -> dict:
+        data = {
+            "health": {"current": side[0], "currentMax": max_health},
+            "shield": {"current": side[1], "currentMax": max_shield},
+            "lastMove": last_move,
+        }
+        for name, (atk, df, charges) in zip(MOVES, side[2]):
+            data[name] = {"currentATK": atk, "currentDEF": df, "currentCharges": charges, "startingCharges": MAX_CHARGES}
+        return data
+
+    def _response(self, run: Run, message: str) -> dict:
+        return {
+            "success": True,
+            "message": message,
+            "actionToken": run.action_token,
+            "data": {
+                "run": {
+                    "ROOM_NUM_CID": run.room,
+                    "players": [
+                        self._side_json(run.player, run.max_health, run.max_shield),
+                        self._side_json(run.enemy, run.enemy_max_health, 0, run.last_enemy_move),
+                    ],
+                    "lootPhase": bool(run.loot_options),
+                    "lootOptions": run.loot_options,
+                }
+            },
+        }
+
+    async def _delay(self, base: float):
+        delay = base + self.noise.uniform(-self.jitter, self.jitter) if self.jitter else base
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def handle_action(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        await self._delay(self.latency)
+
+        roll = self.noise.random()
+        if roll < self.error_rate:
+            self.stats["injected_errors"] += 1
+            return web.Response(status=503, text="Service Unavailable (injected)")
+        if roll < self.error_rate + self.throttle_rate:
+            self.stats["throttled"] += 1
+            return web.Response(status=429, text="Too Many Requests (injected)", headers={"Retry-After": "1"})
+
+        token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+        body = await request.json()
+        action = body.get("action", "")
+        try:
+            if action == "start_run":
+                run = self.start_run(token)
+                return web.json_response(self._response(run, ""))
+
+            run = self.runs.get(token)
+            if run is None:
+                raise web.HTTPBadRequest(text="No active run")
+            if str(body.get("actionToken")) != str(run.action_token):
+                raise web.HTTPBadRequest(text="Invalid action token")
+
+            if action in MOVES:
+                message = self.play_turn(token, run, action)
+            elif action in LOOT_ACTIONS:
+                self.choose_loot(token, run, action)
+                message = ""
+            else:
+                raise web.HTTPBadRequest(text=f"Unknown action {action}")
+        except web.HTTPBadRequest:
+            self.stats["bad_requests"] += 1
+            raise
+
+        run.action_token += 1
+        return web.json_response(self._response(run, message))
+
+    async def handle_chat(self, request: web.Request) -> web.Response:
+        """兼容 DeepSeek/OpenAI 的对话接口：批量查询按编号逐行回复，单个查询回复第一个选项"""
+        self.stats["llm_requests"] += 1
+        await self._delay(self.llm_latency)
+        body = await request.json()
+        message = body["messages"][-1]["content"]
+        batch = re.findall(r"^\[(\d+)\][^\n]*?选项：([a-z_]+)", message, re.MULTILINE)
+        if batch:
+            content = "\n".join(f"[{number}] 建议出{option}，因为替身服务器" for number, option in batch)
+        else:
+            option = "loot_one" if "loot_one" in message else "rock"
+            content = f"建议出{option}，因为替身服务器"
+        return web.json_response({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({**self.stats, "active_runs": len(self.runs)})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/api/game/dungeon/action", self.handle_action)
+        app.router.add_post("/v1/chat/completions", self.handle_chat)
+        app.router.add_get("/stats", self.handle_stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gigaverse dungeon stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of actions answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of actions answered with 429")
+    parser.add_argument("--llm-latency-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    server = DungeonServer(
+        seed=args.seed,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        llm_latency_ms=args.llm_latency_ms,
+    )
+    web.run_app(server.app(), host=args.host, port=args.port, access_log=None, print=None)
+
+
+if __name__ == "__main__":
+    main()
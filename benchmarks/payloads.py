@@ -0,0 +1,67 @@
+"""基准测试共用的 /api/game/dungeon/action 响应样例"""
+import random
+
+
+def _move(rng: random.Random) -> dict:
+    return {
+        "startingATK": rng.randint(1, 5),
+        "startingDEF": rng.randint(1, 5),
+        "currentATK": rng.randint(1, 12),
+        "currentDEF": rng.randint(1, 12),
+        "startingCharges": 3,
+        "currentCharges": rng.choice((-1, 1, 2, 3)),
+    }
+
+
+def _player(rng: random.Random, player_id: str) -> dict:
+    return {
+        "id": player_id,
+        "rock": _move(rng),
+        "paper": _move(rng),
+        "scissor": _move(rng),
+        "health": {"current": rng.randint(1, 30), "starting": 20, "currentMax": 30, "startingMax": 20},
+        "shield": {"current": rng.randint(0, 10), "starting": 5, "currentMax": 10, "startingMax": 5},
+        "equipment": [],
+        "lastMove": rng.choice(("rock", "paper", "scissor")),
+        "thisPlayerWin": rng.random() < 0.5,
+        "otherPlayerWin": rng.random() < 0.5,
+    }
+
+
+def _loot(rng: random.Random) -> dict:
+    return {
+        "docId": str(rng.randint(1, 500)),
+        "RARITY_CID": rng.randint(0, 4),
+        "boonTypeString": rng.choice(("AddMaxHealth", "AddMaxArmor", "Heal", "UpgradeRock", "UpgradePaper", "UpgradeScissor")),
+        "selectedVal1": rng.randint(1, 6),
+        "selectedVal2": rng.randint(0, 3),
+        "UINT256_CID": str(rng.getrandbits(64)),
+    }
+
+
+def action_response(seed: int = 0, loot: bool = False) -> dict:
+    """生成一个与线上结构一致的动作响应（字段取值随机）"""
+    rng = random.Random(seed)
+    return {
+        "success": True,
+        "message": "",
+        "actionToken": rng.getrandbits(40),
+        "data": {
+            "run": {
+                "_id": f"{rng.getrandbits(96):024x}",
+                "DUNGEON_ID_CID": 1,
+                "ROOM_NUM_CID": rng.randint(1, 16),
+                "players": [_player(rng, "player"), _player(rng, "enemy")],
+                "lootPhase": loot,
+                "lootOptions": [_loot(rng) for _ in range(3)] if loot else [],
+                "userId": f"0x{rng.getrandbits(160):040x}",
+            },
+            "entity": {
+                "_id": f"{rng.getrandbits(96):024x}",
+                "COMPLETE_CID": False,
+                "ROOM_NUM_CID": rng.randint(1, 16),
+                "ENEMY_CID": rng.randint(1, 30),
+                "GAME_ITEM_ID_CID_array": [rng.randint(1, 100) for _ in range(8)],
+            },
+        },
+    }
@@ -1,25 +1,42 @@
-from loguru import logger
-import urllib3
-import sys
+import argparse
 import asyncio
+import os
 
 from process import start
+from src.utils.config import CONFIG_PATH_ENV, get_config
+from src.utils.constants import MAIN_MENU_OPTIONS
+from src.utils.log import setup_logging
+
+# 指定任务后以无界面模式运行（容器中使用）：不清屏、不显示菜单、不等待输入
+TASK_ENV = "GIGA_TASK"
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="GIGA bot. Without --task the interactive menu is shown.")
+    parser.add_argument("--task", default=os.environ.get(TASK_ENV) or None,
+                        help=f"run this task headless (env {TASK_ENV}): {', '.join(MAIN_MENU_OPTIONS)}")
+    parser.add_argument("--config", default=os.environ.get(CONFIG_PATH_ENV) or None,
+                        help=f"config file (env {CONFIG_PATH_ENV}, default config.yaml)")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="load the config and accounts, then exit without running them")
+    args = parser.parse_args(argv)
+    if args.task is not None and args.task not in MAIN_MENU_OPTIONS:
+        parser.error(f"unknown task {args.task!r}, expected one of: {', '.join(MAIN_MENU_OPTIONS)}")
+    return args
 
 
 async def main():
-    configuration()
-    await start()
+    args = parse_args()
+    configuration(args.config)
+    await start(args.task, dry_run=args.dry_run)
 
 
-def configuration():
-    urllib3.disable_warnings()
-    logger.remove()
-    logger.add(
-        sys.stdout,
-        colorize=True,
-        format="<light-cyan>{time:HH:mm:ss}</light-cyan> | <level>{level: <8}</level> | <fg #ffffff>{name}:{line}</fg #ffffff> - <bold>{message}</bold>",
-    )
+def configuration(config_path: str | None = None):
+    if config_path:
+        # 分片子进程通过环境变量读取同一份配置
+        os.environ[CONFIG_PATH_ENV] = config_path
+    setup_logging(get_config(config_path))
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
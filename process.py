@@ -4,19 +4,42 @@ from typing import List
 from loguru import logger
 from src.model import prepare_data
 import src.utils
-from src.utils.output import show_dev_info, show_logo, show_menu
-from src.utils.reader import read_csv_accounts
+from src.utils.reader import AccountSelector, read_csv_accounts
+from src.utils.account_watcher import AccountWatcher
+from src.utils.account_store import close_account_store, get_account_store
 from src.utils.constants import ACCOUNTS_FILE, Account
+from src.model.deepseek.deepseek import close_deepseek_clients
+from src.model.gpt import close_chatgpt_clients
+from src.model.gigaverse.decision_service import close_decision_service
+from src.utils.decision_cache import close_decision_cache
+from src.utils.log import close_event_logs
+from src.utils.metrics import WRAPPER_RETRIES, start_metrics_exporter
+from src.utils.pacing import log_pacing_stats
+from src.utils.proxy_manager import ProxyUnavailableError, get_proxy_manager, log_proxy_stats
+from src.utils.recorder import close_recorder
+from src.utils.retry import RetryPolicy, is_retryable, log_breaker_stats
+from src.utils.scheduler import AccountScheduler
+from src.utils.sharding import run_sharded
+from src.utils.tokens import is_expired, log_expiry_report
+from src.utils.transport import close_transports
 import src.model
 
 
-async def start():
-    """程序主入口"""
-    show_logo()
-    show_dev_info()
+async def start(task: str | None = None, dry_run: bool = False):
+    """
+    程序主入口。
+
+    task 为None时显示标志和菜单（交互模式）；指定 task 时为无界面模式：不清屏、不等待输入，
+    也不导入 rich、prompt_toolkit。dry_run 为 True 时只加载配置和账户并创建调度器，不运行账户。
+    """
     config = src.utils.get_config()
 
-    task = show_menu(src.utils.constants.MAIN_MENU_OPTIONS)
+    if task is None:
+        from src.utils.output import show_dev_info, show_logo, show_menu
+
+        show_logo()
+        show_dev_info()
+        task = show_menu(src.utils.constants.MAIN_MENU_OPTIONS)
     if task == "Exit": return
 
     config.DATA_FOR_TASKS = await prepare_data(config, task)
@@ -29,30 +52,57 @@ async def start():
 
     logger.info(f"Accounts to process: {accounts_to_process}")
 
+    if dry_run:
+        scheduler = AccountScheduler.from_config(accounts_to_process, config)
+        logger.info(f"Dry run: {len(accounts_to_process)} accounts ready for {task}, scheduler stats: {scheduler.stats()}")
+        await shutdown()
+        return
+
+    # 多进程分片模式：每个子进程运行自己的事件循环和连接池
+    # 父进程也导入了账户存储并写入状态，退出前同样需要 shutdown() 提交
+    if config.SHARDING.PROCESSES > 1:
+        try:
+            await run_sharded(accounts_to_process, config)
+        finally:
+            await shutdown()
+        return
+
     # 启动账户处理循环
-    await run_account_loops(accounts_to_process, config)
+    try:
+        await run_account_loops(accounts_to_process, config)
+    finally:
+        await shutdown()
+
+
+async def shutdown():
+    """关闭共享连接池、保存决策缓存并输出统计"""
+    await close_transports()
+    await close_decision_service()
+    await close_deepseek_clients()
+    await close_chatgpt_clients()
+    close_decision_cache()
+    close_recorder()
+    close_account_store()
+    log_pacing_stats()
+    log_proxy_stats()
+    log_breaker_stats()
+    close_event_logs()
+    await logger.complete()
 
 
 async def prepare_accounts(config) -> List[Account]:
     """准备需要处理的账户列表"""
-    all_accounts = read_csv_accounts(ACCOUNTS_FILE)
-    start_index = config.SETTINGS.ACCOUNTS_RANGE[0]
-    end_index = config.SETTINGS.ACCOUNTS_RANGE[1]
-
-    if start_index == 0 and end_index == 0:
-        if config.SETTINGS.EXACT_ACCOUNTS_TO_USE:
-            accounts = [
-                acc for acc in all_accounts
-                if acc.index in config.SETTINGS.EXACT_ACCOUNTS_TO_USE
-            ]
-            logger.info(f"Using specific accounts: {config.SETTINGS.EXACT_ACCOUNTS_TO_USE}")
-        else:
-            accounts = all_accounts
-    else:
-        accounts = [
-            acc for acc in all_accounts
-            if start_index <= acc.index <= end_index
-        ]
+    selector = AccountSelector.from_config(config)
+    accounts = read_csv_accounts(ACCOUNTS_FILE, selector)
+    logger.info(f"Using {selector}")
+    if config.ACCOUNTS.STORE_FILE:
+        get_account_store().import_csv(ACCOUNTS_FILE)
+
+    # 本地解析 token 过期时间：过期的账户由调度器跳过，不发送任何请求
+    log_expiry_report(accounts, config.ACCOUNTS.EXPIRY_REPORT_SIZE, config.SCHEDULER.EXPIRY_MARGIN)
+    for account in accounts:
+        if is_expired(account.token, config.SCHEDULER.EXPIRY_MARGIN):
+            set_account_status(account, config, "expired")
 
     if not accounts:
         logger.error("No accounts found in specified range")
@@ -69,37 +119,44 @@ async def prepare_accounts(config) -> List[Account]:
     return accounts
 
 
-async def run_account_loops(accounts: List[Account], config):
-    """为每个账户创建独立的循环任务"""
-    semaphore = asyncio.Semaphore(value=config.SETTINGS.THREADS)
-    tasks = [
-        asyncio.create_task(account_loop(account, config, semaphore))
-        for account in accounts
-    ]
-    await asyncio.gather(*tasks)
-
-
-async def account_loop(account: Account, config, semaphore: asyncio.Semaphore):
-    """单个账户的无限循环处理"""
-    while True:
-        try:
-            async with semaphore:
-                await account_flow(account, config)
-
-            # 单次执行完成后休眠20-40分钟
-            sleep_minutes = random.uniform(0, 1)
-            sleep_seconds = sleep_minutes * 60
-            logger.info(f"[{account.index}] Completed execution, sleeping for {sleep_minutes:.2f} minutes")
-            await asyncio.sleep(sleep_seconds)
-
-        except Exception as err:
-            logger.error(f"[{account.index}] Loop error: {err}")
-            # 发生错误时休眠5分钟后重试
-            await asyncio.sleep(300)
+async def run_account_loops(accounts: List[Account], config, scheduler: AccountScheduler | None = None):
+    """由调度器的固定数量 worker 轮流处理所有账户"""
+    scheduler = scheduler or AccountScheduler.from_config(accounts, config)
+    exporter = await start_metrics_exporter(config)
+    watcher_task = None
+    proxy_task = None
+    if config.PROXIES.ENABLED:
+        # 启动前并发探测所有代理，之后在后台定期探测
+        proxies = get_proxy_manager()
+        proxies.register(account.proxy for account in accounts)
+        await proxies.probe_all()
+        proxy_task = asyncio.create_task(proxies.run())
+    if config.ACCOUNTS.WATCH:
+        watcher = AccountWatcher(
+            ACCOUNTS_FILE,
+            accounts,
+            AccountSelector.from_config(config),
+            interval=config.ACCOUNTS.WATCH_INTERVAL,
+            # 分片模式下由父进程决定账户归属，子进程只更新自己已有的账号
+            on_added=scheduler.add if config.SHARDING.PROCESSES <= 1 else None,
+            on_changed=get_account_store().upsert if config.ACCOUNTS.STORE_FILE else None,
+        )
+        watcher_task = asyncio.create_task(watcher.run())
+    try:
+        await scheduler.run(lambda account: account_flow(account, config))
+    finally:
+        logger.info(f"Scheduler stats: {scheduler.stats()}")
+        if watcher_task:
+            watcher_task.cancel()
+        if proxy_task:
+            proxy_task.cancel()
+        if exporter:
+            await exporter.stop()
 
 
 async def account_flow(account: Account, config):
     """账户处理流程"""
+    instance = None
     try:
         # 初始随机延迟
         initial_pause = random.randint(
@@ -109,27 +166,43 @@ async def account_flow(account: Account, config):
         logger.info(f"[{account.index}] Sleeping for {initial_pause} seconds before start...")
         await asyncio.sleep(initial_pause)
 
+        # 代理隔离中且没有备用代理时不发送任何请求，由调度器在隔离结束后重新执行
+        if config.PROXIES.ENABLED:
+            get_proxy_manager().require(account)
+
         instance = src.model.Start(account, config)
 
         # 初始化
         init_result = await wrapper(instance.initialize, config)
         if not init_result:
             logger.error(f"[{account.index}] Initialization failed")
+            set_account_status(account, config, "init_failed")
             return
 
         # 执行主要流程
         flow_result = await wrapper(instance.flow, config)
         if not flow_result:
             logger.warning(f"[{account.index}] Flow execution failed")
+        set_account_status(account, config, "ok" if flow_result else "failed")
 
     except Exception as err:
         logger.error(f"[{account.index}] Account flow failed: {err}")
+        set_account_status(account, config, "failed" if is_retryable(err) else "invalid")
         raise
 
 
+def set_account_status(account: Account, config, status: str):
+    """记录账户最近一次执行的结果（只入队，由账户存储的写入线程批量提交）"""
+    if config.ACCOUNTS.STORE_FILE:
+        get_account_store().set_status(account.index, status)
+
+
 async def wrapper(function, config, *args, **kwargs):
-    """带重试机制的函数包装器"""
+    """带重试机制的函数包装器（指数退避 + 完全抖动，不可重试的错误直接抛出）"""
     attempts = config.SETTINGS.ATTEMPTS
+    # 等待时间不低于配置的最小值，上限从最小值开始翻倍，不超过配置的最大值
+    min_pause, max_pause = config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS
+    policy = RetryPolicy(attempts, base_delay=min_pause, max_delay=max_pause, min_delay=min_pause)
     for attempt in range(attempts):
         try:
             result = await function(*args, **kwargs)
@@ -141,22 +214,20 @@ async def wrapper(function, config, *args, **kwargs):
                     return True
 
             if attempt < attempts - 1:
-                pause = random.randint(
-                    config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[0],
-                    config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[1],
-                )
+                WRAPPER_RETRIES.inc(function.__name__, "false")
+                pause = policy.backoff(attempt)
                 logger.info(
-                    f"[{attempt + 1}/{attempts}] Sleeping for {pause} seconds before retry..."
+                    f"[{attempt + 1}/{attempts}] Sleeping for {pause:.2f} seconds before retry..."
                 )
                 await asyncio.sleep(pause)
 
         except Exception as err:
-            if attempt < attempts - 1:
-                pause = random.randint(
-                    config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[0],
-                    config.SETTINGS.PAUSE_BETWEEN_ATTEMPTS[1],
-                )
-                logger.warning(f"Attempt {attempt + 1} failed: {err}, retrying after {pause}s")
+            # 代理隔离中或服务器要求等待（retry_after）时立即重试也不会成功，直接交给调度器按等待时间重新执行
+            if (attempt < attempts - 1 and is_retryable(err) and not isinstance(err, ProxyUnavailableError)
+                    and not getattr(err, "retry_after", None)):
+                WRAPPER_RETRIES.inc(function.__name__, "exception")
+                pause = policy.backoff(attempt)
+                logger.warning(f"Attempt {attempt + 1} failed: {err}, retrying after {pause:.2f}s")
                 await asyncio.sleep(pause)
             else:
                 raise
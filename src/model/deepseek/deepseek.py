@@ -1,12 +1,115 @@
 from loguru import logger
+import asyncio
 import httpx
 from typing import Optional
 import json
+import time
+
+from src.utils.config import get_config
+from src.utils.metrics import LLM_FAILURES, LLM_LATENCY, LLM_QUEUE_WAIT, key_label
+from src.utils.rate_limit import KeyedRateLimiter
+from src.utils.retry import RetryableError, error_for_status, get_breaker, retry_policy
+from src.utils.transport import http2_available, mask_proxy, normalize_proxy
+
+DEEPSEEK_API_URL = "https://api.deepseek.com/v1/chat/completions"
+
+
+class DeepSeekClient:
+    """
+    长连接的DeepSeek客户端，每个代理一个实例。
+
+    复用同一个 httpx.AsyncClient（HTTP/2、连接数限制），
+    并按API密钥进行令牌桶限速，避免多个账户同时触发速率限制。
+    """
+
+    def __init__(
+        self,
+        proxy: str = "",
+        limiter: Optional[KeyedRateLimiter] = None,
+        max_connections: int = 20,
+        timeout: float = 300.0,
+        http2: bool = True,
+        api_url: str = DEEPSEEK_API_URL,
+    ):
+        self.proxy = normalize_proxy(proxy)
+        self.api_url = api_url
+        self.limiter = limiter
+        self.http_client = httpx.AsyncClient(
+            http2=http2 and http2_available(),
+            proxy=self.proxy or None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=httpx.Timeout(timeout),
+        )
+        self.retry = retry_policy("llm")
+        self.breaker = get_breaker("deepseek")
+
+    async def ask(self, api_key: str, model: str, user_message: str, prompt: str) -> tuple[bool, str]:
+        """发送消息并获取响应，返回 (是否成功, 响应消息)；可重试的错误按退避重试，熔断期间直接失败"""
+
+        async def ask_once() -> str:
+            if self.limiter:
+                waited = await self.limiter.acquire(api_key)
+                if waited > 0:
+                    logger.debug(f"DeepSeek密钥 {api_key[:8]}... 限速等待 {waited:.2f} 秒")
+                LLM_QUEUE_WAIT.observe(waited, "deepseek")
+            started = time.perf_counter()
+            try:
+                return await _make_request(self.http_client, api_key, model, user_message, prompt, self.api_url)
+            finally:
+                LLM_LATENCY.observe(time.perf_counter() - started, "deepseek", key_label(api_key))
+
+        try:
+            return True, await self.retry.call(ask_once, "deepseek", breaker=self.breaker, wait_for_breaker=False)
+        except Exception as e:
+            LLM_FAILURES.inc("deepseek", key_label(api_key))
+            return False, str(e)
+
+    async def close(self):
+        await self.http_client.aclose()
+
+
+_clients: dict[str, DeepSeekClient] = {}
+
+
+def get_deepseek_client(proxy: str = "") -> DeepSeekClient:
+    """获取指定代理对应的共享DeepSeek客户端，不存在时创建"""
+    proxy = normalize_proxy(proxy)
+    client = _clients.get(proxy)
+    if client is None or client.http_client.is_closed:
+        config = get_config()
+        if not hasattr(get_deepseek_client, "_limiter"):
+            get_deepseek_client._limiter = KeyedRateLimiter(
+                rate=config.DEEPSEEK.REQUESTS_PER_SECOND,
+                capacity=config.DEEPSEEK.BURST,
+            )
+        if proxy:
+            logger.info(f"使用代理: {mask_proxy(proxy)} 连接DeepSeek")
+        client = DeepSeekClient(
+            proxy=proxy,
+            limiter=get_deepseek_client._limiter,
+            max_connections=config.DEEPSEEK.MAX_CONNECTIONS,
+            timeout=config.DEEPSEEK.REQUEST_TIMEOUT,
+            http2=config.NETWORK.HTTP2,
+            api_url=config.DEEPSEEK.API_URL,
+        )
+        _clients[proxy] = client
+    return client
+
+
+async def close_deepseek_clients():
+    """关闭所有DeepSeek客户端（程序退出时调用）"""
+    clients = list(_clients.values())
+    _clients.clear()
+    await asyncio.gather(*(client.close() for client in clients), return_exceptions=True)
 
 
 async def ask_deepseek(api_key: str, model: str, user_message: str, prompt: str, proxy: str = "") -> tuple[bool, str]:
     """
     向DeepSeek模型发送消息并获取响应，支持SOCKS5和HTTP代理。
+    同一代理复用长连接客户端，并按API密钥限速。
 
     Args:
         api_key (str): DeepSeek API密钥
@@ -19,32 +122,18 @@ async def ask_deepseek(api_key: str, model: str, user_message: str, prompt: str,
     Returns:
         tuple[bool, str]: (是否成功, 响应消息)
     """
-    client_params = {}
-
-    if proxy:
-        logger.info(f"使用代理: {proxy} 连接DeepSeek")
-        # 检测代理协议类型
-        if not proxy.startswith(("http://", "https://", "socks5://", "socks5h://")):
-            # 默认添加 http:// 前缀（向后兼容）
-            proxy = f"http://{proxy}"
-
-        # 配置代理字典
-        client_params["proxies"] = {
-            "http://": proxy,
-            "https://": proxy
-        }
-
     try:
-        async with httpx.AsyncClient(**client_params) as http_client:
-            return await _make_request(http_client, api_key, model, user_message, prompt)
+        client = get_deepseek_client(proxy)
     except Exception as e:
         logger.error(f"代理配置错误: {str(e)}")
         return False, f"代理配置错误: {str(e)}"
 
+    return await client.ask(api_key, model, user_message, prompt)
+
 
-async def _make_request(http_client: httpx.AsyncClient, api_key: str, model: str, user_message: str, prompt: str) -> \
-tuple[bool, str]:
-    """发送请求到DeepSeek API"""
+async def _make_request(http_client: httpx.AsyncClient, api_key: str, model: str, user_message: str, prompt: str,
+                        api_url: str = DEEPSEEK_API_URL) -> str:
+    """发送请求到DeepSeek API，返回响应文本；失败时按是否可重试抛出 RetryableError 或 FatalError"""
     # 准备请求数据
     headers = {
         "Authorization": f"Bearer {api_key}",
@@ -67,34 +156,35 @@ tuple[bool, str]:
     try:
         # 发送API请求
         response = await http_client.post(
-            "https://api.deepseek.com/v1/chat/completions",
+            api_url,
             headers=headers,
             json=data,
-            timeout=300.0
         )
+    except httpx.TimeoutException:
+        raise RetryableError("DeepSeek API请求超时")
+    except httpx.TransportError as e:
+        raise RetryableError(f"DeepSeek连接错误: {str(e)}")
 
-        if response.status_code == 200:
+    if response.status_code == 200:
+        try:
             response_data = response.json()
-            response_text = response_data["choices"][0]["message"]["content"]
-            return True, response_text
-        else:
-            error_message = response.text
-            if "rate_limit" in error_message.lower():
-                return False, "DeepSeek API达到速率限制，请稍后重试"
-            elif "quota" in error_message.lower():
-                return False, "DeepSeek API密钥余额不足"
-            else:
-                return False, f"DeepSeek API错误: {error_message}"
-
-    except httpx.TimeoutException:
-        return False, "DeepSeek API请求超时"
-    except Exception as e:
-        if "rate_limit" in str(e).lower():
-            return False, "DeepSeek API达到速率限制，请稍后重试"
-        elif "quota" in str(e).lower():
-            return False, "DeepSeek API密钥余额不足"
-        else:
-            return False, f"DeepSeek错误: {str(e)}"
+            return response_data["choices"][0]["message"]["content"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise RetryableError(f"DeepSeek响应格式错误: {str(e)}")
+
+    error_message = response.text
+    retry_after = response.headers.get("retry-after")
+    if "rate_limit" in error_message.lower() or response.status_code == 429:
+        message = "DeepSeek API达到速率限制，请稍后重试"
+    elif "quota" in error_message.lower() or response.status_code == 402:
+        message = "DeepSeek API密钥余额不足"
+    else:
+        message = f"DeepSeek API错误: {error_message}"
+    try:
+        retry_after = float(retry_after) if retry_after else None
+    except ValueError:
+        retry_after = None
+    raise error_for_status(response.status_code, message, retry_after)
 
 
 # 使用示例
@@ -121,5 +211,7 @@ if __name__ == "__main__":
         result = await ask_deepseek(api_key, model, message, prompt)
         print("No Proxy:", result)
 
+        await close_deepseek_clients()
+
 
     asyncio.run(test())
\ No newline at end of file
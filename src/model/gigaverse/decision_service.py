@@ -0,0 +1,202 @@
+import asyncio
+import random
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from loguru import logger
+
+from src.model.deepseek.deepseek import ask_deepseek
+from src.model.gpt.gpt import ask_chatgpt
+from src.utils.config import Config, get_config
+
+KIND_LABELS = {
+    "move": "出招",
+    "loot": "战利品",
+}
+
+# 只适用于某一类查询的额外要求，只在批次中包含该类查询时发送
+KIND_RULES = {
+    "move": "强制不使用`currentCharges`为1的招式，只从`currentCharges` > 1的招式中选择。",
+}
+
+# 匹配批量回复中的一行：[编号] 建议出<选择>，因为<理由>
+ANSWER_PATTERN = re.compile(r"\[?\s*(\d+)\s*\]?[^\n]*?建议出\s*\**\s*([a-z_]+)")
+
+
+@dataclass
+class PendingDecision:
+    kind: str
+    state: str
+    options: list
+    future: asyncio.Future = field(repr=False)
+
+
+class DecisionService:
+    """
+    跨账户的LLM决策微批处理服务。
+
+    在 window_ms 毫秒的窗口内收集各个 GameClient 的出招/战利品查询，
+    合并为一次LLM请求（系统提示词只发送一次），再将回复按编号拆分给各个等待者。
+    批次达到 max_batch 时立即发送。
+    """
+
+    def __init__(self, config: Config, system_prompt: str, window_ms: float = 20, max_batch: int = 8):
+        self.config = config
+        self.system_prompt = system_prompt
+        self.window = window_ms / 1000
+        self.max_batch = max(1, max_batch)
+
+        self._pending: list[PendingDecision] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.items = 0
+        self.answered = 0
+
+    async def decide(self, kind: str, state: str, options: list) -> Optional[str]:
+        """提交一个查询并等待所在批次的结果，LLM失败或回复无效时返回None"""
+        loop = asyncio.get_running_loop()
+        item = PendingDecision(kind, state, list(options), loop.create_future())
+        self._pending.append(item)
+
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+
+        return await item.future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+        task = asyncio.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    def build_message(self, batch: list[PendingDecision]) -> str:
+        lines = [
+            f"以下是{len(batch)}个相互独立的查询，请逐一分析，每个查询单独一行回复，严格按照以下格式返回纯文本：",
+            "[编号] 建议出<选择>，因为<理由>",
+            "其中 <选择> 必须是该查询给出的选项之一，不含尖括号或其他标记。",
+        ]
+        for kind in dict.fromkeys(item.kind for item in batch):
+            if kind in KIND_RULES:
+                lines.append(f"注意（{KIND_LABELS.get(kind, kind)}查询）：{KIND_RULES[kind]}")
+        lines.append("")
+        for number, item in enumerate(batch, 1):
+            lines.append(f"[{number}] {KIND_LABELS.get(item.kind, item.kind)}，选项：{'、'.join(item.options)}")
+            lines.append(item.state)
+            lines.append("")
+        return "\n".join(lines)
+
+    @staticmethod
+    def parse_answers(response: str, batch: list[PendingDecision]) -> list[Optional[str]]:
+        answers: list[Optional[str]] = [None] * len(batch)
+        for number, choice in ANSWER_PATTERN.findall(response):
+            index = int(number) - 1
+            if 0 <= index < len(batch) and answers[index] is None and choice in batch[index].options:
+                answers[index] = choice
+
+        # 单个查询时兼容未带编号的回复
+        if len(batch) == 1 and answers[0] is None:
+            for option in batch[0].options:
+                if option in response.lower():
+                    answers[0] = option
+                    break
+        return answers
+
+    async def _run_batch(self, batch: list[PendingDecision]):
+        self.batches += 1
+        self.items += len(batch)
+        answers: list[Optional[str]] = [None] * len(batch)
+        try:
+            response = await self._ask(self.build_message(batch))
+            if response:
+                answers = self.parse_answers(response, batch)
+                self.answered += sum(answer is not None for answer in answers)
+            logger.info(
+                f"Decision batch of {len(batch)} answered {sum(a is not None for a in answers)}/{len(batch)}"
+            )
+        except Exception as e:
+            logger.warning(f"Decision batch failed: {e}")
+        finally:
+            for item, answer in zip(batch, answers):
+                if not item.future.done():
+                    item.future.set_result(answer)
+
+    async def _ask(self, user_message: str) -> str:
+        if self.config.DECISION.LLM_PROVIDER == "chatgpt":
+            success, response = await ask_chatgpt(
+                api_key=random.choice(self.config.CHAT_GPT.API_KEYS),
+                model=self.config.CHAT_GPT.MODEL,
+                user_message=user_message,
+                prompt=self.system_prompt,
+                proxy=self.config.CHAT_GPT.PROXY_FOR_CHAT_GPT,
+            )
+        else:
+            success, response = await ask_deepseek(
+                api_key=random.choice(self.config.DEEPSEEK.API_KEYS),
+                model=self.config.DEEPSEEK.MODEL,
+                user_message=user_message,
+                prompt=self.system_prompt,
+                proxy=self.config.DEEPSEEK.PROXY_FOR_DEEPSEEK,
+            )
+        if not success:
+            logger.warning(f"Decision batch LLM request failed: {response}")
+            return ""
+        return response
+
+    async def close(self):
+        """放弃尚未发送的查询（返回None），取消进行中的批次"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, []
+        for item in pending:
+            if not item.future.done():
+                item.future.set_result(None)
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        # 被取消的批次在 finally 中为等待者返回None
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "answered": self.answered,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+
+# Singleton pattern
+def get_decision_service(system_prompt: str) -> DecisionService:
+    """Get decision service singleton"""
+    if not hasattr(get_decision_service, "_service"):
+        config = get_config()
+        get_decision_service._service = DecisionService(
+            config,
+            system_prompt,
+            window_ms=config.DECISION.BATCH_WINDOW_MS,
+            max_batch=config.DECISION.BATCH_MAX_SIZE,
+        )
+    return get_decision_service._service
+
+
+async def close_decision_service():
+    """结束未完成的批次并输出统计（程序退出时调用）"""
+    if hasattr(get_decision_service, "_service"):
+        service = get_decision_service._service
+        await service.close()
+        logger.info(f"Decision service stats: {service.stats()}")
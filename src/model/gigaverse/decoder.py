@@ -0,0 +1,200 @@
+"""
+/api/game/dungeon/action 响应的类型化解码。
+
+只提取机器人实际使用的字段（双方血量/护盾/三种招式、lastMove、lootOptions、actionToken、message），
+其余字段在解码阶段直接跳过。优先使用 msgspec（按结构体解码并校验类型），
+未安装时退回 orjson / json 解析后按路径校验。结构不符时抛出 SchemaError，并指出出错字段的路径。
+"""
+import json
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from src.model.gigaverse.state import MOVES
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 一方状态：(血量, 护盾, ((ATK, DEF, Charges) * 3), 最大血量)，可直接传给 Combatant.set
+SideData = tuple[int, int, tuple[tuple[int, int, int], ...], int]
+
+
+class SchemaError(ValueError):
+    """响应结构与预期不符（重试不会改变结果）"""
+
+    retryable = False
+
+
+@dataclass(slots=True)
+class ActionResult:
+    message: str
+    action_token: str
+    player: SideData
+    enemy: SideData
+    enemy_last_move: str
+    loot_options: list
+
+
+if msgspec is not None:
+    class _Bar(msgspec.Struct):
+        current: int
+        currentMax: Optional[int] = None
+
+    class _Move(msgspec.Struct):
+        currentATK: int
+        currentDEF: int
+        currentCharges: int
+
+    class _Player(msgspec.Struct):
+        health: _Bar
+        shield: _Bar
+        rock: _Move
+        paper: _Move
+        scissor: _Move
+        lastMove: Optional[str] = None
+
+    class _Run(msgspec.Struct):
+        players: list[_Player]
+        lootOptions: list[dict] = []
+
+    class _Data(msgspec.Struct):
+        run: _Run
+
+    class _Response(msgspec.Struct):
+        data: _Data
+        message: Optional[str] = ""
+        actionToken: Union[int, str, None] = None
+
+    _msgspec_decoder = msgspec.json.Decoder(_Response)
+
+
+def _side_from_struct(player) -> SideData:
+    return (
+        player.health.current,
+        player.shield.current,
+        (
+            (player.rock.currentATK, player.rock.currentDEF, player.rock.currentCharges),
+            (player.paper.currentATK, player.paper.currentDEF, player.paper.currentCharges),
+            (player.scissor.currentATK, player.scissor.currentDEF, player.scissor.currentCharges),
+        ),
+        player.health.currentMax if player.health.currentMax is not None else player.health.current,
+    )
+
+
+def _decode_msgspec(content: bytes) -> ActionResult:
+    try:
+        response = _msgspec_decoder.decode(content)
+    except msgspec.ValidationError as e:
+        raise SchemaError(str(e)) from e
+    except msgspec.DecodeError as e:
+        raise SchemaError(f"Invalid JSON: {e}") from e
+
+    players = response.data.run.players
+    if len(players) < 2:
+        raise SchemaError(f"Expected 2 players, got {len(players)} - at `$.data.run.players`")
+    return ActionResult(
+        message=response.message or "",
+        action_token=str(response.actionToken if response.actionToken is not None else ""),
+        player=_side_from_struct(players[0]),
+        enemy=_side_from_struct(players[1]),
+        enemy_last_move=players[1].lastMove or "未知",
+        loot_options=response.data.run.lootOptions,
+    )
+
+
+def _field(obj, key: str, path: str, kind=dict, optional: bool = False):
+    if not isinstance(obj, dict):
+        raise SchemaError(f"Expected `object`, got `{type(obj).__name__}` - at `{path}`")
+    if key not in obj:
+        if optional:
+            return None
+        raise SchemaError(f"Object missing required field `{key}` - at `{path}`")
+    value = obj[key]
+    if value is None and optional:
+        return None
+    # bool 是 int 的子类，需单独排除
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise SchemaError(f"Expected `{kind.__name__}`, got `{type(value).__name__}` - at `{path}.{key}`")
+    return value
+
+
+def _side_from_dict(player: dict, path: str) -> SideData:
+    health = _field(player, "health", path)
+    current = _field(health, "current", f"{path}.health", int)
+    current_max = _field(health, "currentMax", f"{path}.health", int, optional=True)
+    shield = _field(player, "shield", path)
+    moves = []
+    for name in MOVES:
+        move = _field(player, name, path)
+        move_path = f"{path}.{name}"
+        moves.append((
+            _field(move, "currentATK", move_path, int),
+            _field(move, "currentDEF", move_path, int),
+            _field(move, "currentCharges", move_path, int),
+        ))
+    return (
+        current,
+        _field(shield, "current", f"{path}.shield", int),
+        tuple(moves),
+        current_max if current_max is not None else current,
+    )
+
+
+def _decode_dict(result) -> ActionResult:
+    data = _field(result, "data", "$")
+    run = _field(data, "run", "$.data")
+    players = _field(run, "players", "$.data.run", list)
+    if len(players) < 2:
+        raise SchemaError(f"Expected 2 players, got {len(players)} - at `$.data.run.players`")
+    loot_options = _field(run, "lootOptions", "$.data.run", list, optional=True) or []
+    action_token = result.get("actionToken")
+    enemy_last_move = _field(players[1], "lastMove", "$.data.run.players[1]", str, optional=True)
+    return ActionResult(
+        message=_field(result, "message", "$", str, optional=True) or "",
+        action_token=str(action_token if action_token is not None else ""),
+        player=_side_from_dict(players[0], "$.data.run.players[0]"),
+        enemy=_side_from_dict(players[1], "$.data.run.players[1]"),
+        enemy_last_move=enemy_last_move or "未知",
+        loot_options=loot_options,
+    )
+
+
+def _decode_orjson(content: bytes) -> ActionResult:
+    try:
+        result = orjson.loads(content)
+    except orjson.JSONDecodeError as e:
+        raise SchemaError(f"Invalid JSON: {e}") from e
+    return _decode_dict(result)
+
+
+def _decode_json(content: bytes) -> ActionResult:
+    try:
+        result = json.loads(content)
+    except ValueError as e:
+        raise SchemaError(f"Invalid JSON: {e}") from e
+    return _decode_dict(result)
+
+
+DECODERS = {"json": _decode_json}
+if orjson is not None:
+    DECODERS["orjson"] = _decode_orjson
+if msgspec is not None:
+    DECODERS["msgspec"] = _decode_msgspec
+
+DEFAULT_BACKEND = "msgspec" if msgspec is not None else "orjson" if orjson is not None else "json"
+
+
+def decode_action_response(content: bytes, backend: str = DEFAULT_BACKEND) -> ActionResult:
+    """解码动作响应的原始字节，结构不符时抛出 SchemaError"""
+    return DECODERS[backend](content)
+
+
+def decode_action_dict(result: dict) -> ActionResult:
+    """解码已解析为 dict 的响应（如录制文件中的记录），结构不符时抛出 SchemaError"""
+    return _decode_dict(result)
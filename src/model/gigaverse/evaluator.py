@@ -0,0 +1,620 @@
+"""
+离线策略评估器。
+
+从 RunRecorder 录制的 /api/game/dungeon/action 历史中提取回合、房间和战利品选择，
+装入 NumPy 数组后按 solver.resolve_round 的规则批量结算，比较不同出招/战利品策略：
+
+- 回合评估：在每个历史回合上替换我方出招，按录制的敌方回应（或敌方所有合法回应的平均）
+  计算造成/承受的伤害、击杀率与阵亡率
+- 房间评估：从每个房间开局状态出发做多次模拟（敌方随机出合法招式），
+  得到每个房间的胜率，并按局累乘估算每局可通关的房间数
+- 战利品评估：把历史选择替换为策略的选择，模拟下一个房间的胜率
+
+模拟使用与求解器相同的规则实现，只有真实服务器的录制数据能说明策略在游戏中的效果；
+用 benchmarks/dungeon_server.py 替身服务器录制的数据评估时，结果只反映与规则说明的一致性。
+
+用法（在项目根目录）：
+    python -m src.model.gigaverse.evaluator data/recordings --rollouts 32
+"""
+import argparse
+import math
+import time
+from dataclasses import dataclass, fields
+from typing import Callable
+
+import numpy as np
+from tabulate import tabulate
+
+from src.model.gigaverse.decoder import SchemaError, SideData, decode_action_dict
+from src.model.gigaverse.loot import LOOT_ACTIONS, LootScorer
+from src.model.gigaverse.solver import BEATS, DEATH_PENALTY, KILL_BONUS, MAX_CHARGES, MoveSolver, score_move
+from src.model.gigaverse.state import MOVE_INDEX, MOVES
+from src.utils.recorder import iter_records
+
+ROCK, PAPER, SCISSOR = range(3)
+BOON_CODES = {
+    "AddMaxHealth": 0,
+    "AddMaxArmor": 1,
+    "Heal": 2,
+    "UpgradeRock": 3,
+    "UpgradePaper": 4,
+    "UpgradeScissor": 5,
+}
+ADD_MAX_HEALTH, ADD_MAX_ARMOR, HEAL, UPGRADE_ROCK = 0, 1, 2, 3
+# 未知 boon 类型与不足三个时补齐的空选项
+UNKNOWN_BOON, MISSING_OPTION = -1, -2
+
+# P_BEATS_E[p, e] 为我方出 p 时克制敌方出 e
+P_BEATS_E = np.array([[BEATS[p] == e for e in range(3)] for p in range(3)])
+E_BEATS_P = P_BEATS_E.T
+
+# 状态矩阵的列：血量、护盾、最大血量、三种招式的 ATK、DEF、Charges
+HEALTH, SHIELD, MAX_HEALTH = 0, 1, 2
+ATK, DEF, CHARGES = slice(3, 6), slice(6, 9), slice(9, 12)
+STATE_COLUMNS = 12
+
+
+def state_row(side: SideData) -> tuple:
+    """将解码得到的一方状态转换为状态矩阵的一行"""
+    health, shield, moves, max_health = side
+    return (
+        health, shield, max_health,
+        *(move[0] for move in moves), *(move[1] for move in moves), *(move[2] for move in moves),
+    )
+
+
+class Sides:
+    """N 个同一方状态组成的 (N, 12) int32 矩阵"""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: np.ndarray):
+        self.data = data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def health(self) -> np.ndarray:
+        return self.data[:, HEALTH]
+
+    @property
+    def shield(self) -> np.ndarray:
+        return self.data[:, SHIELD]
+
+    @property
+    def max_health(self) -> np.ndarray:
+        return self.data[:, MAX_HEALTH]
+
+    @property
+    def atk(self) -> np.ndarray:
+        return self.data[:, ATK]
+
+    @property
+    def defense(self) -> np.ndarray:
+        return self.data[:, DEF]
+
+    @property
+    def charges(self) -> np.ndarray:
+        return self.data[:, CHARGES]
+
+    def take(self, index) -> "Sides":
+        return Sides(self.data[index])
+
+    def repeat(self, times: int) -> "Sides":
+        return Sides(np.repeat(self.data, times, axis=0))
+
+
+# ---------- 规则（与 solver.resolve_round 一致） ----------
+
+def _legal_or_all(mask: np.ndarray) -> np.ndarray:
+    """没有任何合法招式的行视为三种招式都可出（与求解器一致）"""
+    return mask | ~mask.any(axis=1, keepdims=True)
+
+
+def legal_mask(side: Sides) -> np.ndarray:
+    return side.charges > 0
+
+
+def client_moves(side: Sides) -> np.ndarray:
+    """analyze_next_move 的可选招式：优先 Charges > 1，没有时退回 Charges > 0"""
+    preferred = side.charges >= 2
+    return np.where(preferred.any(axis=1, keepdims=True), preferred, side.charges >= 1)
+
+
+def first_available(mask: np.ndarray) -> np.ndarray:
+    """每行第一个可选招式，没有时为 rock"""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), ROCK)
+
+
+def damage_matrix(player: Sides, enemy: Sides) -> tuple[np.ndarray, np.ndarray]:
+    """返回 (对敌伤害, 对我伤害)，形状均为 (N, 我方招式, 敌方招式)"""
+    to_enemy = np.maximum(0, player.atk[:, :, None] - enemy.defense[:, None, :])
+    to_player = np.maximum(0, enemy.atk[:, None, :] - player.defense[:, :, None])
+    return np.where(E_BEATS_P, 0, to_enemy), np.where(P_BEATS_E, 0, to_player)
+
+
+def _take_damage(side: np.ndarray, damage: np.ndarray):
+    absorbed = np.minimum(side[:, SHIELD], damage)
+    side[:, HEALTH] -= damage - absorbed
+    side[:, SHIELD] -= absorbed
+
+
+def _spend_charges(side: np.ndarray, used: np.ndarray):
+    charges = side[:, CHARGES]
+    one_hot = np.arange(3) == used[:, None]
+    spent = charges - 1
+    spent[spent == 0] = -1
+    recovered = np.where(charges < MAX_CHARGES, charges + 1, charges)
+    side[:, CHARGES] = np.where(one_hot, spent, recovered)
+
+
+def resolve(player: Sides, enemy: Sides, p_move: np.ndarray, e_move: np.ndarray) -> tuple[Sides, Sides]:
+    """批量结算一回合，返回双方的新状态"""
+    rows = np.arange(len(player))
+    to_enemy, to_player = damage_matrix(player, enemy)
+    next_player, next_enemy = player.data.copy(), enemy.data.copy()
+    _take_damage(next_player, to_player[rows, p_move, e_move])
+    _take_damage(next_enemy, to_enemy[rows, p_move, e_move])
+    _spend_charges(next_player, p_move)
+    _spend_charges(next_enemy, e_move)
+    return Sides(next_player), Sides(next_enemy)
+
+
+def random_reply(enemy: Sides, rng: np.random.Generator) -> np.ndarray:
+    """敌方在合法招式中均匀随机出招"""
+    noise = rng.random((len(enemy), 3))
+    noise[~_legal_or_all(legal_mask(enemy))] = -1.0
+    return noise.argmax(axis=1)
+
+
+# ---------- 出招策略：policy(player, enemy, rng) -> (N,) 招式下标 ----------
+
+MovePolicy = Callable[[Sides, Sides, np.random.Generator], np.ndarray]
+
+
+def fallback_policy(player: Sides, enemy: Sides, rng: np.random.Generator) -> np.ndarray:
+    """GameClient._default_move：血量危急出 paper，敌人残血出 rock，否则第一个可选招式"""
+    mask = client_moves(player)
+    move = first_available(mask)
+    move = np.where((enemy.health + enemy.shield <= 5) & mask[:, ROCK], ROCK, move)
+    return np.where((player.health + player.shield <= 5) & mask[:, PAPER], PAPER, move)
+
+
+def greedy_policy(player: Sides, enemy: Sides, rng: np.random.Generator, risk_aversion: float = 1.0) -> np.ndarray:
+    """只看本回合：按敌方合法回应的平均收益（伤害差 + 击杀/阵亡奖惩）选择"""
+    to_enemy, to_player = damage_matrix(player, enemy)
+    enemy_left = enemy.health[:, None, None] - np.maximum(0, to_enemy - enemy.shield[:, None, None])
+    player_left = player.health[:, None, None] - np.maximum(0, to_player - player.shield[:, None, None])
+    score = (to_enemy - risk_aversion * to_player
+             + KILL_BONUS * (enemy_left <= 0) - DEATH_PENALTY * (player_left <= 0))
+    replies = _legal_or_all(legal_mask(enemy))[:, None, :]
+    expected = (score * replies).sum(axis=2) / replies.sum(axis=2)
+    mask = client_moves(player)
+    expected[~mask] = -np.inf
+    return np.where(mask.any(axis=1), expected.argmax(axis=1), ROCK)
+
+
+def random_policy(player: Sides, enemy: Sides, rng: np.random.Generator) -> np.ndarray:
+    noise = rng.random((len(player), 3))
+    mask = client_moves(player)
+    noise[~mask] = -1.0
+    return np.where(mask.any(axis=1), noise.argmax(axis=1), ROCK)
+
+
+class SolverPolicy:
+    """MoveSolver 逐状态求解；相同状态只求解一次"""
+
+    def __init__(self, solver: MoveSolver):
+        self.solver = solver
+
+    def __call__(self, player: Sides, enemy: Sides, rng: np.random.Generator) -> np.ndarray:
+        mask = client_moves(player)
+        keys = np.concatenate([player.data[:, [HEALTH, SHIELD]], player.data[:, 3:],
+                               enemy.data[:, [HEALTH, SHIELD]], enemy.data[:, 3:],
+                               mask.astype(np.int32)], axis=1)
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        choices = np.empty(len(unique), dtype=np.int64)
+        solver = self.solver
+        for i, key in enumerate(unique.tolist()):
+            p_side = (key[0], key[1], tuple(zip(key[2:5], key[5:8], key[8:11])))
+            e_side = (key[11], key[12], tuple(zip(key[13:16], key[16:19], key[19:22])))
+            candidates = [move for move, allowed in enumerate(key[22:25]) if allowed] or [ROCK]
+            choices[i] = max(candidates, key=lambda move: score_move(
+                p_side, e_side, move, solver.depth, solver.risk_aversion, solver.pessimism))
+        return choices[inverse.reshape(-1)]
+
+
+MOVE_POLICIES: dict[str, MovePolicy] = {
+    "fallback": fallback_policy,
+    "greedy": greedy_policy,
+    "solver": SolverPolicy(MoveSolver()),
+    "random": random_policy,
+}
+
+
+# ---------- 战利品策略：policy(player, options) -> (N,) 选项下标 ----------
+
+def loot_three_policy(player: Sides, options: np.ndarray) -> np.ndarray:
+    """choose_loot 的默认选择"""
+    return np.full(len(player), 2)
+
+
+def rarity_policy(player: Sides, options: np.ndarray) -> np.ndarray:
+    """选择 RARITY_CID 最高的选项，同稀有度选靠前的"""
+    rarity = np.where(options[:, :, 0] != MISSING_OPTION, options[:, :, 3], -1)
+    return rarity.argmax(axis=1)
+
+
+class ScorerLootPolicy:
+    """LootScorer 的向量化版本，使用同一张效用表"""
+
+    def __init__(self, scorer: LootScorer):
+        self.scorer = scorer
+        # 按 BOON_CODES 编码展开效用表，最后一行对应未知类型（编码 -1）
+        table = np.zeros((len(BOON_CODES) + 1, 3))
+        for boon, code in BOON_CODES.items():
+            table[code] = scorer.table[boon]
+        self.table = table
+
+    def __call__(self, player: Sides, options: np.ndarray) -> np.ndarray:
+        boon, val1, val2, rarity = (options[:, :, i] for i in range(4))
+        row = np.where(boon >= 0, boon, len(BOON_CODES))
+        per_val1, per_val2, health_scaled = (self.table[row, i] for i in range(3))
+        missing = np.maximum(player.max_health - player.health, 0)[:, None]
+        val1 = np.where(boon == HEAL, np.minimum(val1, missing), val1)
+        max_health = np.maximum(player.max_health, 1)[:, None]
+        scale = np.where(health_scaled > 0, 1 + self.scorer.low_health_bonus * missing / max_health, 1.0)
+        score = self.scorer.rarity * rarity + (per_val1 * val1 + per_val2 * val2) * scale
+        score[boon == MISSING_OPTION] = -np.inf
+        return score.argmax(axis=1)
+
+
+LOOT_POLICIES: dict[str, Callable[[Sides, np.ndarray], np.ndarray]] = {
+    "loot_three": loot_three_policy,
+    "rarity": rarity_policy,
+    "score": ScorerLootPolicy(LootScorer()),
+}
+
+
+def loot_row(option) -> tuple:
+    """战利品选项 -> (类型编码, selectedVal1, selectedVal2, RARITY_CID)"""
+    if not isinstance(option, dict):
+        return (MISSING_OPTION, 0, 0, 0)
+    return (
+        BOON_CODES.get(option.get("boonTypeString"), UNKNOWN_BOON),
+        int(option.get("selectedVal1") or 0),
+        int(option.get("selectedVal2") or 0),
+        int(option.get("RARITY_CID") or 0),
+    )
+
+
+def apply_loot(player: Sides, options: np.ndarray, choice: np.ndarray) -> Sides:
+    """批量应用所选战利品"""
+    chosen = options[np.arange(len(player)), choice]
+    boon, val1, val2 = chosen[:, 0], chosen[:, 1], chosen[:, 2]
+    data = player.data.copy()
+    data[:, MAX_HEALTH] += np.where(boon == ADD_MAX_HEALTH, val1, 0)
+    data[:, HEALTH] += np.where(boon == ADD_MAX_HEALTH, val1, 0)
+    data[:, HEALTH] = np.where(boon == HEAL, np.minimum(data[:, MAX_HEALTH], data[:, HEALTH] + val1), data[:, HEALTH])
+    data[:, SHIELD] += np.where(boon == ADD_MAX_ARMOR, val1, 0)
+    upgraded = (np.arange(3) == (boon - UPGRADE_ROCK)[:, None]) & (boon >= UPGRADE_ROCK)[:, None]
+    data[:, ATK] += upgraded * val1[:, None]
+    data[:, DEF] += upgraded * val2[:, None]
+    return Sides(data)
+
+
+# ---------- 录制历史 ----------
+
+@dataclass
+class History:
+    """从录制记录中提取的数组；各 run 列为局的编号"""
+
+    # 回合：出招前双方状态、我方出招、敌方回应、结算后双方状态
+    turn_player: np.ndarray
+    turn_enemy: np.ndarray
+    turn_move: np.ndarray
+    turn_reply: np.ndarray
+    turn_next_player: np.ndarray
+    turn_next_enemy: np.ndarray
+    turn_run: np.ndarray
+    # 房间：开局双方状态、是否获胜
+    room_player: np.ndarray
+    room_enemy: np.ndarray
+    room_run: np.ndarray
+    room_number: np.ndarray
+    room_won: np.ndarray
+    # 战利品：选择前我方状态、选项 (N, 3, 4)、录制的选择、选择后（下一个房间开局）双方状态
+    loot_player: np.ndarray
+    loot_options: np.ndarray
+    loot_choice: np.ndarray
+    loot_next_player: np.ndarray
+    loot_next_enemy: np.ndarray
+
+    def save(self, path: str):
+        np.savez_compressed(path, **{field.name: getattr(self, field.name) for field in fields(self)})
+
+    @classmethod
+    def load(cls, path: str) -> "History":
+        with np.load(path) as data:
+            return cls(**{field.name: data[field.name] for field in fields(cls)})
+
+    @classmethod
+    def from_recordings(cls, path: str) -> "History":
+        """按录制顺序回放每一局，相邻两次成功响应构成一个回合或一次战利品选择"""
+        rows = {field.name: [] for field in fields(cls)}
+        runs: dict[str, int] = {}
+        last: dict[str, tuple] = {}
+        rooms: dict[tuple, int] = {}
+
+        for record in iter_records(path):
+            response = record.get("response")
+            if record.get("status") != 200 or not isinstance(response, dict):
+                continue
+            try:
+                result = decode_action_dict(response)
+            except SchemaError:
+                continue
+            room = ((response.get("data") or {}).get("run") or {}).get("ROOM_NUM_CID", 0)
+            run_id, action = record.get("run", ""), record.get("action")
+            run = runs.setdefault(run_id, len(runs))
+            previous = last.get(run_id)
+            last[run_id] = (result, room)
+            if previous is None:
+                continue
+            before, before_room = previous
+            player, enemy = state_row(before.player), state_row(before.enemy)
+
+            if action in MOVE_INDEX:
+                reply = MOVE_INDEX.get(result.enemy_last_move)
+                if reply is None:
+                    continue
+                room_key = (run, before_room)
+                if room_key not in rooms:
+                    rooms[room_key] = len(rows["room_run"])
+                    rows["room_player"].append(player)
+                    rows["room_enemy"].append(enemy)
+                    rows["room_run"].append(run)
+                    rows["room_number"].append(before_room)
+                    rows["room_won"].append(False)
+                if result.player[0] > 0 and result.enemy[0] <= 0:
+                    rows["room_won"][rooms[room_key]] = True
+                rows["turn_player"].append(player)
+                rows["turn_enemy"].append(enemy)
+                rows["turn_move"].append(MOVE_INDEX[action])
+                rows["turn_reply"].append(reply)
+                rows["turn_next_player"].append(state_row(result.player))
+                rows["turn_next_enemy"].append(state_row(result.enemy))
+                rows["turn_run"].append(run)
+            elif action in LOOT_ACTIONS and before.loot_options:
+                options = [loot_row(option) for option in before.loot_options[:3]]
+                options += [(MISSING_OPTION, 0, 0, 0)] * (3 - len(options))
+                rows["loot_player"].append(player)
+                rows["loot_options"].append(options)
+                rows["loot_choice"].append(LOOT_ACTIONS.index(action))
+                rows["loot_next_player"].append(state_row(result.player))
+                rows["loot_next_enemy"].append(state_row(result.enemy))
+
+        arrays = {}
+        for name, values in rows.items():
+            if name == "room_won":
+                arrays[name] = np.array(values, dtype=bool)
+            elif name == "loot_options":
+                arrays[name] = np.array(values, dtype=np.int32).reshape(-1, 3, 4)
+            elif name.endswith(("_player", "_enemy")):
+                arrays[name] = np.array(values, dtype=np.int32).reshape(-1, STATE_COLUMNS)
+            else:
+                arrays[name] = np.array(values, dtype=np.int32)
+        return cls(**arrays)
+
+
+def load_history(path: str, cache: str = "") -> History:
+    """读取录制目录；cache 为 .npz 路径时优先使用并在首次读取后写入"""
+    if cache:
+        try:
+            return History.load(cache)
+        except FileNotFoundError:
+            pass
+    history = History.from_recordings(path)
+    if cache:
+        history.save(cache)
+    return history
+
+
+# ---------- 评估 ----------
+
+def evaluate_turns(history: History, moves: np.ndarray, reply: str = "recorded") -> dict:
+    """
+    在历史回合上评估给定出招。
+    reply="recorded" 时假设敌方回应与我方出招无关，使用录制的回应；
+    reply="uniform" 时对敌方所有合法回应取平均。
+    """
+    player, enemy = Sides(history.turn_player), Sides(history.turn_enemy)
+    n = len(player)
+    if not n:
+        return {"turns": 0}
+    rows = np.arange(n)
+    to_enemy, to_player = damage_matrix(player, enemy)
+    dealt, taken = to_enemy[rows, moves], to_player[rows, moves]
+    kills = enemy.health[:, None] - np.maximum(0, dealt - enemy.shield[:, None]) <= 0
+    deaths = player.health[:, None] - np.maximum(0, taken - player.shield[:, None]) <= 0
+    if reply == "recorded":
+        pick = history.turn_reply[:, None]
+        dealt, taken = np.take_along_axis(dealt, pick, 1), np.take_along_axis(taken, pick, 1)
+        kills, deaths = np.take_along_axis(kills, pick, 1), np.take_along_axis(deaths, pick, 1)
+        weights = np.ones((n, 1))
+    else:
+        weights = _legal_or_all(legal_mask(enemy)).astype(float)
+    weights /= weights.sum(axis=1, keepdims=True)
+    return {
+        "turns": n,
+        "agreement": float((moves == history.turn_move).mean()),
+        "damage_dealt": float((dealt * weights).sum(axis=1).mean()),
+        "damage_taken": float((taken * weights).sum(axis=1).mean()),
+        "kill_rate": float((kills * weights).sum(axis=1).mean()),
+        "death_rate": float((deaths * weights).sum(axis=1).mean()),
+    }
+
+
+def model_fit(history: History) -> float:
+    """本地规则对录制回合的还原率（录制的出招与回应结算后与服务器返回的状态一致的比例）"""
+    if not len(history.turn_move):
+        return math.nan
+    player, enemy = resolve(Sides(history.turn_player), Sides(history.turn_enemy),
+                            history.turn_move, history.turn_reply)
+    cols = [HEALTH, SHIELD]
+    return float((
+        (player.data[:, cols] == history.turn_next_player[:, cols]).all(axis=1)
+        & (enemy.data[:, cols] == history.turn_next_enemy[:, cols]).all(axis=1)
+    ).mean())
+
+
+@dataclass
+class RolloutResult:
+    win_rate: np.ndarray  # (N,) 每个开局状态的胜率
+    turns: float          # 平均回合数
+    health_left: float    # 获胜时的平均剩余血量
+
+
+def simulate(player: Sides, enemy: Sides, policy: MovePolicy, rollouts: int = 32,
+             max_turns: int = 100, seed: int = 0) -> RolloutResult:
+    """从每个开局状态模拟 rollouts 次，敌方随机出合法招式；超过 max_turns 视为未获胜"""
+    rng = np.random.default_rng(seed)
+    n = len(player)
+    won = np.zeros(n * rollouts, dtype=bool)
+    turns = np.full(n * rollouts, max_turns)
+    health_left = np.zeros(n * rollouts)
+    index = np.arange(n * rollouts)
+    player, enemy = player.repeat(rollouts), enemy.repeat(rollouts)
+    for turn in range(1, max_turns + 1):
+        if not len(index):
+            break
+        player, enemy = resolve(player, enemy, policy(player, enemy, rng), random_reply(enemy, rng))
+        lost = player.health <= 0
+        victory = ~lost & (enemy.health <= 0)
+        finished = lost | victory
+        done = index[finished]
+        won[done] = victory[finished]
+        turns[done] = turn
+        health_left[done] = np.maximum(player.health[finished], 0)
+        keep = ~finished
+        index, player, enemy = index[keep], player.take(keep), enemy.take(keep)
+    return RolloutResult(
+        win_rate=won.reshape(n, rollouts).mean(axis=1) if n else np.zeros(0),
+        turns=float(turns.mean()) if n else 0.0,
+        health_left=float(health_left[won].mean()) if won.any() else 0.0,
+    )
+
+
+def rooms_cleared(run: np.ndarray, room: np.ndarray, win_rate: np.ndarray) -> float:
+    """
+    每局预期通关的房间数：按房间号顺序累乘胜率后求和。
+    只统计录制中出现过的房间，因此是上限受录制进度限制的估计。
+    """
+    if not len(run):
+        return 0.0
+    order = np.lexsort((room, run))
+    run, log_p = run[order], np.log(np.clip(win_rate[order], 1e-12, 1.0))
+    cumulative = np.cumsum(log_p)
+    starts = np.flatnonzero(np.r_[True, run[1:] != run[:-1]])
+    group = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(run)]))
+    survive = np.exp(cumulative - (cumulative[starts] - log_p[starts])[group])
+    return float(np.bincount(group, weights=survive).mean())
+
+
+def evaluate_rooms(history: History, policy: MovePolicy, rollouts: int = 32, seed: int = 0) -> dict:
+    result = simulate(Sides(history.room_player), Sides(history.room_enemy), policy, rollouts, seed=seed)
+    return {
+        "rooms": len(history.room_run),
+        "win_rate": float(result.win_rate.mean()) if len(result.win_rate) else 0.0,
+        "turns": result.turns,
+        "health_left": result.health_left,
+        "rooms_per_run": rooms_cleared(history.room_run, history.room_number, result.win_rate),
+    }
+
+
+def evaluate_loot(history: History, loot_policy, move_policy: MovePolicy = fallback_policy,
+                  rollouts: int = 32, seed: int = 0) -> dict:
+    """
+    将录制的战利品选择替换为策略的选择，模拟下一个房间。
+    下一房间的开局状态 = 录制的开局状态 + (策略选项的效果 - 录制选项的效果)，
+    效果按选择前的状态计算（Heal 的上限截断为近似）。
+    """
+    player, options = Sides(history.loot_player), history.loot_options
+    if not len(player):
+        return {"decisions": 0}
+    choice = loot_policy(player, options)
+    delta = apply_loot(player, options, choice).data - apply_loot(player, options, history.loot_choice).data
+    delta[:, CHARGES] = 0
+    start = history.loot_next_player + delta
+    start[:, SHIELD] = np.maximum(start[:, SHIELD], 0)
+    start[:, HEALTH] = np.clip(start[:, HEALTH], 1, np.maximum(start[:, MAX_HEALTH], 1))
+    result = simulate(Sides(start), Sides(history.loot_next_enemy), move_policy, rollouts, seed=seed)
+    rows = np.arange(len(player))
+    return {
+        "decisions": len(player),
+        "agreement": float((choice == history.loot_choice).mean()),
+        "rarity": float(options[rows, choice, 3].mean()),
+        "next_room_win_rate": float(result.win_rate.mean()),
+        "health_left": result.health_left,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate move and loot policies on recorded dungeon runs")
+    parser.add_argument("path", help="recording directory or segment file (RECORDER.DIRECTORY)")
+    parser.add_argument("--cache", default="", help="load/store the extracted arrays in this .npz file")
+    parser.add_argument("--moves", default=",".join(MOVE_POLICIES), help="comma-separated move policies")
+    parser.add_argument("--loot", default=",".join(LOOT_POLICIES), help="comma-separated loot policies")
+    parser.add_argument("--rollouts", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    history = load_history(args.path, args.cache)
+    print(f"loaded {len(history.turn_move)} turns, {len(history.room_run)} rooms, "
+          f"{len(history.loot_choice)} loot choices in {time.perf_counter() - started:.2f}s; "
+          f"rule fit {model_fit(history):.1%}")
+
+    rng = np.random.default_rng(args.seed)
+    move_rows = [["recorded", *_turn_columns(history, history.turn_move), "", "", ""]]
+    for name in args.moves.split(","):
+        policy = MOVE_POLICIES[name]
+        started = time.perf_counter()
+        moves = policy(Sides(history.turn_player), Sides(history.turn_enemy), rng)
+        rooms = evaluate_rooms(history, policy, args.rollouts, args.seed)
+        move_rows.append([
+            name, *_turn_columns(history, moves),
+            f"{rooms['win_rate']:.1%}", f"{rooms['rooms_per_run']:.2f}", f"{time.perf_counter() - started:.2f}s",
+        ])
+    recorded_rooms = np.bincount(history.room_run, weights=history.room_won).mean() if len(history.room_run) else 0
+    print(tabulate(move_rows, headers=[
+        "move policy", "agree", "dealt", "taken", "kill", "death", "dealt (avg reply)", "taken (avg reply)",
+        "room win", "rooms/run", "time",
+    ]))
+    print(f"recorded: room win {history.room_won.mean() if len(history.room_won) else 0:.1%}, "
+          f"rooms/run {recorded_rooms:.2f}\n")
+
+    loot_rows = []
+    for name in args.loot.split(","):
+        result = evaluate_loot(history, LOOT_POLICIES[name], rollouts=args.rollouts, seed=args.seed)
+        if result["decisions"]:
+            loot_rows.append([name, f"{result['agreement']:.1%}", f"{result['rarity']:.2f}",
+                              f"{result['next_room_win_rate']:.1%}", f"{result['health_left']:.1f}"])
+    print(tabulate(loot_rows, headers=["loot policy", "agree", "rarity", "next room win", "hp left"]))
+
+
+def _turn_columns(history: History, moves: np.ndarray) -> list:
+    recorded = evaluate_turns(history, moves, "recorded")
+    if not recorded["turns"]:
+        return ["", "", "", "", "", "", ""]
+    uniform = evaluate_turns(history, moves, "uniform")
+    return [
+        f"{recorded['agreement']:.1%}", f"{recorded['damage_dealt']:.2f}", f"{recorded['damage_taken']:.2f}",
+        f"{recorded['kill_rate']:.1%}", f"{recorded['death_rate']:.1%}",
+        f"{uniform['damage_dealt']:.2f}", f"{uniform['damage_taken']:.2f}",
+    ]
+
+
+if __name__ == "__main__":
+    main()
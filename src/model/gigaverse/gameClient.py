@@ -1,11 +1,25 @@
 import asyncio
+import contextlib
 import logging
 import random
-from aiohttp import ClientSession
+import time
 from typing import Tuple, Optional
 from src.model.deepseek.deepseek import ask_deepseek
+from src.model.gpt.gpt import ask_chatgpt
+from src.model.gigaverse.decision_service import get_decision_service
+from src.model.gigaverse.decoder import ActionResult, SchemaError, decode_action_response
+from src.model.gigaverse.loot import LootScorer
+from src.model.gigaverse.solver import MoveSolver, legal_moves, resolve_round, side_from_status, status_from_side
+from src.model.gigaverse.state import MOVE_INDEX, MOVES, Combatant
 from src.utils.constants import Account
-from curl_cffi.requests import AsyncSession
+from src.utils.decision_cache import get_decision_cache
+from src.utils.log import DEBUG, INFO, WARNING, get_event_logs
+from src.utils.metrics import ACTION_LATENCY, ACTION_RESULTS, DECISION_TIME, PACING_WAIT, RESPONSE_DECODE, UPDATE_STATUS
+from src.utils.pacing import get_pacers, parse_retry_after
+from src.utils.proxy_manager import PROXY_AUTH_REQUIRED, ProxyUnavailableError, get_proxy_manager, is_proxy_failure
+from src.utils.recorder import RECORD_VERSION, get_recorder
+from src.utils.retry import FatalError, RetryableError, error_for_status, get_breaker, retry_policy
+from src.utils.transport import get_transport_pool, mask_proxy, normalize_proxy
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
@@ -54,34 +68,60 @@ REFERENCED_MESSAGES_SYSTEM_PROMPT = """
 class GameClient:
     def __init__(self,
             account: Account,
-            client: AsyncSession,
             config: Config):
+        # 游戏请求通过按代理共享的 httpx 连接池（TransportPool）发送，不使用 curl_cffi 会话
         self.account = account
-        self.client = client
         self.config = config
         self.current_action_token = ""
-        self.player = {
-            "health": None,
-            "shield": None,
-            "max_health": None,
-            "moves": {
-                "rock": {"currentATK": 0, "currentDEF": 0, "currentCharges": 0},
-                "paper": {"currentATK": 0, "currentDEF": 0, "currentCharges": 0},
-                "scissor": {"currentATK": 0, "currentDEF": 0, "currentCharges": 0}
-            }
-        }
-        self.enemy = {
-            "health": None,
-            "shield": None,
-            "moves": {
-                "rock": {"currentATK": 0, "currentDEF": 0, "currentCharges": 0},
-                "paper": {"currentATK": 0, "currentDEF": 0, "currentCharges": 0},
-                "scissor": {"currentATK": 0, "currentDEF": 0, "currentCharges": 0}
-            }
-        }
+        # 双方状态对象只创建一次，之后每回合原地更新
+        self.player = Combatant()
+        self.enemy = Combatant()
         self.loot_options = []
         self.last_enemy_move = None
-        self.result_json = None
+        self.solver = MoveSolver.from_config(config) if config.DECISION.MOVE_SOLVER else None
+        self.loot_scorer = LootScorer.from_config(config) if config.LOOT.SCORER else None
+        self.retry = retry_policy("game", config)
+        self.game_breaker = get_breaker("gigaverse")
+        self.proxies = get_proxy_manager() if config.PROXIES.ENABLED else None
+        self.decision_cache = get_decision_cache() if config.DECISION_CACHE.ENABLED else None
+        self.decision_service = (
+            get_decision_service(REFERENCED_MESSAGES_SYSTEM_PROMPT) if config.DECISION.BATCH_ENABLED else None
+        )
+        # 战斗热路径使用结构化事件：级别/采样未通过时不做格式化，只记入环形缓冲区
+        self.events = get_event_logs().for_account(account.index)
+        self.turn_sample_rate = config.LOGGING.TURN_SAMPLE_RATE
+        # 可选的动作录制：每局一个 run_id，step 为该局内已发送动作的序号
+        self.recorder = get_recorder() if config.RECORDER.ENABLED else None
+        self.run_id = ""
+        self.dungeon_id = 0
+        self.run_step = 0
+
+    async def _llm_referenced_messages(self, main_message_content: str, referenced_message_content: str) -> str:
+        """按配置的LLM_PROVIDER生成回复，若失败返回空字符串"""
+        if self.config.DECISION.LLM_PROVIDER == "chatgpt":
+            return await self._chatgpt_referenced_messages(main_message_content, referenced_message_content)
+        return await self._deepseek_referenced_messages(main_message_content, referenced_message_content)
+
+    async def _chatgpt_referenced_messages(self, main_message_content: str, referenced_message_content: str) -> str:
+        """使用ChatGPT生成回复，若失败返回空字符串"""
+        try:
+            api_key = random.choice(self.config.CHAT_GPT.API_KEYS)
+            user_message = f"消息1: {referenced_message_content}\n消息2: {main_message_content}"
+            success, response = await ask_chatgpt(
+                api_key=api_key,
+                model=self.config.CHAT_GPT.MODEL,
+                user_message=user_message,
+                prompt=REFERENCED_MESSAGES_SYSTEM_PROMPT,
+                proxy=self.config.CHAT_GPT.PROXY_FOR_CHAT_GPT,
+            )
+
+            if not success:
+                logger.warning(f"{self.account.index} | ChatGPT API失败: {response}")
+                return ""
+            return response
+        except Exception as e:
+            logger.warning(f"{self.account.index} | ChatGPT错误: {str(e)}")
+            return ""
 
     async def _deepseek_referenced_messages(self, main_message_content: str, referenced_message_content: str) -> str:
         """使用DeepSeek生成回复，若失败返回空字符串"""
@@ -112,13 +152,9 @@ class GameClient:
             consumables: list = None,
             item_id: int = 0,
             index: int = 0
-    ) -> Tuple[bool, dict]:
-        """发送游戏动作到API，失败时重试3次，3次失败后结束任务"""
-        proxy = self.account.proxy
-        if proxy and not proxy.startswith(("http://", "https://", "socks5://", "socks5h://")):
-            proxy = f"http://{proxy}"
-        masked_proxy = (
-            f"{proxy.split('://')[0]}://[hidden]@{proxy.split('@')[-1]}" if proxy else "None") if proxy else "None"
+    ) -> Tuple[bool, Optional[ActionResult]]:
+        """发送游戏动作到API，可重试的错误按退避重试，token 过期等不可重试的错误直接结束任务"""
+        proxies = self.proxies
 
         headers = {
             "accept": "*/*",
@@ -150,121 +186,183 @@ class GameClient:
             }
         }
 
-        max_retries = 5
-        retry_delay = 3  # 每次重试等待2秒
-
-        for attempt in range(max_retries):
+        # 动作间隔由自适应节奏控制（按账户和按代理），失败后按统一的重试策略退避，
+        # 游戏接口熔断时所有账户暂停发送
+        pacers = get_pacers()
+        account_pacer = pacers.for_account(self.account.index)
+        attempt = 0
+
+        async def send_once() -> ActionResult:
+            nonlocal attempt
+            attempt += 1
+            if attempt > 1:
+                # 原实现在每次重试之前固定等待
+                account_pacer.note_baseline_sleep()
+            # 每次尝试都重新选择代理：重试期间代理被隔离时改用备用代理，没有可用代理时抛出 ProxyUnavailableError
+            proxy = proxies.require(self.account) if proxies else normalize_proxy(self.account.proxy)
+            # 同一代理下的账户共享长连接客户端，避免每次请求重新握手
+            client = get_transport_pool().get(proxy)
+            proxy_pacer = pacers.for_proxy(proxy)
+            waited = await account_pacer.wait()
+            PACING_WAIT.observe(waited, "account")
+            proxy_waited = await proxy_pacer.wait()
+            PACING_WAIT.observe(proxy_waited, "proxy")
+            waited += proxy_waited
+            started_at = time.monotonic()
             try:
-                async with ClientSession() as client:
-                    logger.info(headers)
-                    logger.info(json_data)
-                    logger.info(
-                        f"{self.account.index} | 发送动作: {action} (token: {action_token}, proxy: {masked_proxy}, 尝试次数: {attempt + 1}/{max_retries})")
+                self.events.event(DEBUG, "action_send", action=action, token=action_token, attempt=attempt)
+                async with proxies.slot(proxy) if proxies else contextlib.nullcontext():
+                    # 等待代理并发名额的时间不计入延迟，否则受并发上限限制的代理会拉高自己的延迟评分
+                    started_at = time.monotonic()
                     response = await client.post(
-                        "https://gigaverse.io/api/game/dungeon/action",
+                        self.config.NETWORK.GAME_API_URL,
                         headers=headers,
                         json=json_data,
-                        proxy= None  # 使用proxy参数而不是None
                     )
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"{self.account.index} | 动作失败: {response.status} - {error_text}")
-                        if attempt < max_retries - 1:
-                            logger.info(f"{self.account.index} | 将在 {retry_delay} 秒后重试...")
-                            await asyncio.sleep(retry_delay)
-                            continue
-                        raise RuntimeError(f"动作 {action} 在 {max_retries} 次尝试后失败，终止任务")
-
-                    result = await response.json()
-                    logger.info(f"{self.account.index} | 动作成功: {action}")
-                    return True, result
-
             except Exception as e:
-                logger.error(f"{self.account.index} | 发送动作异常: {str(e)} (尝试次数: {attempt + 1}/{max_retries})")
-                if attempt < max_retries - 1:
-                    logger.info(f"{self.account.index} | 将在 {retry_delay} 秒后重试...")
-                    await asyncio.sleep(retry_delay)
-                    continue
-                logger.error(f"{self.account.index} | 动作 {action} 在 {max_retries} 次尝试后仍然失败，终止任务")
-                raise RuntimeError(f"动作 {action} 在 {max_retries} 次尝试后失败，终止任务") from e
-
-        # 此行理论上不会执行，因为失败时会抛出异常，但保留以保持逻辑完整性
-        logger.error(f"{self.account.index} | 动作 {action} 在 {max_retries} 次尝试后仍然失败")
-        return False, {}
-
-    def update_status(self, result: dict):
-        """从返回结果更新状态，直接使用lastMove获取敌方动作"""
-        players = result["data"]["run"]["players"]
-        player, enemy = players[0], players[1]
-
-
-        self.player.update({
-            "health": player["health"]["current"],
-            "shield": player["shield"]["current"],
-            "max_health": player["health"].get("currentMax", player["health"]["current"]),
-            "moves": {
-                "rock": {
-                    "currentATK": player["rock"]["currentATK"],
-                    "currentDEF": player["rock"]["currentDEF"],
-                    "currentCharges": player["rock"]["currentCharges"]
-                },
-                "paper": {
-                    "currentATK": player["paper"]["currentATK"],
-                    "currentDEF": player["paper"]["currentDEF"],
-                    "currentCharges": player["paper"]["currentCharges"]
-                },
-                "scissor": {
-                    "currentATK": player["scissor"]["currentATK"],
-                    "currentDEF": player["scissor"]["currentDEF"],
-                    "currentCharges": player["scissor"]["currentCharges"]
-                }
-            }
-        })
-        self.enemy.update({
-            "health": enemy["health"]["current"],
-            "shield": enemy["shield"]["current"],
-            "moves": {
-                "rock": {
-                    "currentATK": enemy["rock"]["currentATK"],
-                    "currentDEF": enemy["rock"]["currentDEF"],
-                    "currentCharges": enemy["rock"]["currentCharges"]
-                },
-                "paper": {
-                    "currentATK": enemy["paper"]["currentATK"],
-                    "currentDEF": enemy["paper"]["currentDEF"],
-                    "currentCharges": enemy["paper"]["currentCharges"]
-                },
-                "scissor": {
-                    "currentATK": enemy["scissor"]["currentATK"],
-                    "currentDEF": enemy["scissor"]["currentDEF"],
-                    "currentCharges": enemy["scissor"]["currentCharges"]
-                }
-            }
-        })
-        self.current_action_token = str(result.get("actionToken", ""))
-        self.loot_options = result["data"]["run"].get("lootOptions", [])
-        self.last_enemy_move = enemy.get("lastMove", "未知")
-        self.result_json = result
-
-    async def analyze_next_move(self) -> str:
-        """使用AI分析下一步出招，强制不使用Charges为1的招式"""
-        available_moves = [m for m, data in self.player["moves"].items() if data["currentCharges"] > 1]  # 强制只选Charges > 1
+                latency = time.monotonic() - started_at
+                if proxies and is_proxy_failure(e):
+                    proxies.record(proxy, None, False)
+                account_pacer.record(None, latency)
+                proxy_pacer.record(None, latency)
+                ACTION_LATENCY.observe(latency, action)
+                ACTION_RESULTS.inc(action, "error")
+                if self.recorder:
+                    self._record_action(json_data, attempt, None, latency, waited, error=str(e))
+                logger.error(f"{self.account.index} | 发送动作异常: {str(e)} (proxy: {mask_proxy(proxy)}, 尝试次数: {attempt}/{self.retry.attempts})")
+                raise RetryableError(f"动作 {action} 发送异常: {e}") from e
+
+            latency = time.monotonic() - started_at
+            if proxies:
+                proxies.record(proxy, latency, response.status_code != PROXY_AUTH_REQUIRED)
+            retry_after = parse_retry_after(response.headers.get("retry-after"))
+            account_pacer.record(response.status_code, latency, retry_after)
+            proxy_pacer.record(response.status_code, latency, retry_after)
+            ACTION_LATENCY.observe(latency, action)
+            ACTION_RESULTS.inc(action, response.status_code)
+            if self.recorder:
+                self._record_action(json_data, attempt, response.status_code, latency, waited, response.content)
+
+            if response.status_code != 200:
+                error_text = response.text
+                # 单次失败会被重试，只记录响应的前 200 个字符；最终失败时另有错误日志
+                self.events.event(WARNING, "action_failed", action=action, status=response.status_code,
+                                  body=error_text[:200], attempt=attempt, attempts=self.retry.attempts)
+                if response.status_code == PROXY_AUTH_REQUIRED:
+                    # 407 是代理的问题而不是账户的问题：代理已记录失败（达到阈值后被隔离），账户稍后重试
+                    raise ProxyUnavailableError(
+                        f"动作 {action} 失败: 代理 {mask_proxy(proxy)} 需要认证 (407)",
+                        PROXY_AUTH_REQUIRED,
+                        retry_after,
+                    )
+                raise error_for_status(
+                    response.status_code,
+                    f"动作 {action} 失败: {response.status_code} - {error_text[:200]}",
+                    retry_after,
+                )
+
+            decode_started = time.perf_counter()
+            try:
+                result = decode_action_response(response.content)
+                RESPONSE_DECODE.observe(time.perf_counter() - decode_started)
+            except SchemaError as e:
+                # 结构不符不会因重试而改变，直接终止任务
+                logger.error(f"{self.account.index} | 动作 {action} 响应结构不符: {e}")
+                raise
+            self.events.event(DEBUG, "action_ok", action=action, latency=round(latency, 3))
+            return result
+
+        try:
+            result = await self.retry.call(send_once, "game_action", breaker=self.game_breaker)
+        except FatalError as e:
+            logger.error(f"{self.account.index} | 动作 {action} 不可重试，终止任务: {e}")
+            raise
+        except ProxyUnavailableError as e:
+            # 保留 retry_after，调度器在代理隔离结束后再执行该账户
+            logger.error(f"{self.account.index} | 动作 {action} 没有可用代理，终止任务: {e}")
+            raise
+        except RetryableError as e:
+            # 原样抛出，保留 status 和 retry_after（如 429 的 Retry-After），调度器按其安排下一次执行
+            logger.error(f"{self.account.index} | 动作 {action} 在 {attempt} 次尝试后仍然失败，终止任务: {e}")
+            raise
+        return True, result
+
+    def _record_action(self, request: dict, attempt: int, status: Optional[int], latency: float,
+                       waited: float, content: bytes = b"", error: str = ""):
+        """录制一次动作请求与响应，响应体由录制线程解析"""
+        self.run_step += 1
+        record = {
+            "v": RECORD_VERSION,
+            "ts": round(time.time(), 3),
+            "account": self.account.index,
+            "run": self.run_id,
+            "dungeon": self.dungeon_id,
+            "step": self.run_step,
+            "action": request["action"],
+            "attempt": attempt,
+            "status": status,
+            "latency": round(latency, 4),
+            "wait": round(waited, 4),
+            "request": request,
+        }
+        if error:
+            record["error"] = error
+        self.recorder.record(record, content)
+
+    def update_status(self, result: ActionResult):
+        """从解码后的响应原地更新状态，直接使用lastMove获取敌方动作"""
+        started = time.perf_counter()
+        self.player.set(*result.player)
+        self.enemy.set(*result.enemy)
+        self.current_action_token = result.action_token
+        self.loot_options = result.loot_options
+        self.last_enemy_move = result.enemy_last_move
+        UPDATE_STATUS.observe(time.perf_counter() - started)
+
+    async def analyze_next_move(self, player: Optional[Combatant] = None, enemy: Optional[Combatant] = None) -> str:
+        """
+        分析下一步出招，强制不使用Charges为1的招式；LLM仅作为可选参考，默认由本地求解器决定。
+        不传 player/enemy 时使用当前状态，传入时用于推测状态的预计算。
+        """
+        player = self.player if player is None else player
+        enemy = self.enemy if enemy is None else enemy
+        available_moves = player.available_moves(min_charges=2)  # 强制只选Charges > 1
         if not available_moves:
             logger.warning(f"{self.account.index} | 无Charges > 1的招式，检查Charges > 0的招式")
-            available_moves = [m for m, data in self.player["moves"].items() if data["currentCharges"] > 0]
+            available_moves = player.available_moves(min_charges=1)
             if not available_moves:
                 logger.warning(f"{self.account.index} | 无可用招式，默认选择rock")
                 return "rock"
 
+        if self.config.DECISION.USE_LLM_FOR_MOVES:
+            suggestion = await self._ask_llm_move(available_moves, player, enemy)
+            if suggestion:
+                return suggestion
+
+        if self.solver:
+            move = self.solver.best_move(player, enemy, available_moves)
+            self.events.event(DEBUG, "solver_move", move=move)
+            return move
+
+        return self._default_move(available_moves, player, enemy)
+
+    async def _ask_llm_move(self, available_moves: list, player: Combatant, enemy: Combatant) -> Optional[str]:
+        """询问LLM出招建议（优先查决策缓存），建议无效时返回None"""
+        if not self.decision_cache:
+            return await self._query_llm_move(available_moves, player, enemy)
+
+        key = self.decision_cache.move_signature(player, enemy)
+        suggestion = await self.decision_cache.get_or_compute(key, lambda: self._query_llm_move(available_moves, player, enemy))
+        if suggestion not in available_moves:
+            return None
+        logger.info(f"{self.account.index} | 决策缓存/AI选择进攻: {suggestion}")
+        return suggestion
+
+    async def _query_llm_move(self, available_moves: list, player: Combatant, enemy: Combatant) -> Optional[str]:
+        """询问LLM出招建议，建议无效时返回None"""
         state = (
-            f"玩家: 血量={self.player['health']}/{self.player['max_health']}, 护盾={self.player['shield']}, "
-            f"招式=[rock: ATK={self.player['moves']['rock']['currentATK']}, DEF={self.player['moves']['rock']['currentDEF']}, Charges={self.player['moves']['rock']['currentCharges']}, "
-            f"paper: ATK={self.player['moves']['paper']['currentATK']}, DEF={self.player['moves']['paper']['currentDEF']}, Charges={self.player['moves']['paper']['currentCharges']}, "
-            f"scissor: ATK={self.player['moves']['scissor']['currentATK']}, DEF={self.player['moves']['scissor']['currentDEF']}, Charges={self.player['moves']['scissor']['currentCharges']}]"
-            f"\n敌人: 血量={self.enemy['health']}, 护盾={self.enemy['shield']}, "
-            f"招式=[rock: ATK={self.enemy['moves']['rock']['currentATK']}, DEF={self.enemy['moves']['rock']['currentDEF']}, Charges={self.enemy['moves']['rock']['currentCharges']}, "
-            f"paper: ATK={self.enemy['moves']['paper']['currentATK']}, DEF={self.enemy['moves']['paper']['currentDEF']}, Charges={self.enemy['moves']['paper']['currentCharges']}, "
-            f"scissor: ATK={self.enemy['moves']['scissor']['currentATK']}, DEF={self.enemy['moves']['scissor']['currentDEF']}, Charges={self.enemy['moves']['scissor']['currentCharges']}]"
+            f"玩家: 血量={player.health}/{player.max_health}, 护盾={player.shield}, 招式=[{player.moves_text()}]"
+            f"\n敌人: 血量={enemy.health}, 护盾={enemy.shield}, 招式=[{enemy.moves_text()}]"
         )
         prompt = (
             "根据以下状态建议下一步出招（选项：rock、paper、scissor），并严格按照以下格式返回纯文本：\n"
@@ -274,8 +372,15 @@ class GameClient:
             "示例：建议出paper，因为生存性高且Charges > 1，rock Charges为1不可用\n\n"
         )
 
-        ai_response = await self._deepseek_referenced_messages(prompt, state)
-        logger.info(f"{self.account.index} | DeepSeek原始响应: {ai_response}")
+        if self.decision_service:
+            # 与其他账户的查询合并为一次LLM请求
+            suggestion = await self.decision_service.decide("move", state, available_moves)
+            if suggestion:
+                logger.info(f"{self.account.index} | AI批量选择进攻: {suggestion}")
+            return suggestion
+
+        ai_response = await self._llm_referenced_messages(prompt, state)
+        logger.info(f"{self.account.index} | LLM原始响应: {ai_response}")
 
         if ai_response:
             try:
@@ -289,7 +394,6 @@ class GameClient:
                         return suggestion
                     else:
                         logger.warning(f"{self.account.index} | AI建议的招式 {suggestion} 不可用（可能是Charges=1或-1）")
-                        return available_moves[0]  # 若AI建议不可用，选择第一个可用招式
                 else:
                     for move in available_moves:
                         if move in ai_response.lower():
@@ -299,9 +403,12 @@ class GameClient:
             except Exception as e:
                 logger.warning(f"{self.account.index} | AI建议解析失败，错误: {str(e)}, 响应: {ai_response}")
 
-        # 默认策略
-        total_life = self.player["health"] + self.player["shield"]
-        enemy_total_life = self.enemy["health"] + self.enemy["shield"]
+        return None
+
+    def _default_move(self, available_moves: list, player: Combatant, enemy: Combatant) -> str:
+        """默认策略"""
+        total_life = player.health + player.shield
+        enemy_total_life = enemy.health + enemy.shield
         if total_life <= 5 and "paper" in available_moves:
             logger.info(f"{self.account.index} | 血量危急，选择paper，剩余血量={total_life}")
             return "paper"
@@ -313,23 +420,46 @@ class GameClient:
         return move
 
     async def choose_loot(self) -> str:
-        """使用AI选择战利品，考虑RARITY_CID和实用性"""
+        """
+        选择战利品：可选先询问LLM，默认由本地评分按RARITY_CID、boon类型和我方状态决定。
+        """
         if not self.loot_options:
             logger.warning(f"{self.account.index} | 无战利品选项，默认选择loot_three")
             return "loot_three"
 
+        self.events.event(DEBUG, "loot_options", options=self.loot_options)
+
+        if self.config.LOOT.USE_LLM or not self.loot_scorer:
+            suggestion = await self._ask_llm_loot()
+            if suggestion:
+                return suggestion
+
+        if self.loot_scorer:
+            choice = self.loot_scorer.choose(self.player, self.loot_options)
+            if choice:
+                self.events.event(DEBUG, "loot_scored", loot=choice)
+                return choice
+
+        logger.info(f"{self.account.index} | 默认选择loot_three，选项: {self.loot_options}")
+        return "loot_three"
+
+    async def _ask_llm_loot(self) -> Optional[str]:
+        """询问LLM战利品建议（优先查决策缓存），建议无效时返回None"""
         loot_details = (
             f"loot_one: {self.loot_options[0] if len(self.loot_options) > 0 else '无'}, "
             f"loot_two: {self.loot_options[1] if len(self.loot_options) > 1 else '无'}, "
             f"loot_three: {self.loot_options[2] if len(self.loot_options) > 2 else '无'}"
         )
-        logger.info(f"{self.account.index} | 可选战利品 - {loot_details}")
+        if self.decision_cache:
+            key = self.decision_cache.loot_signature(self.player, self.loot_options)
+            return await self.decision_cache.get_or_compute(key, lambda: self._query_llm_loot(loot_details))
+        return await self._query_llm_loot(loot_details)
 
+    async def _query_llm_loot(self, loot_details: str) -> Optional[str]:
+        """询问LLM战利品建议，建议无效时返回None"""
         state = (
-            f"玩家: 血量={self.player['health']}/{self.player['max_health']}, 护盾={self.player['shield']}, "
-            f"招式=[rock: ATK={self.player['moves']['rock']['currentATK']}, DEF={self.player['moves']['rock']['currentDEF']}, Charges={self.player['moves']['rock']['currentCharges']}, "
-            f"paper: ATK={self.player['moves']['paper']['currentATK']}, DEF={self.player['moves']['paper']['currentDEF']}, Charges={self.player['moves']['paper']['currentCharges']}, "
-            f"scissor: ATK={self.player['moves']['scissor']['currentATK']}, DEF={self.player['moves']['scissor']['currentDEF']}, Charges={self.player['moves']['scissor']['currentCharges']}]"
+            f"玩家: 血量={self.player.health}/{self.player.max_health}, 护盾={self.player.shield}, "
+            f"招式=[{self.player.moves_text()}]"
             f"\n战利品选项: {loot_details}"
         )
         prompt = (
@@ -339,8 +469,15 @@ class GameClient:
             "示例：建议出loot_one，因为稀有度高且增加生命值\n\n"
         )
 
-        ai_response = await self._deepseek_referenced_messages(prompt, state)
-        logger.info(f"{self.account.index} | DeepSeek原始响应: {ai_response}")
+        if self.decision_service:
+            options = ["loot_one", "loot_two", "loot_three"][:len(self.loot_options)]
+            suggestion = await self.decision_service.decide("loot", state, options)
+            if suggestion:
+                logger.info(f"{self.account.index} | AI批量选择战利品: {suggestion}")
+            return suggestion
+
+        ai_response = await self._llm_referenced_messages(prompt, state)
+        logger.info(f"{self.account.index} | LLM原始响应: {ai_response}")
 
         if ai_response:
             try:
@@ -364,77 +501,132 @@ class GameClient:
             except Exception as e:
                 logger.warning(f"{self.account.index} | AI战利品建议解析失败，错误: {str(e)}, 响应: {ai_response}")
 
-        logger.info(f"{self.account.index} | 默认选择loot_three，选项: {loot_details}")
-        return "loot_three"
+        return None
 
     async def start_battle(self, dungeon_id: int = 1) -> bool:
         """场景1：开始战斗"""
+        self.run_id = f"{self.account.index}-{time.time_ns()}"
+        self.dungeon_id = dungeon_id
+        self.run_step = 0
         success, result = await self.send_game_action("start_run", "", dungeon_id)
         if success:
             self.update_status(result)
-            logger.info(f"{self.account.index} | 战斗开始 - 我方血量: {self.player['health']}, 护盾: {self.player['shield']}, "
-                        f"敌人血量: {self.enemy['health']}, 护盾: {self.enemy['shield']}")
+            self.events.event(INFO, "battle_start", player=self.player.snapshot(), enemy=self.enemy.snapshot())
             return True
         return False
 
     async def fight_enemy(self) -> bool:
         """场景2：与敌人战斗"""
+        speculation = {}
+        try:
+            return await self._fight_loop(speculation)
+        finally:
+            self._cancel_speculation(speculation)
+
+    async def _fight_loop(self, speculation: dict) -> bool:
+        next_move = None
         while True:
-            if self.player["health"] <= 0:
-                logger.info(f"{self.account.index} | 我方被击败 - 我方血量: {self.player['health']}, 敌人血量: {self.enemy['health']}")
+            if self.player.health <= 0:
+                self.events.event(INFO, "player_defeated", player_hp=self.player.health, enemy_hp=self.enemy.health)
                 return False
-            if self.enemy["health"] <= 0 and self.enemy["shield"] <= 0:
-                loot_details = (
-                    f"loot_one: {self.loot_options[0] if len(self.loot_options) > 0 else '无'}, "
-                    f"loot_two: {self.loot_options[1] if len(self.loot_options) > 1 else '无'}, "
-                    f"loot_three: {self.loot_options[2] if len(self.loot_options) > 2 else '无'}"
-                )
-                logger.info(f"{self.account.index} | 敌人被击败 - 我方血量: {self.player['health']}, "
-                            f"战利品选项: {loot_details}")
+            if self.enemy.health <= 0 and self.enemy.shield <= 0:
+                self.events.event(INFO, "enemy_defeated", player_hp=self.player.health, loot_options=len(self.loot_options))
                 return True
 
-            next_move = await self.analyze_next_move()
+            if next_move is None:
+                decision_started = time.perf_counter()
+                next_move = await self.analyze_next_move()
+                DECISION_TIME.observe(time.perf_counter() - decision_started, "move")
+            if self.config.DECISION.SPECULATIVE:
+                # 请求发送期间，为敌方每种可能的回应预先计算下一步
+                speculation.update(self._speculate(next_move))
             success, result = await self.send_game_action(next_move, self.current_action_token)
             if not success:
                 return False
 
             self.update_status(result)
-            logger.info(f"{self.account.index} | 双方动作 - 我方: {next_move}, 敌方: {self.last_enemy_move}")
-            logger.info(f"{self.account.index} | 当前状态 - 我方血量: {self.player['health']}, 护盾: {self.player['shield']}, "
-                        f"出招: [rock: ATK={self.player['moves']['rock']['currentATK']}, DEF={self.player['moves']['rock']['currentDEF']}, Charges={self.player['moves']['rock']['currentCharges']}, "
-                        f"paper: ATK={self.player['moves']['paper']['currentATK']}, DEF={self.player['moves']['paper']['currentDEF']}, Charges={self.player['moves']['paper']['currentCharges']}, "
-                        f"scissor: ATK={self.player['moves']['scissor']['currentATK']}, DEF={self.player['moves']['scissor']['currentDEF']}, Charges={self.player['moves']['scissor']['currentCharges']}], "
-                        f"敌人血量: {self.enemy['health']}, 护盾: {self.enemy['shield']}, "
-                        f"出招: [rock: ATK={self.enemy['moves']['rock']['currentATK']}, DEF={self.enemy['moves']['rock']['currentDEF']}, Charges={self.enemy['moves']['rock']['currentCharges']}, "
-                        f"paper: ATK={self.enemy['moves']['paper']['currentATK']}, DEF={self.enemy['moves']['paper']['currentDEF']}, Charges={self.enemy['moves']['paper']['currentCharges']}, "
-                        f"scissor: ATK={self.enemy['moves']['scissor']['currentATK']}, DEF={self.enemy['moves']['scissor']['currentDEF']}, Charges={self.enemy['moves']['scissor']['currentCharges']}]")
-
-            if result.get("message") == "Dungeon run room result reported":
-                logger.info(f"{self.account.index} | 房间结束 - 我方血量: {self.player['health']}")
-                return self.player["health"] > 0
-
-            await asyncio.sleep(3)
+            self.events.event(
+                INFO, "turn", sample=self.turn_sample_rate,
+                move=next_move, enemy_move=self.last_enemy_move,
+                player=self.player.snapshot(), enemy=self.enemy.snapshot(),
+            )
+
+            if result.message == "Dungeon run room result reported":
+                self.events.event(INFO, "room_finished", player_hp=self.player.health)
+                return self.player.health > 0
+
+            # 回合间隔由 send_game_action 中的自适应节奏控制；原实现在此处固定等待，计入节省时间的基准
+            get_pacers().for_account(self.account.index).note_baseline_sleep()
+            decision_started = time.perf_counter()
+            next_move = await self._take_speculation(speculation)
+            if next_move is not None:
+                DECISION_TIME.observe(time.perf_counter() - decision_started, "speculated_move")
+
+    def _speculation_key(self, player: Combatant, enemy: Combatant) -> tuple:
+        return side_from_status(player), side_from_status(enemy)
+
+    def _speculate(self, move: str) -> dict:
+        """按本地规则推演敌方每种回应后的状态，并在后台为每个状态计算下一步出招"""
+        player, enemy = side_from_status(self.player), side_from_status(self.enemy)
+        tasks = {}
+        for reply in legal_moves(enemy) or range(len(MOVES)):
+            next_player, next_enemy = resolve_round(player, enemy, MOVE_INDEX[move], reply)
+            if next_player[0] <= 0 or next_enemy[0] <= 0:
+                continue  # 战斗在这一回合结束，无需下一步
+            key = (next_player, next_enemy)
+            if key in tasks:
+                continue
+            tasks[key] = asyncio.create_task(self.analyze_next_move(
+                status_from_side(next_player, self.player.max_health),
+                status_from_side(next_enemy),
+            ))
+        return tasks
+
+    async def _take_speculation(self, speculation: dict) -> Optional[str]:
+        """取出与实际状态匹配的预计算结果，未命中时返回None并取消其余任务"""
+        if not speculation:
+            return None
+        task = speculation.pop(self._speculation_key(self.player, self.enemy), None)
+        self._cancel_speculation(speculation)
+        if task is None:
+            self.events.event(DEBUG, "speculation_miss")
+            return None
+        move = await task
+        self.events.event(DEBUG, "speculation_hit", move=move)
+        return move
+
+    @staticmethod
+    def _cancel_speculation(speculation: dict):
+        for task in speculation.values():
+            task.cancel()
+        speculation.clear()
 
     async def handle_loot(self) -> bool:
         """场景3：选择战利品"""
+        decision_started = time.perf_counter()
         loot_action = await self.choose_loot()
+        DECISION_TIME.observe(time.perf_counter() - decision_started, "loot")
         success, result = await self.send_game_action(loot_action, self.current_action_token)
         if not success:
             return False
 
         self.update_status(result)
-        logger.info(f"{self.account.index} | 战利品已选择 - 我方血量: {self.player['health']}, 护盾: {self.player['shield']}, "
-                    f"出招: [rock: ATK={self.player['moves']['rock']['currentATK']}, DEF={self.player['moves']['rock']['currentDEF']}, Charges={self.player['moves']['rock']['currentCharges']}, "
-                    f"paper: ATK={self.player['moves']['paper']['currentATK']}, DEF={self.player['moves']['paper']['currentDEF']}, Charges={self.player['moves']['paper']['currentCharges']}, "
-                    f"scissor: ATK={self.player['moves']['scissor']['currentATK']}, DEF={self.player['moves']['scissor']['currentDEF']}, Charges={self.player['moves']['scissor']['currentCharges']}]")
+        self.events.event(INFO, "loot_chosen", loot=loot_action, player=self.player.snapshot())
         return True
 
     async def run(self):
-        """主循环：战斗+战利品+继续"""
+        """主循环：战斗+战利品+继续；出错时输出该账户最近未输出的事件"""
+        try:
+            await self._run()
+        except Exception as e:
+            self.events.flush(f"运行出错: {e}")
+            raise
+
+    async def _run(self):
         if not await self.start_battle(dungeon_id=1):
             return
 
-        while self.player["health"] > 0:
+        while self.player.health > 0:
             battle_result = await self.fight_enemy()
             if not battle_result:
                 logger.info(f"{self.account.index} | 战斗失败，游戏结束")
@@ -444,9 +636,9 @@ class GameClient:
                 logger.info(f"{self.account.index} | 战利品选择失败，停止")
                 break
 
-            logger.info(f"{self.account.index} | ==================进入下一敌人=====================")
+            self.events.event(INFO, "next_enemy")
 
-        logger.info(f"{self.account.index} | 游戏结束 - {'我方被击败' if self.player['health'] <= 0 else '所有敌人被击败'}")
+        logger.info(f"{self.account.index} | 游戏结束 - {'我方被击败' if self.player.health <= 0 else '所有敌人被击败'}")
 
 async def main():
     # 你的token
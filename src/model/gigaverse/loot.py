@@ -0,0 +1,103 @@
+"""
+本地战利品评分。
+
+战利品的价值只取决于 RARITY_CID、boonTypeString、selectedVal1/selectedVal2 与我方当前状态，
+因此无需询问LLM：按配置的权重为每种 boon 预先生成效用表，选择时查表计算，耗时为微秒级。
+
+- AddMaxHealth：增加最大血量与当前血量，我方损失的血量比例越高价值越大
+- Heal：只计算实际能恢复的血量（满血时为 0）
+- AddMaxArmor：增加护盾
+- UpgradeRock / UpgradePaper / UpgradeScissor：selectedVal1 加 ATK，selectedVal2 加 DEF
+"""
+from typing import Optional
+
+from src.model.gigaverse.state import Combatant
+
+LOOT_ACTIONS = ("loot_one", "loot_two", "loot_three")
+
+ADD_MAX_HEALTH = "AddMaxHealth"
+ADD_MAX_ARMOR = "AddMaxArmor"
+HEAL = "Heal"
+UPGRADES = ("UpgradeRock", "UpgradePaper", "UpgradeScissor")
+
+
+class LootScorer:
+    """
+    确定性战利品评分器。
+
+    Args:
+        rarity: 每级 RARITY_CID 的分值
+        max_health: AddMaxHealth 每点的分值
+        heal: Heal 每点实际恢复血量的分值
+        armor: AddMaxArmor 每点的分值
+        upgrade_atk: 升级招式时每点 ATK 的分值
+        upgrade_def: 升级招式时每点 DEF 的分值
+        low_health_bonus: 血量类 boon 的加成系数，按 (1 + 系数 * 已损失血量比例) 放大
+    """
+
+    def __init__(
+        self,
+        rarity: float = 1.0,
+        max_health: float = 1.0,
+        heal: float = 1.0,
+        armor: float = 1.5,
+        upgrade_atk: float = 2.0,
+        upgrade_def: float = 1.5,
+        low_health_bonus: float = 1.0,
+    ):
+        self.rarity = float(rarity)
+        self.low_health_bonus = float(low_health_bonus)
+        # 效用表：boon -> (selectedVal1 每点分值, selectedVal2 每点分值, 是否随损失血量放大)
+        self.table: dict[str, tuple[float, float, bool]] = {
+            ADD_MAX_HEALTH: (float(max_health), 0.0, True),
+            HEAL: (float(heal), 0.0, True),
+            ADD_MAX_ARMOR: (float(armor), 0.0, False),
+        }
+        for boon in UPGRADES:
+            self.table[boon] = (float(upgrade_atk), float(upgrade_def), False)
+
+    @classmethod
+    def from_config(cls, config) -> "LootScorer":
+        weights = config.LOOT.WEIGHTS
+        return cls(
+            rarity=weights.RARITY,
+            max_health=weights.ADD_MAX_HEALTH,
+            heal=weights.HEAL,
+            armor=weights.ADD_MAX_ARMOR,
+            upgrade_atk=weights.UPGRADE_ATK,
+            upgrade_def=weights.UPGRADE_DEF,
+            low_health_bonus=weights.LOW_HEALTH_BONUS,
+        )
+
+    def score(self, player: Combatant, option: dict) -> float:
+        """单个战利品选项的分值；未知的 boon 只计稀有度"""
+        value = self.rarity * (option.get("RARITY_CID") or 0)
+        entry = self.table.get(option.get("boonTypeString"))
+        if entry is None:
+            return value
+        per_val1, per_val2, health_scaled = entry
+        val1 = option.get("selectedVal1") or 0
+        val2 = option.get("selectedVal2") or 0
+
+        health = player.health or 0
+        max_health = player.max_health or health
+        if option.get("boonTypeString") == HEAL:
+            val1 = min(val1, max(max_health - health, 0))
+        boon_value = per_val1 * val1 + per_val2 * val2
+        if health_scaled and max_health > 0:
+            boon_value *= 1 + self.low_health_bonus * max(max_health - health, 0) / max_health
+        return value + boon_value
+
+    def score_options(self, player: Combatant, loot_options: list) -> dict[str, float]:
+        return {
+            action: self.score(player, option)
+            for action, option in zip(LOOT_ACTIONS, loot_options)
+            if isinstance(option, dict)
+        }
+
+    def choose(self, player: Combatant, loot_options: list) -> Optional[str]:
+        """返回分值最高的选项（同分时选靠前的），没有有效选项时返回None"""
+        scores = self.score_options(player, loot_options)
+        if not scores:
+            return None
+        return max(scores, key=scores.get)
@@ -0,0 +1,155 @@
+"""
+本地出招求解器。
+
+按照 REFERENCED_MESSAGES_SYSTEM_PROMPT 中的规则（克制关系、ATK/DEF 伤害、护盾先扣、
+Charges 消耗与恢复）枚举我方每个可用招式对敌方每个可能回应的结果，
+在有限深度内搜索并给出评分最高的招式。全部计算在本地完成，耗时为微秒级。
+"""
+from functools import lru_cache
+from typing import Iterable
+
+from src.model.gigaverse.state import MOVE_INDEX, MOVES, Combatant
+
+# BEATS[i] 为招式 i 克制的招式下标：rock 克 scissor，paper 克 rock，scissor 克 paper
+BEATS = (2, 0, 1)
+MAX_CHARGES = 3
+
+KILL_BONUS = 1000.0
+DEATH_PENALTY = 1000.0
+
+# 一方状态：(血量, 护盾, ((ATK, DEF, Charges) * 3))
+Side = tuple[int, int, tuple[tuple[int, int, int], ...]]
+
+
+def side_from_status(status: Combatant) -> Side:
+    """将 GameClient 的 Combatant 状态转换为求解器使用的不可变元组"""
+    return (
+        status.health or 0,
+        status.shield or 0,
+        tuple((m.atk, m.defense, m.charges) for m in status.moves),
+    )
+
+
+def status_from_side(side: Side, max_health: int | None = None) -> Combatant:
+    """side_from_status 的逆操作，生成新的 Combatant"""
+    status = Combatant()
+    status.set(side[0], side[1], side[2], max_health)
+    return status
+
+
+def legal_moves(side: Side) -> tuple[int, ...]:
+    """返回 Charges > 0 的招式下标"""
+    return tuple(i for i, move in enumerate(side[2]) if move[2] > 0)
+
+
+def _spend_charges(moves: tuple, used: int) -> tuple:
+    """使用招式后更新 Charges：使用的招式 -1（用到 0 时变为 -1），其余招式恢复 1 点"""
+    updated = []
+    for i, (atk, df, charges) in enumerate(moves):
+        if i == used:
+            charges -= 1
+            if charges == 0:
+                charges = -1
+        elif charges < MAX_CHARGES:
+            charges += 1
+        updated.append((atk, df, charges))
+    return tuple(updated)
+
+
+def _take_damage(health: int, shield: int, damage: int) -> tuple[int, int]:
+    """护盾先扣，护盾为0后扣血量"""
+    if damage <= 0:
+        return health, shield
+    absorbed = min(shield, damage)
+    return health - (damage - absorbed), shield - absorbed
+
+
+def resolve_round(player: Side, enemy: Side, p_move: int, e_move: int) -> tuple[Side, Side]:
+    """结算一回合，返回双方的新状态"""
+    p_atk, p_def, _ = player[2][p_move]
+    e_atk, e_def, _ = enemy[2][e_move]
+
+    to_enemy = to_player = 0
+    if BEATS[p_move] == e_move:
+        to_enemy = max(0, p_atk - e_def)
+    elif BEATS[e_move] == p_move:
+        to_player = max(0, e_atk - p_def)
+    else:
+        to_enemy = max(0, p_atk - e_def)
+        to_player = max(0, e_atk - p_def)
+
+    p_health, p_shield = _take_damage(player[0], player[1], to_player)
+    e_health, e_shield = _take_damage(enemy[0], enemy[1], to_enemy)
+    return (
+        (p_health, p_shield, _spend_charges(player[2], p_move)),
+        (e_health, e_shield, _spend_charges(enemy[2], e_move)),
+    )
+
+
+def _evaluate(player: Side, enemy: Side, risk_aversion: float) -> float:
+    score = risk_aversion * (max(player[0], 0) + player[1]) - (max(enemy[0], 0) + enemy[1])
+    if enemy[0] <= 0:
+        score += KILL_BONUS
+    if player[0] <= 0:
+        score -= DEATH_PENALTY
+    return score
+
+
+@lru_cache(maxsize=65536)
+def _search(player: Side, enemy: Side, depth: int, risk_aversion: float, pessimism: float) -> float:
+    if depth == 0 or player[0] <= 0 or enemy[0] <= 0:
+        return _evaluate(player, enemy, risk_aversion)
+    my_moves = legal_moves(player) or (0, 1, 2)
+    return max(
+        score_move(player, enemy, move, depth, risk_aversion, pessimism)
+        for move in my_moves
+    )
+
+
+def score_move(player: Side, enemy: Side, move: int, depth: int, risk_aversion: float, pessimism: float) -> float:
+    """我方出 move 时，对敌方所有可能回应取最坏值与平均值的加权"""
+    replies = legal_moves(enemy) or (0, 1, 2)
+    outcomes = [
+        _search(*resolve_round(player, enemy, move, reply), depth - 1, risk_aversion, pessimism)
+        for reply in replies
+    ]
+    return pessimism * min(outcomes) + (1 - pessimism) * sum(outcomes) / len(outcomes)
+
+
+class MoveSolver:
+    """
+    确定性出招求解器。
+
+    Args:
+        depth: 搜索回合数，1 为只看本回合
+        risk_aversion: 我方生命值相对敌方生命值的权重，越大越保守
+        pessimism: 0 表示敌方随机出招（取平均），1 表示敌方总是最优回应（取最坏）
+    """
+
+    def __init__(self, depth: int = 2, risk_aversion: float = 1.0, pessimism: float = 0.5):
+        self.depth = max(1, depth)
+        self.risk_aversion = float(risk_aversion)
+        self.pessimism = min(max(float(pessimism), 0.0), 1.0)
+
+    @classmethod
+    def from_config(cls, config) -> "MoveSolver":
+        return cls(
+            depth=config.DECISION.SOLVER_DEPTH,
+            risk_aversion=config.DECISION.SOLVER_RISK_AVERSION,
+            pessimism=config.DECISION.SOLVER_PESSIMISM,
+        )
+
+    def score_moves(self, player: Combatant, enemy: Combatant, candidates: Iterable[str] = MOVES) -> dict[str, float]:
+        """为每个候选招式打分"""
+        p_side, e_side = side_from_status(player), side_from_status(enemy)
+        return {
+            move: score_move(
+                p_side, e_side, MOVE_INDEX[move], self.depth, self.risk_aversion, self.pessimism
+            )
+            for move in candidates
+        }
+
+    def best_move(self, player: Combatant, enemy: Combatant, candidates: Iterable[str] = MOVES) -> str:
+        """返回评分最高的候选招式，同分时按 rock、paper、scissor 顺序选择"""
+        scores = self.score_moves(player, enemy, candidates)
+        return max(scores, key=scores.get)
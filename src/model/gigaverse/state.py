@@ -0,0 +1,79 @@
+"""
+紧凑的对战状态。
+
+每个 GameClient 只持有两个 Combatant（我方与敌方），每个 Combatant 固定持有三个 MoveStats。
+对象在创建时分配一次，之后每回合从响应中原地更新，不再每回合重建嵌套字典，
+也不保留整个响应对象。
+"""
+import sys
+from dataclasses import dataclass, field
+from typing import Optional
+
+MOVES = ("rock", "paper", "scissor")
+MOVE_INDEX = {name: i for i, name in enumerate(MOVES)}
+
+
+@dataclass(slots=True)
+class MoveStats:
+    """单个招式的 ATK / DEF / Charges"""
+
+    atk: int = 0
+    defense: int = 0
+    charges: int = 0
+
+    def update(self, data: dict):
+        self.atk = data["currentATK"]
+        self.defense = data["currentDEF"]
+        self.charges = data["currentCharges"]
+
+
+@dataclass(slots=True)
+class Combatant:
+    """一方的血量、护盾与三种招式"""
+
+    health: Optional[int] = None
+    shield: Optional[int] = None
+    max_health: Optional[int] = None
+    moves: tuple[MoveStats, MoveStats, MoveStats] = field(
+        default_factory=lambda: (MoveStats(), MoveStats(), MoveStats())
+    )
+
+    def move(self, name: str) -> MoveStats:
+        return self.moves[MOVE_INDEX[name]]
+
+    def update(self, data: dict):
+        """从响应中 players[i] 的数据原地更新"""
+        health = data["health"]
+        self.health = health["current"]
+        self.shield = data["shield"]["current"]
+        self.max_health = health.get("currentMax", self.health)
+        for name, stats in zip(MOVES, self.moves):
+            stats.update(data[name])
+
+    def set(self, health: int, shield: int, moves, max_health: Optional[int] = None):
+        """按数值原地更新，moves 为 ((ATK, DEF, Charges) * 3)"""
+        self.health = health
+        self.shield = shield
+        if max_health is not None:
+            self.max_health = max_health
+        for stats, (atk, defense, charges) in zip(self.moves, moves):
+            stats.atk, stats.defense, stats.charges = atk, defense, charges
+
+    def available_moves(self, min_charges: int = 1) -> list[str]:
+        """Charges >= min_charges 的招式名"""
+        return [name for name, stats in zip(MOVES, self.moves) if stats.charges >= min_charges]
+
+    def snapshot(self) -> tuple:
+        """当前数值的不可变快照 (血量, 护盾, ((ATK, DEF, Charges) * 3))，用于日志"""
+        return self.health, self.shield, tuple((m.atk, m.defense, m.charges) for m in self.moves)
+
+    def moves_text(self) -> str:
+        """招式描述，用于日志和LLM提示词"""
+        return ", ".join(
+            f"{name}: ATK={stats.atk}, DEF={stats.defense}, Charges={stats.charges}"
+            for name, stats in zip(MOVES, self.moves)
+        )
+
+    def nbytes(self) -> int:
+        """对象自身及三个招式占用的字节数（不含共享的小整数）"""
+        return sys.getsizeof(self) + sys.getsizeof(self.moves) + sum(sys.getsizeof(m) for m in self.moves)
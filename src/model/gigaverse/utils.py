@@ -2,11 +2,15 @@ import base64
 import json
 import time
 
+from typing import TYPE_CHECKING
+
 from loguru import logger
-from curl_cffi.requests import AsyncSession, Response
 
 from src.utils.constants import Account
 
+if TYPE_CHECKING:
+    from curl_cffi.requests import AsyncSession, Response
+
 def calculate_nonce() -> str:
     unix_ts = time.time()
     return str((int(unix_ts) * 1000 - 1420070400000) * 4194304)
@@ -32,7 +36,7 @@ def create_x_super_properties() -> str:
 }, separators=(',', ':')).encode('utf-8')).decode('utf-8')
 
 
-async def get_guild_ids(client: AsyncSession, invite_code: str, account: Account) -> tuple[str, str, bool]:
+async def get_guild_ids(client: "AsyncSession", invite_code: str, account: Account) -> tuple[str, str, bool]:
     try:
         headers = {
             'sec-ch-ua-platform': '"Windows"',
@@ -78,7 +82,7 @@ def create_x_context_properties(location_guild_id: str, location_channel_id: str
     }, separators=(',', ':')).encode('utf-8')).decode('utf-8')
 
 
-async def init_cf(account: Account, client: AsyncSession) -> bool:
+async def init_cf(account: Account, client: "AsyncSession") -> bool:
     try:
         resp = await client.get("https://discord.com/login",
                           headers={
@@ -108,7 +112,7 @@ async def init_cf(account: Account, client: AsyncSession) -> bool:
         return False
 
 
-async def set_response_cookies(client: AsyncSession, response: Response) -> bool:
+async def set_response_cookies(client: "AsyncSession", response: "Response") -> bool:
     try:
         cookies = response.headers.get_list("set-cookie")
         for cookie in cookies:
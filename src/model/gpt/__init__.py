@@ -1,2 +1 @@
-from .gpt import ask_chatgpt
-
+from .gpt import ask_chatgpt, close_chatgpt_clients
@@ -1,12 +1,13 @@
 from loguru import logger
-from curl_cffi.requests import AsyncSession
 import random
 import asyncio
 
 from src.model.gigaverse.gameClient import GameClient
-from src.utils.client import create_client
 from src.utils.config import Config
 from src.utils.constants import Account
+from src.utils.proxy_manager import ProxyUnavailableError
+from src.utils.retry import is_retryable
+
 
 class Start:
     def __init__(
@@ -17,12 +18,9 @@ class Start:
         self.account = account
         self.config = config
 
-        self.session: AsyncSession | None = None
-
     async def initialize(self):
         try:
-            self.session = await create_client(self.account.proxy)
-
+            # AI Giga 的游戏请求走 httpx 连接池，不再为每轮创建 curl_cffi 会话
             return True
         except Exception as e:
             logger.error(f"[{self.account.index}] | Error: {e}")
@@ -32,7 +30,7 @@ class Start:
         try:
 
             if self.config.TASK == "AI Giga":
-                chatter = GameClient(self.account, self.session, self.config)
+                chatter = GameClient(self.account, self.config)
                 await chatter.run()
 
             await self.sleep(self.config.TASK)
@@ -40,6 +38,9 @@ class Start:
             return True
         except Exception as e:
             logger.error(f"[{self.account.index}] | Error: {e}")
+            # 不可重试的错误（如 token 过期）、代理隔离和带等待时间的错误交给调度器处理，不再重复尝试
+            if not is_retryable(e) or isinstance(e, ProxyUnavailableError) or getattr(e, "retry_after", None):
+                raise
             return False
 
     async def sleep(self, task_name: str):
@@ -1,13 +1,22 @@
-from .client import create_client
-from .reader import read_txt_file, read_csv_accounts, read_pictures
-from .output import show_dev_info, show_logo, show_menu
+import importlib
+
+from .reader import read_txt_file, read_csv_accounts, iter_csv_accounts, read_pictures
 from .config import get_config
 from .constants import Account, DataForTasks, DISCORD_CAPTCHA_SITEKEY
 
+# curl_cffi、rich、prompt_toolkit 导入较慢，只在第一次访问时导入（无界面模式不会用到界面模块）
+_LAZY_EXPORTS = {
+    "create_client": ".client",
+    "show_dev_info": ".output",
+    "show_logo": ".output",
+    "show_menu": ".output",
+}
+
 __all__ = [
     "create_client",
     "read_txt_file",
     "read_csv_accounts",
+    "iter_csv_accounts",
     "show_dev_info",
     "show_logo",
     "get_config",
@@ -15,3 +24,12 @@ __all__ = [
     "DataForTasks",
     "DISCORD_CAPTCHA_SITEKEY",
 ]
+
+
+def __getattr__(name: str):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,289 @@
+"""
+账户状态存储（SQLite，WAL 模式）。
+
+取代 openpyxl 的整表读写：token、代理、状态保存在带索引的 accounts 表中，
+按 token 或账户序号更新单个字段为 O(log n)。
+
+- 写入：调用方只把语句放入队列，由后台线程把同一时刻排队的所有更新合并为一个事务提交，
+  事件循环不会被磁盘 IO 阻塞；需要结果时 await 返回的 future。
+- 读取：WAL 模式下读取不会被写入阻塞，每次读取使用独立的连接。
+- 与 data/accounts.csv 互相导入、导出，CSV 中的行号即账户序号。
+
+用法（在项目根目录）：
+    python -m src.utils.account_store import [data/accounts.csv]
+    python -m src.utils.account_store export [data/accounts.csv]
+"""
+import argparse
+import asyncio
+import csv
+import os
+import queue
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+
+from loguru import logger
+
+from src.utils.config import Config, get_config
+from src.utils.constants import ACCOUNTS_FILE, Account
+from src.utils.reader import AccountSelector, iter_csv_accounts
+
+# CSV 列名 -> 数据库列名
+FIELDS = {
+    "GIGA_TOKEN": "token",
+    "PROXY": "proxy",
+    "STATUS": "status",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    idx INTEGER PRIMARY KEY,
+    token TEXT NOT NULL,
+    proxy TEXT NOT NULL DEFAULT '',
+    status TEXT NOT NULL DEFAULT '',
+    updated_at REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS accounts_token ON accounts(token);
+"""
+
+UPSERT = (
+    "INSERT INTO accounts (idx, token, proxy, updated_at) VALUES (?, ?, ?, ?) "
+    "ON CONFLICT(idx) DO UPDATE SET token = excluded.token, proxy = excluded.proxy, "
+    "updated_at = excluded.updated_at "
+    "WHERE accounts.token != excluded.token OR accounts.proxy != excluded.proxy"
+)
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class AccountStore:
+    """
+    SQLite 账户状态存储。
+
+    所有写入都经过后台线程：每次取出队列中已有的全部语句（最多 batch_size 条），
+    在一个事务中执行并提交，再把每条语句影响的行数交回对应的 future。
+    """
+
+    def __init__(self, path: str, batch_size: int = 1000):
+        self.path = path
+        self.batch_size = batch_size
+        with _connect(path) as connection:
+            connection.executescript(SCHEMA)
+        connection.close()
+
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.thread: Optional[threading.Thread] = None
+
+        self.writes = 0
+        self.transactions = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> "AccountStore":
+        return cls(config.ACCOUNTS.STORE_FILE)
+
+    # ---------- 写入 ----------
+
+    def _submit(self, sql: str, params: tuple, wait: bool) -> Optional[asyncio.Future]:
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="account-store", daemon=True)
+            self.thread.start()
+        future = asyncio.get_running_loop().create_future() if wait else None
+        self.queue.put((sql, params, future))
+        return future
+
+    @staticmethod
+    def _column(field: str) -> str:
+        column = FIELDS.get(field)
+        if column is None:
+            raise ValueError(f"Invalid field name: {field}")
+        return column
+
+    async def update(self, token: str, field: str, value: str) -> bool:
+        """按 token 更新一个字段，返回是否找到该账户"""
+        sql = f"UPDATE accounts SET {self._column(field)} = ?, updated_at = ? WHERE token = ?"
+        return await self._submit(sql, (value, time.time(), token), wait=True) > 0
+
+    def set_field(self, index: int, field: str, value: str):
+        """按账户序号更新一个字段，只入队不等待结果"""
+        sql = f"UPDATE accounts SET {self._column(field)} = ?, updated_at = ? WHERE idx = ?"
+        self._submit(sql, (value, time.time(), index), wait=False)
+
+    def set_status(self, index: int, status: str):
+        self.set_field(index, "STATUS", status)
+
+    def upsert(self, account: Account):
+        """写入账户的 token 和代理（不存在时插入），只入队不等待结果"""
+        self._submit(UPSERT, (account.index, account.token, account.proxy, time.time()), wait=False)
+
+    def _run(self):
+        connection = _connect(self.path)
+        stopping = False
+        while not stopping:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(item is None for item in batch)
+            batch = [item for item in batch if item is not None]
+            if batch:
+                self._write_batch(connection, batch)
+        connection.close()
+
+    def _write_batch(self, connection: sqlite3.Connection, batch: list):
+        results = []
+        try:
+            with connection:
+                for sql, params, _ in batch:
+                    results.append(connection.execute(sql, params).rowcount)
+            self.writes += len(batch)
+            self.transactions += 1
+        except Exception as e:
+            logger.error(f"Failed to write {len(batch)} account updates to {self.path}: {e}")
+            results = [e] * len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            if future is not None:
+                future.get_loop().call_soon_threadsafe(_resolve, future, result)
+
+    def close(self):
+        """提交队列中剩余的更新并停止写入线程"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout=30)
+            self.thread = None
+
+    # ---------- 读取 ----------
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        connection = _connect(self.path)
+        try:
+            return connection.execute(sql, params).fetchall()
+        finally:
+            connection.close()
+
+    def get(self, index: int) -> Optional[dict]:
+        rows = self._query("SELECT idx, token, proxy, status FROM accounts WHERE idx = ?", (index,))
+        return _row_dict(rows[0]) if rows else None
+
+    def find(self, token: str) -> Optional[dict]:
+        rows = self._query("SELECT idx, token, proxy, status FROM accounts WHERE token = ?", (token,))
+        return _row_dict(rows[0]) if rows else None
+
+    def load_accounts(self, selector: Optional[AccountSelector] = None) -> List[Account]:
+        """按序号顺序读取账户，范围选择直接使用主键索引"""
+        sql = "SELECT idx, token, proxy FROM accounts"
+        params: tuple = ()
+        if selector is not None and selector.range:
+            sql += " WHERE idx BETWEEN ? AND ?"
+            params = selector.range
+        rows = self._query(sql + " ORDER BY idx", params)
+        return [
+            Account(index=index, token=token, proxy=proxy)
+            for index, token, proxy in rows
+            if selector is None or index in selector
+        ]
+
+    def counts(self) -> dict:
+        return dict(self._query("SELECT status, COUNT(*) FROM accounts GROUP BY status"))
+
+    # ---------- CSV 导入导出 ----------
+
+    def import_accounts(self, accounts: Iterable[Account]) -> int:
+        """在一个事务中写入（或更新）账户，返回变化的行数"""
+        now = time.time()
+        with _connect(self.path) as connection:
+            changed = connection.total_changes
+            connection.executemany(
+                UPSERT, ((account.index, account.token, account.proxy, now) for account in accounts)
+            )
+            changed = connection.total_changes - changed
+        connection.close()
+        return changed
+
+    def import_csv(self, file_path: str = ACCOUNTS_FILE) -> int:
+        """逐行读取 CSV 导入，已存在的序号只更新 token 和代理，保留状态"""
+        changed = self.import_accounts(iter_csv_accounts(file_path))
+        logger.info(f"Imported accounts from {file_path} into {self.path}: {changed} changed")
+        return changed
+
+    def export_csv(self, file_path: str = ACCOUNTS_FILE) -> int:
+        """
+        按序号导出为 CSV（GIGA_TOKEN,PROXY,STATUS），先写入临时文件再替换，
+        不会让正在读取的账户加载器读到写了一半的文件。
+        """
+        temp_path = f"{file_path}.tmp"
+        count = 0
+        connection = _connect(self.path)
+        try:
+            with open(temp_path, "w", encoding="utf-8", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(list(FIELDS))
+                for row in connection.execute("SELECT token, proxy, status FROM accounts ORDER BY idx"):
+                    writer.writerow(row)
+                    count += 1
+        finally:
+            connection.close()
+        os.replace(temp_path, file_path)
+        logger.info(f"Exported {count} accounts from {self.path} to {file_path}")
+        return count
+
+    def stats(self) -> dict:
+        return {"writes": self.writes, "transactions": self.transactions}
+
+
+def _resolve(future: asyncio.Future, result):
+    if future.done():
+        return
+    if isinstance(result, Exception):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
+
+
+def _row_dict(row: tuple) -> dict:
+    return dict(zip(("index", "token", "proxy", "status"), row))
+
+
+# Singleton pattern
+def get_account_store() -> AccountStore:
+    """Get account store singleton"""
+    if not hasattr(get_account_store, "_store"):
+        get_account_store._store = AccountStore.from_config(get_config())
+    return get_account_store._store
+
+
+def close_account_store():
+    """提交剩余的更新并输出统计（程序退出时调用）"""
+    if hasattr(get_account_store, "_store"):
+        store = get_account_store._store
+        store.close()
+        logger.info(f"Account store stats: {store.stats()}, statuses: {store.counts()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import or export the SQLite account store")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("csv", nargs="?", default=ACCOUNTS_FILE)
+    parser.add_argument("--store", default=None, help="database file (default: ACCOUNTS.STORE_FILE)")
+    args = parser.parse_args()
+
+    store = AccountStore(args.store) if args.store else get_account_store()
+    if args.command == "import":
+        store.import_csv(args.csv)
+    else:
+        store.export_csv(args.csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+账户文件热加载。
+
+每天更新 data/accounts.csv 中的 token 后无需重启：后台协程定期检查文件的修改时间与大小，
+发生变化时重新读取被选中的账号，并直接修改正在运行的 Account 对象（token、proxy），
+正在运行的账户循环在下一次请求时就会使用新的值。
+"""
+import asyncio
+import os
+from typing import Callable, Dict, List, Optional
+
+from loguru import logger
+
+from src.utils.constants import Account
+from src.utils.reader import AccountSelector, iter_csv_accounts
+
+
+class AccountWatcher:
+    """
+    轮询账户文件并原地更新账号。
+
+    - 已有序号：token 或 proxy 变化时原地修改 Account 对象
+    - 新序号：on_added 不为None时创建 Account 并交给 on_added（例如加入调度器），否则忽略
+    - 更新和新增的账号都会交给 on_changed（例如写入账户存储）
+    - 文件中已不存在的序号：只记录日志，正在运行的账户继续使用原来的值
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        accounts: List[Account],
+        selector: Optional[AccountSelector] = None,
+        interval: float = 10.0,
+        on_added: Optional[Callable[[Account], None]] = None,
+        on_changed: Optional[Callable[[Account], None]] = None,
+    ):
+        self.file_path = file_path
+        self.accounts: Dict[int, Account] = {account.index: account for account in accounts}
+        self.selector = selector
+        self.interval = interval
+        self.on_added = on_added
+        self.on_changed = on_changed
+        self._signature = self._stat()
+
+        self.reloads = 0
+        self.updated = 0
+        self.added = 0
+
+    def _stat(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(self.file_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self) -> List[Account]:
+        return list(iter_csv_accounts(self.file_path, self.selector))
+
+    def apply(self, loaded: List[Account]) -> dict:
+        """将重新读取的账号合并到当前账号中，返回本次更新、新增、缺失的数量"""
+        updated = added = 0
+        seen = set()
+        for fresh in loaded:
+            seen.add(fresh.index)
+            account = self.accounts.get(fresh.index)
+            if account is None:
+                if self.on_added is None:
+                    continue
+                self.accounts[fresh.index] = fresh
+                self.on_added(fresh)
+                added += 1
+            elif account.token != fresh.token or account.proxy != fresh.proxy:
+                account.token = fresh.token
+                account.proxy = fresh.proxy
+                updated += 1
+            else:
+                continue
+            if self.on_changed is not None:
+                self.on_changed(self.accounts[fresh.index])
+
+        self.updated += updated
+        self.added += added
+        return {"updated": updated, "added": added, "missing": len(self.accounts.keys() - seen)}
+
+    async def check(self) -> Optional[dict]:
+        """文件有变化时重新加载，没有变化时返回None"""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return None
+
+        try:
+            loaded = await asyncio.to_thread(self._read)
+        except Exception as e:
+            logger.warning(f"Failed to reload {self.file_path}: {e}")
+            return None
+
+        # 读取期间文件又被修改（编辑器尚未写完），下一轮再读
+        if self._stat() != signature:
+            return None
+        self._signature = signature
+        if not loaded and self.accounts:
+            logger.warning(f"{self.file_path} has no accounts, keeping the current ones")
+            return None
+
+        self.reloads += 1
+        result = self.apply(loaded)
+        logger.info(
+            f"Reloaded {self.file_path}: {result['updated']} updated, {result['added']} added, "
+            f"{result['missing']} missing"
+        )
+        return result
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    def stats(self) -> dict:
+        return {"accounts": len(self.accounts), "reloads": self.reloads, "updated": self.updated, "added": self.added}
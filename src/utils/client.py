@@ -1,6 +1,14 @@
-from curl_cffi.requests import AsyncSession
+from typing import TYPE_CHECKING
+
+from src.utils.transport import normalize_proxy
+
+if TYPE_CHECKING:
+    from curl_cffi.requests import AsyncSession
+
+async def create_client(proxy: str) -> "AsyncSession":
+    # curl_cffi 在创建第一个会话时才导入
+    from curl_cffi.requests import AsyncSession
 
-async def create_client(proxy: str) -> AsyncSession:
     # session = primp.AsyncClient(impersonate="chrome_131", verify=False)
 
     session = AsyncSession(
@@ -9,9 +17,11 @@ async def create_client(proxy: str) -> AsyncSession:
                 timeout=300,
             )
     if proxy:
+        # 已带协议前缀（如 socks5://）的代理不能再加 http://
+        proxy = normalize_proxy(proxy)
         session.proxies.update({
-            "http": "http://" + proxy,
-            "https": "http://" + proxy,
+            "http": proxy,
+            "https": proxy,
         })
 
     session.headers.update(HEADERS)
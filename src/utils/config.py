@@ -3,9 +3,13 @@ from typing import List, Tuple, Optional
 import yaml
 from pathlib import Path
 import asyncio
+import os
 
 from src.utils.constants import DataForTasks
 
+# 配置文件路径的环境变量（容器中无界面运行时使用，分片子进程也会继承）
+CONFIG_PATH_ENV = "GIGA_CONFIG"
+
 
 @dataclass
 class SettingsConfig:
@@ -49,18 +53,178 @@ class ChatGPTConfig:
     API_KEYS: List[str]
     MODEL: str
     PROXY_FOR_CHAT_GPT: str
+    MAX_CONCURRENCY: int
+    MAX_CONNECTIONS: int
+    REQUEST_TIMEOUT: float
 
 @dataclass
 class DeepSeekConfig:
     API_KEYS: List[str]
     MODEL: str
     PROXY_FOR_DEEPSEEK: str
+    MAX_CONNECTIONS: int
+    REQUESTS_PER_SECOND: float
+    BURST: int
+    REQUEST_TIMEOUT: float
+    API_URL: str
+
+@dataclass
+class NetworkConfig:
+    GAME_API_URL: str
+    HTTP2: bool
+    MAX_CONNECTIONS: int
+    MAX_KEEPALIVE_CONNECTIONS: int
+    KEEPALIVE_EXPIRY: float
+    REQUEST_TIMEOUT: float
+
+@dataclass
+class ProxiesConfig:
+    ENABLED: bool
+    PROBE_URL: str
+    PROBE_INTERVAL: float
+    PROBE_TIMEOUT: float
+    PROBE_CONCURRENCY: int
+    EWMA_ALPHA: float
+    FAILURE_THRESHOLD: int
+    MAX_ERROR_RATE: float
+    QUARANTINE_BASE: float
+    QUARANTINE_MAX: float
+    MAX_CONCURRENCY_PER_PROXY: int
+    FAILOVER: bool
+    SPARE_PROXIES_FILE: str
+
+@dataclass
+class AccountsConfig:
+    WATCH: bool
+    WATCH_INTERVAL: float
+    STORE_FILE: str
+    EXPIRY_REPORT_SIZE: int
+
+@dataclass
+class DecisionConfig:
+    LLM_PROVIDER: str
+    USE_LLM_FOR_MOVES: bool
+    MOVE_SOLVER: bool
+    SOLVER_DEPTH: int
+    SOLVER_RISK_AVERSION: float
+    SOLVER_PESSIMISM: float
+    BATCH_ENABLED: bool
+    BATCH_WINDOW_MS: float
+    BATCH_MAX_SIZE: int
+    SPECULATIVE: bool
+
+@dataclass
+class DecisionCacheConfig:
+    ENABLED: bool
+    MAX_SIZE: int
+    TTL: float
+    HEALTH_BUCKET: int
+    SHIELD_BUCKET: int
+    SNAPSHOT_FILE: str
+    SNAPSHOT_INTERVAL: float
+
+@dataclass
+class PacingConfig:
+    ENABLED: bool
+    BASELINE_DELAY: float
+    MIN_DELAY: float
+    MAX_DELAY: float
+    PROXY_MIN_DELAY: float
+    DECREASE_FACTOR: float
+    INCREASE_FACTOR: float
+    BACKOFF_STEP: float
+    LATENCY_THRESHOLD: float
+    RECOVERY_SUCCESSES: int
+
+@dataclass
+class SchedulerConfig:
+    TICK: float
+    WHEEL_SLOTS: int
+    SLEEP_AFTER_RUN: Tuple[float, float]
+    SLEEP_AFTER_ERROR: float
+    FAILURE_WEIGHT: float
+    FAIRNESS_WEIGHT: float
+    EXPIRY_WEIGHT: float
+    EXPIRY_MARGIN: float
+    EXPIRED_RECHECK: float
+
+@dataclass
+class ShardingConfig:
+    PROCESSES: int
+    SHARD_BY: str
+    RESTART_DELAY: float
+    MAX_RESTARTS: int
+    STATS_INTERVAL: float
+
+@dataclass
+class LoggingConfig:
+    LEVEL: str
+    ENQUEUE: bool
+    TURN_SAMPLE_RATE: float
+    RING_BUFFER_SIZE: int
+
+@dataclass
+class MetricsConfig:
+    ENABLED: bool
+    HOST: str
+    PORT: int
+    SNAPSHOT_FILE: str
+    SNAPSHOT_INTERVAL: float
+
+@dataclass
+class RecorderConfig:
+    ENABLED: bool
+    DIRECTORY: str
+    SEGMENT_MAX_RECORDS: int
+    COMPRESSION_LEVEL: int
+    BATCH_SIZE: int
+    FLUSH_INTERVAL: float
+
+@dataclass
+class RetryConfig:
+    BASE_DELAY: float
+    MAX_DELAY: float
+    GAME_ATTEMPTS: int
+    LLM_ATTEMPTS: int
+    BREAKER_FAILURE_THRESHOLD: int
+    BREAKER_COOLDOWN: float
+    BREAKER_MAX_COOLDOWN: float
+    ACCOUNT_MAX_DELAY: float
+
+@dataclass
+class LootWeightsConfig:
+    RARITY: float
+    ADD_MAX_HEALTH: float
+    HEAL: float
+    ADD_MAX_ARMOR: float
+    UPGRADE_ATK: float
+    UPGRADE_DEF: float
+    LOW_HEALTH_BONUS: float
+
+@dataclass
+class LootConfig:
+    SCORER: bool
+    USE_LLM: bool
+    WEIGHTS: LootWeightsConfig
 
 @dataclass
 class Config:
     SETTINGS: SettingsConfig
     CHAT_GPT: ChatGPTConfig
     DEEPSEEK: DeepSeekConfig
+    NETWORK: NetworkConfig
+    PROXIES: ProxiesConfig
+    ACCOUNTS: AccountsConfig
+    DECISION: DecisionConfig
+    DECISION_CACHE: DecisionCacheConfig
+    PACING: PacingConfig
+    SCHEDULER: SchedulerConfig
+    SHARDING: ShardingConfig
+    LOGGING: LoggingConfig
+    METRICS: MetricsConfig
+    RECORDER: RecorderConfig
+    LOOT: LootConfig
+    RETRY: RetryConfig
     lock: asyncio.Lock = field(default_factory=asyncio.Lock)
 
     @classmethod
@@ -98,18 +262,150 @@ class Config:
                 API_KEYS=data["CHAT_GPT"]["API_KEYS"],
                 MODEL=data["CHAT_GPT"]["MODEL"],
                 PROXY_FOR_CHAT_GPT=data["CHAT_GPT"]["PROXY_FOR_CHAT_GPT"],
+                MAX_CONCURRENCY=data["CHAT_GPT"]["MAX_CONCURRENCY"],
+                MAX_CONNECTIONS=data["CHAT_GPT"]["MAX_CONNECTIONS"],
+                REQUEST_TIMEOUT=data["CHAT_GPT"]["REQUEST_TIMEOUT"],
             ),
             DEEPSEEK=DeepSeekConfig(
                 API_KEYS=data["DEEPSEEK"]["API_KEYS"],
                 MODEL=data["DEEPSEEK"]["MODEL"],
                 PROXY_FOR_DEEPSEEK=data["DEEPSEEK"]["PROXY_FOR_DEEPSEEK"],
+                MAX_CONNECTIONS=data["DEEPSEEK"]["MAX_CONNECTIONS"],
+                REQUESTS_PER_SECOND=data["DEEPSEEK"]["REQUESTS_PER_SECOND"],
+                BURST=data["DEEPSEEK"]["BURST"],
+                REQUEST_TIMEOUT=data["DEEPSEEK"]["REQUEST_TIMEOUT"],
+                API_URL=data["DEEPSEEK"]["API_URL"],
+            ),
+            NETWORK=NetworkConfig(
+                GAME_API_URL=data["NETWORK"]["GAME_API_URL"],
+                HTTP2=data["NETWORK"]["HTTP2"],
+                MAX_CONNECTIONS=data["NETWORK"]["MAX_CONNECTIONS"],
+                MAX_KEEPALIVE_CONNECTIONS=data["NETWORK"]["MAX_KEEPALIVE_CONNECTIONS"],
+                KEEPALIVE_EXPIRY=data["NETWORK"]["KEEPALIVE_EXPIRY"],
+                REQUEST_TIMEOUT=data["NETWORK"]["REQUEST_TIMEOUT"],
+            ),
+            PROXIES=ProxiesConfig(
+                ENABLED=data["PROXIES"]["ENABLED"],
+                PROBE_URL=data["PROXIES"]["PROBE_URL"],
+                PROBE_INTERVAL=data["PROXIES"]["PROBE_INTERVAL"],
+                PROBE_TIMEOUT=data["PROXIES"]["PROBE_TIMEOUT"],
+                PROBE_CONCURRENCY=data["PROXIES"]["PROBE_CONCURRENCY"],
+                EWMA_ALPHA=data["PROXIES"]["EWMA_ALPHA"],
+                FAILURE_THRESHOLD=data["PROXIES"]["FAILURE_THRESHOLD"],
+                MAX_ERROR_RATE=data["PROXIES"]["MAX_ERROR_RATE"],
+                QUARANTINE_BASE=data["PROXIES"]["QUARANTINE_BASE"],
+                QUARANTINE_MAX=data["PROXIES"]["QUARANTINE_MAX"],
+                MAX_CONCURRENCY_PER_PROXY=data["PROXIES"]["MAX_CONCURRENCY_PER_PROXY"],
+                FAILOVER=data["PROXIES"]["FAILOVER"],
+                SPARE_PROXIES_FILE=data["PROXIES"]["SPARE_PROXIES_FILE"],
+            ),
+            ACCOUNTS=AccountsConfig(
+                WATCH=data["ACCOUNTS"]["WATCH"],
+                WATCH_INTERVAL=data["ACCOUNTS"]["WATCH_INTERVAL"],
+                STORE_FILE=data["ACCOUNTS"]["STORE_FILE"],
+                EXPIRY_REPORT_SIZE=data["ACCOUNTS"]["EXPIRY_REPORT_SIZE"],
+            ),
+            DECISION=DecisionConfig(
+                LLM_PROVIDER=data["DECISION"]["LLM_PROVIDER"],
+                USE_LLM_FOR_MOVES=data["DECISION"]["USE_LLM_FOR_MOVES"],
+                MOVE_SOLVER=data["DECISION"]["MOVE_SOLVER"],
+                SOLVER_DEPTH=data["DECISION"]["SOLVER_DEPTH"],
+                SOLVER_RISK_AVERSION=data["DECISION"]["SOLVER_RISK_AVERSION"],
+                SOLVER_PESSIMISM=data["DECISION"]["SOLVER_PESSIMISM"],
+                BATCH_ENABLED=data["DECISION"]["BATCH_ENABLED"],
+                BATCH_WINDOW_MS=data["DECISION"]["BATCH_WINDOW_MS"],
+                BATCH_MAX_SIZE=data["DECISION"]["BATCH_MAX_SIZE"],
+                SPECULATIVE=data["DECISION"]["SPECULATIVE"],
+            ),
+            DECISION_CACHE=DecisionCacheConfig(
+                ENABLED=data["DECISION_CACHE"]["ENABLED"],
+                MAX_SIZE=data["DECISION_CACHE"]["MAX_SIZE"],
+                TTL=data["DECISION_CACHE"]["TTL"],
+                HEALTH_BUCKET=data["DECISION_CACHE"]["HEALTH_BUCKET"],
+                SHIELD_BUCKET=data["DECISION_CACHE"]["SHIELD_BUCKET"],
+                SNAPSHOT_FILE=data["DECISION_CACHE"]["SNAPSHOT_FILE"],
+                SNAPSHOT_INTERVAL=data["DECISION_CACHE"]["SNAPSHOT_INTERVAL"],
+            ),
+            PACING=PacingConfig(
+                ENABLED=data["PACING"]["ENABLED"],
+                BASELINE_DELAY=data["PACING"]["BASELINE_DELAY"],
+                MIN_DELAY=data["PACING"]["MIN_DELAY"],
+                MAX_DELAY=data["PACING"]["MAX_DELAY"],
+                PROXY_MIN_DELAY=data["PACING"]["PROXY_MIN_DELAY"],
+                DECREASE_FACTOR=data["PACING"]["DECREASE_FACTOR"],
+                INCREASE_FACTOR=data["PACING"]["INCREASE_FACTOR"],
+                BACKOFF_STEP=data["PACING"]["BACKOFF_STEP"],
+                LATENCY_THRESHOLD=data["PACING"]["LATENCY_THRESHOLD"],
+                RECOVERY_SUCCESSES=data["PACING"]["RECOVERY_SUCCESSES"],
+            ),
+            SCHEDULER=SchedulerConfig(
+                TICK=data["SCHEDULER"]["TICK"],
+                WHEEL_SLOTS=data["SCHEDULER"]["WHEEL_SLOTS"],
+                SLEEP_AFTER_RUN=tuple(data["SCHEDULER"]["SLEEP_AFTER_RUN"]),
+                SLEEP_AFTER_ERROR=data["SCHEDULER"]["SLEEP_AFTER_ERROR"],
+                FAILURE_WEIGHT=data["SCHEDULER"]["FAILURE_WEIGHT"],
+                FAIRNESS_WEIGHT=data["SCHEDULER"]["FAIRNESS_WEIGHT"],
+                EXPIRY_WEIGHT=data["SCHEDULER"]["EXPIRY_WEIGHT"],
+                EXPIRY_MARGIN=data["SCHEDULER"]["EXPIRY_MARGIN"],
+                EXPIRED_RECHECK=data["SCHEDULER"]["EXPIRED_RECHECK"],
+            ),
+            SHARDING=ShardingConfig(
+                PROCESSES=data["SHARDING"]["PROCESSES"],
+                SHARD_BY=data["SHARDING"]["SHARD_BY"],
+                RESTART_DELAY=data["SHARDING"]["RESTART_DELAY"],
+                MAX_RESTARTS=data["SHARDING"]["MAX_RESTARTS"],
+                STATS_INTERVAL=data["SHARDING"]["STATS_INTERVAL"],
+            ),
+            LOGGING=LoggingConfig(
+                LEVEL=data["LOGGING"]["LEVEL"],
+                ENQUEUE=data["LOGGING"]["ENQUEUE"],
+                TURN_SAMPLE_RATE=data["LOGGING"]["TURN_SAMPLE_RATE"],
+                RING_BUFFER_SIZE=data["LOGGING"]["RING_BUFFER_SIZE"],
+            ),
+            METRICS=MetricsConfig(
+                ENABLED=data["METRICS"]["ENABLED"],
+                HOST=data["METRICS"]["HOST"],
+                PORT=data["METRICS"]["PORT"],
+                SNAPSHOT_FILE=data["METRICS"]["SNAPSHOT_FILE"],
+                SNAPSHOT_INTERVAL=data["METRICS"]["SNAPSHOT_INTERVAL"],
+            ),
+            RECORDER=RecorderConfig(
+                ENABLED=data["RECORDER"]["ENABLED"],
+                DIRECTORY=data["RECORDER"]["DIRECTORY"],
+                SEGMENT_MAX_RECORDS=data["RECORDER"]["SEGMENT_MAX_RECORDS"],
+                COMPRESSION_LEVEL=data["RECORDER"]["COMPRESSION_LEVEL"],
+                BATCH_SIZE=data["RECORDER"]["BATCH_SIZE"],
+                FLUSH_INTERVAL=data["RECORDER"]["FLUSH_INTERVAL"],
+            ),
+            LOOT=LootConfig(
+                SCORER=data["LOOT"]["SCORER"],
+                USE_LLM=data["LOOT"]["USE_LLM"],
+                WEIGHTS=LootWeightsConfig(
+                    RARITY=data["LOOT"]["WEIGHTS"]["RARITY"],
+                    ADD_MAX_HEALTH=data["LOOT"]["WEIGHTS"]["ADD_MAX_HEALTH"],
+                    HEAL=data["LOOT"]["WEIGHTS"]["HEAL"],
+                    ADD_MAX_ARMOR=data["LOOT"]["WEIGHTS"]["ADD_MAX_ARMOR"],
+                    UPGRADE_ATK=data["LOOT"]["WEIGHTS"]["UPGRADE_ATK"],
+                    UPGRADE_DEF=data["LOOT"]["WEIGHTS"]["UPGRADE_DEF"],
+                    LOW_HEALTH_BONUS=data["LOOT"]["WEIGHTS"]["LOW_HEALTH_BONUS"],
+                ),
+            ),
+            RETRY=RetryConfig(
+                BASE_DELAY=data["RETRY"]["BASE_DELAY"],
+                MAX_DELAY=data["RETRY"]["MAX_DELAY"],
+                GAME_ATTEMPTS=data["RETRY"]["GAME_ATTEMPTS"],
+                LLM_ATTEMPTS=data["RETRY"]["LLM_ATTEMPTS"],
+                BREAKER_FAILURE_THRESHOLD=data["RETRY"]["BREAKER_FAILURE_THRESHOLD"],
+                BREAKER_COOLDOWN=data["RETRY"]["BREAKER_COOLDOWN"],
+                BREAKER_MAX_COOLDOWN=data["RETRY"]["BREAKER_MAX_COOLDOWN"],
+                ACCOUNT_MAX_DELAY=data["RETRY"]["ACCOUNT_MAX_DELAY"],
             ),
         )
 
 
 # Singleton pattern
-def get_config() -> Config:
-    """Get configuration singleton"""
+def get_config(path: Optional[str] = None) -> Config:
+    """Get configuration singleton (path -> $GIGA_CONFIG -> config.yaml, only the first call loads)"""
     if not hasattr(get_config, "_config"):
-        get_config._config = Config.load()
+        get_config._config = Config.load(path or os.environ.get(CONFIG_PATH_ENV) or "config.yaml")
     return get_config._config
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+from loguru import logger
+
+from src.utils.config import Config, get_config
+
+
+class DecisionCache:
+    """
+    LLM决策缓存（出招与战利品）。
+
+    以规范化的状态签名为键缓存解析后的决策，支持：
+    - LRU + TTL 淘汰
+    - 相同查询的并发去重（同一签名只发送一次LLM请求）
+    - 磁盘快照，重启后仍然有效
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl: float = 86400,
+        health_bucket: int = 1,
+        shield_bucket: int = 1,
+        snapshot_file: str = "",
+        snapshot_interval: float = 60,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.health_bucket = max(1, health_bucket)
+        self.shield_bucket = max(1, shield_bucket)
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+
+        # key -> (decision, 写入时间)
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._dirty = False
+        self._last_snapshot = time.time()
+
+        self.hits = 0
+        self.misses = 0
+        self.inflight_hits = 0
+        self.evictions = 0
+        self.expired = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> "DecisionCache":
+        return cls(
+            max_size=config.DECISION_CACHE.MAX_SIZE,
+            ttl=config.DECISION_CACHE.TTL,
+            health_bucket=config.DECISION_CACHE.HEALTH_BUCKET,
+            shield_bucket=config.DECISION_CACHE.SHIELD_BUCKET,
+            snapshot_file=config.DECISION_CACHE.SNAPSHOT_FILE,
+            snapshot_interval=config.DECISION_CACHE.SNAPSHOT_INTERVAL,
+        )
+
+    # ---------- 状态签名 ----------
+
+    def _side_signature(self, side) -> list:
+        return [
+            (side.health or 0) // self.health_bucket,
+            (side.shield or 0) // self.shield_bucket,
+            *(value for move in side.moves for value in (move.atk, move.defense, move.charges)),
+        ]
+
+    def move_signature(self, player, enemy) -> str:
+        """出招状态签名：双方血量/护盾（可分桶）与三种招式的ATK/DEF/Charges"""
+        parts = ["move", player.max_health or 0]
+        parts += self._side_signature(player)
+        parts += self._side_signature(enemy)
+        return "|".join(map(str, parts))
+
+    def loot_signature(self, player, loot_options: list) -> str:
+        """战利品状态签名：玩家状态与规范化后的战利品选项"""
+        parts = ["loot", player.max_health or 0]
+        parts += self._side_signature(player)
+        parts += [json.dumps(option, sort_keys=True, separators=(",", ":")) for option in loot_options]
+        return "|".join(map(str, parts))
+
+    # ---------- 读写 ----------
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, created_at = entry
+        if self.ttl and time.time() - created_at > self.ttl:
+            del self._entries[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: str, created_at: float | None = None):
+        self._entries[key] = (value, created_at or time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+        self._dirty = True
+        self._maybe_snapshot()
+
+    async def get_or_compute(
+        self, key: str, factory: Callable[[], Awaitable[Optional[str]]]
+    ) -> Optional[str]:
+        """
+        先查缓存；未命中时调用 factory 计算。
+        同一签名的并发查询只会调用一次 factory，其余等待同一结果。
+        factory 返回 None 时不缓存。
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.inflight_hits += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await factory()
+            if value is not None:
+                self.set(key, value)
+            return value
+        finally:
+            if not future.done():
+                # factory 异常时等待者得到 None，由调用方走本地兜底逻辑
+                future.set_result(value)
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "inflight_hits": self.inflight_hits,
+            "evictions": self.evictions,
+            "expired": self.expired,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ---------- 磁盘快照 ----------
+
+    def load(self) -> int:
+        """从快照文件加载未过期的条目，返回加载数量"""
+        if not self.snapshot_file or not os.path.exists(self.snapshot_file):
+            return 0
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as file:
+                entries = json.load(file)
+        except Exception as e:
+            logger.warning(f"Failed to load decision cache snapshot {self.snapshot_file}: {e}")
+            return 0
+
+        now = time.time()
+        for key, value, created_at in entries:
+            if not self.ttl or now - created_at <= self.ttl:
+                self.set(key, value, created_at)
+        self._dirty = False
+        logger.info(f"Loaded {len(self._entries)} cached decisions from {self.snapshot_file}")
+        return len(self._entries)
+
+    def save(self):
+        """同步写入快照（程序退出时调用）"""
+        if not self.snapshot_file or not self._dirty:
+            return
+        self._write_snapshot(self._snapshot_entries())
+        self._dirty = False
+
+    def _snapshot_entries(self) -> list:
+        return [[key, value, created_at] for key, (value, created_at) in self._entries.items()]
+
+    def _write_snapshot(self, entries: list):
+        try:
+            directory = os.path.dirname(self.snapshot_file)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 多进程分片时各进程写入各自的临时文件
+            tmp_file = f"{self.snapshot_file}.{os.getpid()}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as file:
+                json.dump(entries, file, ensure_ascii=False)
+            os.replace(tmp_file, self.snapshot_file)
+        except Exception as e:
+            logger.warning(f"Failed to write decision cache snapshot {self.snapshot_file}: {e}")
+
+    def _maybe_snapshot(self):
+        """距上次快照超过 snapshot_interval 时，在线程池中写入快照，不阻塞事件循环"""
+        if not self.snapshot_file or time.time() - self._last_snapshot < self.snapshot_interval:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._last_snapshot = time.time()
+        self._dirty = False
+        loop.run_in_executor(None, self._write_snapshot, self._snapshot_entries())
+
+
+# Singleton pattern
+def get_decision_cache() -> DecisionCache:
+    """Get decision cache singleton"""
+    if not hasattr(get_decision_cache, "_cache"):
+        cache = DecisionCache.from_config(get_config())
+        cache.load()
+        get_decision_cache._cache = cache
+    return get_decision_cache._cache
+
+
+def close_decision_cache():
+    """保存快照并输出命中统计（程序退出时调用）"""
+    if hasattr(get_decision_cache, "_cache"):
+        cache = get_decision_cache._cache
+        cache.save()
+        logger.info(f"Decision cache stats: {cache.stats()}")
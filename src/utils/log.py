@@ -0,0 +1,178 @@
+import inspect
+import logging
+import queue
+import random
+import sys
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from loguru import logger
+
+from src.utils.config import Config, get_config
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+LOG_FORMAT = (
+    "<light-cyan>{time:HH:mm:ss}</light-cyan> | <level>{level: <8}</level> | "
+    "<fg #ffffff>{name}:{line}</fg #ffffff> - <bold>{message}</bold>"
+)
+
+
+class InterceptHandler(logging.Handler):
+    """将标准库 logging 的日志转交给 loguru，统一经过同一个（异步）输出"""
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+        # 跳过 logging 模块内部的调用帧，使 {name}:{line} 指向真正的调用方
+        frame, depth = inspect.currentframe(), 0
+        while frame and (depth == 0 or frame.f_code.co_filename == logging.__file__):
+            frame = frame.f_back
+            depth += 1
+        logger.opt(depth=depth, exception=record.exc_info).log(level, record.getMessage())
+
+
+def setup_logging(config: Config):
+    """配置 loguru 输出；ENQUEUE 时由后台线程写出，调用方不会因 IO 阻塞"""
+    logger.remove()
+    logger.add(
+        sys.stdout,
+        level=config.LOGGING.LEVEL,
+        enqueue=config.LOGGING.ENQUEUE,
+        colorize=True,
+        format=LOG_FORMAT,
+    )
+    logging.basicConfig(handlers=[InterceptHandler()], level=config.LOGGING.LEVEL, force=True)
+
+
+def _render(event: str, fields: dict) -> str:
+    if not fields:
+        return event
+    return f"{event} " + " ".join(f"{key}={value}" for key, value in fields.items())
+
+
+class EventWriter:
+    """
+    事件写出线程。调用方只把未格式化的元组放入队列，
+    格式化与写入 loguru 都在后台线程完成，不占用事件循环。
+    """
+
+    def __init__(self):
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.thread: Optional[threading.Thread] = None
+
+    def put(self, item: tuple):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="event-writer", daemon=True)
+            self.thread.start()
+        self.queue.put(item)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            module, line, level, message = item
+            try:
+                logger.patch(lambda record: record.update(name=module, line=line)).log(
+                    LEVEL_NAMES[level], message()
+                )
+            except Exception as e:
+                logger.warning(f"Failed to write log event: {e}")
+
+    def close(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout=5)
+            self.thread = None
+
+
+class EventLog:
+    """
+    单个账户的结构化事件日志。
+
+    event() 只接收事件名和字段，先检查级别与采样，通过后将未格式化的字段交给写出线程；
+    未输出的事件以原始元组存入环形缓冲区（不做任何格式化），
+    仅在出错时通过 flush() 一次性输出，用于还原出错前的上下文。
+    """
+
+    __slots__ = ("name", "min_level", "ring", "writer")
+
+    def __init__(self, name: str, writer: EventWriter, min_level: int = INFO, ring_size: int = 100):
+        self.name = name
+        self.writer = writer
+        self.min_level = min_level
+        self.ring: Optional[deque] = deque(maxlen=ring_size) if ring_size > 0 else None
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.min_level
+
+    def event(self, level: int, event: str, sample: float = 1.0, **fields):
+        if level >= self.min_level and (sample >= 1.0 or random.random() < sample):
+            caller = sys._getframe(1)
+            self.writer.put((
+                caller.f_globals.get("__name__"),
+                caller.f_lineno,
+                level,
+                lambda: f"{self.name} | {_render(event, fields)}",
+            ))
+        elif self.ring is not None:
+            self.ring.append((time.time(), level, event, fields))
+
+    def flush(self, reason: str):
+        """输出并清空环形缓冲区中的事件"""
+        if not self.ring:
+            return
+        records = list(self.ring)
+        self.ring.clear()
+
+        def message() -> str:
+            lines = [
+                f"{time.strftime('%H:%M:%S', time.localtime(ts))}.{int(ts * 1000) % 1000:03d} "
+                f"{LEVEL_NAMES[level]:<7} {_render(event, fields)}"
+                for ts, level, event, fields in records
+            ]
+            return f"{self.name} | {reason}，最近 {len(lines)} 条未输出的事件:\n" + "\n".join(lines)
+
+        caller = sys._getframe(1)
+        self.writer.put((caller.f_globals.get("__name__"), caller.f_lineno, ERROR, message))
+
+
+class EventLogs:
+    """按账户维护的 EventLog 集合"""
+
+    def __init__(self, config: Config):
+        self.min_level = logger.level(config.LOGGING.LEVEL).no
+        self.ring_size = config.LOGGING.RING_BUFFER_SIZE
+        self.writer = EventWriter()
+        self.accounts: dict[int, EventLog] = {}
+
+    def for_account(self, index: int) -> EventLog:
+        log = self.accounts.get(index)
+        if log is None:
+            log = EventLog(str(index), self.writer, self.min_level, self.ring_size)
+            self.accounts[index] = log
+        return log
+
+
+# Singleton pattern
+def get_event_logs() -> EventLogs:
+    """Get event log registry singleton"""
+    if not hasattr(get_event_logs, "_logs"):
+        get_event_logs._logs = EventLogs(get_config())
+    return get_event_logs._logs
+
+
+def close_event_logs():
+    """等待写出线程输出剩余事件（程序退出时调用）"""
+    if hasattr(get_event_logs, "_logs"):
+        get_event_logs._logs.writer.close()
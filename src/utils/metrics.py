@@ -0,0 +1,310 @@
+import asyncio
+import bisect
+import os
+import time
+from typing import TYPE_CHECKING, Optional
+
+from loguru import logger
+
+from src.utils.config import Config
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# 默认直方图分桶（秒），覆盖从微秒级的本地计算到分钟级的LLM请求
+DEFAULT_BUCKETS = (
+    0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120,
+)
+
+
+def _label_text(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{str(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def key_label(api_key: str) -> str:
+    """API密钥的标签值，只保留首尾几位"""
+    if len(api_key) <= 10:
+        return "***"
+    return f"{api_key[:5]}...{api_key[-4:]}"
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for values, total in self._values.items():
+            lines.append(f"{self.name}{_label_text(self.labels, values)} {total}")
+        return lines
+
+    def snapshot(self) -> dict:
+        return {"|".join(map(str, values)) or "total": total for values, total in self._values.items()}
+
+
+class Gauge:
+    """当前值（打开的连接数等），可直接设置或增减"""
+
+    def __init__(self, name: str, description: str, labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self._values: dict[tuple, float] = {}
+
+    def set(self, value: float, *label_values):
+        self._values[label_values] = value
+
+    def inc(self, *label_values, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} gauge"]
+        for values, value in self._values.items():
+            lines.append(f"{self.name}{_label_text(self.labels, values)} {value}")
+        return lines
+
+    def snapshot(self) -> dict:
+        return {"|".join(map(str, values)) or "total": value for values, value in self._values.items()}
+
+
+class _Series:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """固定分桶直方图，observe 为 O(log 分桶数)，不保存原始样本"""
+
+    def __init__(self, name: str, description: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = labels
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, _Series] = {}
+
+    def observe(self, value: float, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = _Series(len(self.buckets) + 1)
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.total += value
+        series.count += 1
+
+    def quantile(self, q: float, *label_values) -> float:
+        """按分桶上界估算分位数"""
+        series = self._series.get(label_values)
+        if not series or not series.count:
+            return 0.0
+        rank = q * series.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, series.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float("inf")
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for values, series in self._series.items():
+            cumulative = 0
+            labels = _label_text(self.labels, values)
+            for bound, count in zip(self.buckets, series.counts):
+                cumulative += count
+                bucket_labels = _label_text(self.labels, values, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = _label_text(self.labels, values, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{bucket_labels} {series.count}")
+            lines.append(f"{self.name}_sum{labels} {series.total}")
+            lines.append(f"{self.name}_count{labels} {series.count}")
+        return lines
+
+    def snapshot(self) -> dict:
+        return {
+            "|".join(map(str, values)) or "total": {
+                "count": series.count,
+                "avg": round(series.total / series.count, 6) if series.count else 0.0,
+                "p50": self.quantile(0.5, *values),
+                "p99": self.quantile(0.99, *values),
+            }
+            for values, series in self._series.items()
+        }
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: list = []
+
+    def counter(self, name: str, description: str, labels: tuple = ()) -> Counter:
+        metric = Counter(name, description, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, description: str, labels: tuple = ()) -> Gauge:
+        metric = Gauge(name, description, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, description: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, description, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Prometheus 文本格式"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+
+REGISTRY = MetricsRegistry()
+
+ACTION_LATENCY = REGISTRY.histogram(
+    "giga_action_latency_seconds", "Game action HTTP round trip per attempt", ("action",))
+ACTION_RESULTS = REGISTRY.counter(
+    "giga_action_results_total", "Game action attempts by HTTP status (error = transport failure)", ("action", "status"))
+PACING_WAIT = REGISTRY.histogram(
+    "giga_pacing_wait_seconds", "Time spent waiting for the adaptive pacer before an action", ("scope",))
+RESPONSE_DECODE = REGISTRY.histogram(
+    "giga_response_decode_seconds", "Time to decode a game action response")
+UPDATE_STATUS = REGISTRY.histogram(
+    "giga_update_status_seconds", "Time spent in GameClient.update_status")
+DECISION_TIME = REGISTRY.histogram(
+    "giga_decision_seconds", "Time to choose a move or loot (solver, cache and LLM)", ("kind",))
+LLM_LATENCY = REGISTRY.histogram(
+    "giga_llm_latency_seconds", "LLM request latency", ("provider", "key"))
+LLM_QUEUE_WAIT = REGISTRY.histogram(
+    "giga_llm_queue_wait_seconds", "Time waiting for the LLM rate limiter or concurrency slot", ("provider",))
+LLM_FAILURES = REGISTRY.counter(
+    "giga_llm_failures_total", "Failed LLM requests", ("provider", "key"))
+SCHEDULER_WAIT = REGISTRY.histogram(
+    "giga_scheduler_wait_seconds", "Time a ready account waits for a free worker")
+WRAPPER_RETRIES = REGISTRY.counter(
+    "giga_wrapper_retries_total", "Retries performed by process.wrapper", ("function", "reason"))
+RETRIES = REGISTRY.counter(
+    "giga_retries_total", "Retries performed by RetryPolicy", ("operation", "error"))
+BREAKER_TRANSITIONS = REGISTRY.counter(
+    "giga_circuit_transitions_total", "Circuit breaker state changes", ("endpoint", "state"))
+PROXY_STATES = REGISTRY.gauge(
+    "giga_proxies", "Known proxies by health state", ("state",))
+PROXY_PROBES = REGISTRY.counter(
+    "giga_proxy_probes_total", "Proxy health probes by result", ("result",))
+PROXY_FAILOVERS = REGISTRY.counter(
+    "giga_proxy_failovers_total", "Accounts switched to a spare proxy")
+
+
+class MetricsExporter:
+    """
+    指标导出：
+    - PORT > 0 时在 HOST:PORT/metrics 提供 Prometheus 文本格式
+    - SNAPSHOT_FILE 非空时每 SNAPSHOT_INTERVAL 秒原子写入一次同样格式的快照文件
+    """
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 0,
+                 snapshot_file: str = "", snapshot_interval: float = 60):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.snapshot_file = snapshot_file
+        self.snapshot_interval = snapshot_interval
+        self._runner: Optional["web.AppRunner"] = None
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, config: Config) -> "MetricsExporter":
+        return cls(
+            REGISTRY,
+            host=config.METRICS.HOST,
+            port=config.METRICS.PORT,
+            snapshot_file=config.METRICS.SNAPSHOT_FILE,
+            snapshot_interval=config.METRICS.SNAPSHOT_INTERVAL,
+        )
+
+    async def _handle_metrics(self, request: "web.Request") -> "web.Response":
+        from aiohttp import web
+
+        return web.Response(
+            body=self.registry.render().encode("utf-8"),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
+
+    async def start(self):
+        if self.port:
+            # aiohttp 只在开启 HTTP 端点时导入
+            from aiohttp import web
+
+            app = web.Application()
+            app.router.add_get("/metrics", self._handle_metrics)
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            try:
+                await web.TCPSite(self._runner, self.host, self.port).start()
+                logger.info(f"Metrics available at http://{self.host}:{self.port}/metrics")
+            except OSError as e:
+                logger.warning(f"Failed to start metrics endpoint on {self.host}:{self.port}: {e}")
+                await self._runner.cleanup()
+                self._runner = None
+        if self.snapshot_file:
+            self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+
+    def write_snapshot(self):
+        directory = os.path.dirname(self.snapshot_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_file = f"{self.snapshot_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            file.write(f"# snapshot at {time.strftime('%Y-%m-%d %H:%M:%S')}\n")
+            file.write(self.registry.render())
+        os.replace(tmp_file, self.snapshot_file)
+
+    async def _snapshot_loop(self):
+        while True:
+            await asyncio.sleep(self.snapshot_interval)
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.write_snapshot)
+            except Exception as e:
+                logger.warning(f"Failed to write metrics snapshot {self.snapshot_file}: {e}")
+
+    async def stop(self):
+        if self._snapshot_task:
+            self._snapshot_task.cancel()
+            await asyncio.gather(self._snapshot_task, return_exceptions=True)
+            self._snapshot_task = None
+            try:
+                self.write_snapshot()
+            except Exception as e:
+                logger.warning(f"Failed to write metrics snapshot {self.snapshot_file}: {e}")
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def start_metrics_exporter(config: Config) -> Optional[MetricsExporter]:
+    """按 METRICS 配置启动导出，未启用时返回 None"""
+    if not config.METRICS.ENABLED:
+        return None
+    exporter = MetricsExporter.from_config(config)
+    await exporter.start()
+    return exporter
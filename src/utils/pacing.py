@@ -0,0 +1,216 @@
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from loguru import logger
+
+from src.utils.config import Config, get_config
+
+# 视为“服务器要求减速”的状态码
+THROTTLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After 响应头（秒数或HTTP日期），返回需要等待的秒数"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptivePacer:
+    """
+    根据服务器反馈自适应调整的动作间隔。
+
+    - 成功且延迟正常：间隔按 decrease_factor 缩小，但不低于已学习到的安全下限
+    - 被限流/服务器错误/异常：间隔按 increase_factor 放大（至少放大到 backoff_step），并把出错时的间隔记为安全下限
+    - 连续成功 recovery_successes 次后安全下限逐步放宽，以便重新探测
+    - 服务器返回 Retry-After 时至少等待该时长
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_delay: float = 3.0,
+        min_delay: float = 0.5,
+        max_delay: float = 60.0,
+        decrease_factor: float = 0.85,
+        increase_factor: float = 2.0,
+        backoff_step: float = 0.5,
+        latency_threshold: float = 2.0,
+        recovery_successes: int = 20,
+        baseline_delay: float = 3.0,
+    ):
+        self.name = name
+        self.delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max(max_delay, min_delay)
+        self.decrease_factor = decrease_factor
+        self.increase_factor = increase_factor
+        self.backoff_step = backoff_step
+        self.latency_threshold = latency_threshold
+        self.recovery_successes = recovery_successes
+        self.baseline_delay = baseline_delay
+
+        self.safe_floor = min_delay
+        self._last_action_at = 0.0
+        self._blocked_until = 0.0
+        self._success_streak = 0
+        self._lock = asyncio.Lock()
+
+        self.actions = 0
+        # 原固定间隔实现会等待 baseline_delay 的次数（每个未结束房间的回合之后、每次重试之前）
+        self.baseline_sleeps = 0
+        self.errors = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.total_latency = 0.0
+
+    async def wait(self) -> float:
+        """等待到允许发送下一个动作的时间，返回实际等待的秒数"""
+        async with self._lock:
+            now = time.monotonic()
+            ready_at = max(self._last_action_at + self.delay, self._blocked_until)
+            waited = max(0.0, ready_at - now)
+            if waited > 0:
+                await asyncio.sleep(waited)
+            self._last_action_at = time.monotonic()
+            self.actions += 1
+            self.total_wait += waited
+            return waited
+
+    def note_baseline_sleep(self):
+        """记录一次原固定间隔实现会等待的位置，用于统计 saved_vs_fixed"""
+        self.baseline_sleeps += 1
+
+    def _slow_down(self, factor: float) -> float:
+        """放大后的间隔：间隔为 0 时乘法放大无效，因此至少为 backoff_step"""
+        return min(self.max_delay, max(self.delay * factor, self.backoff_step))
+
+    def record(self, status: Optional[int], latency: float, retry_after: Optional[float] = None):
+        """
+        记录一次请求结果。status 为 None 表示请求异常（超时、连接失败等）。
+        """
+        self.total_latency += latency
+        if status is not None and status < 400 and latency <= self.latency_threshold:
+            self._success_streak += 1
+            if self._success_streak >= self.recovery_successes:
+                self._success_streak = 0
+                self.safe_floor = max(self.min_delay, self.safe_floor * self.decrease_factor)
+            self.delay = max(self.safe_floor, self.delay * self.decrease_factor)
+            return
+
+        self._success_streak = 0
+        if status is not None and status < 400:
+            # 成功但延迟偏高，轻微放慢
+            self.delay = self._slow_down(1 + (self.increase_factor - 1) / 4)
+            return
+
+        if status is None or status in THROTTLE_STATUSES:
+            if status is None:
+                self.errors += 1
+            else:
+                self.throttled += 1
+            self.safe_floor = min(self.max_delay, max(self.safe_floor, self.delay * 1.1))
+            self.delay = max(self._slow_down(self.increase_factor), self.safe_floor)
+        else:
+            # 其他4xx与节奏无关（例如token失效），不调整间隔
+            self.errors += 1
+
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            self.delay = min(self.max_delay, max(self.delay, retry_after))
+
+    def stats(self) -> dict:
+        # 与原实现在相同位置固定等待 baseline_delay 相比节省的时间（原实现在开局、选择战利品等动作前不等待）
+        baseline = self.baseline_sleeps * self.baseline_delay
+        return {
+            "delay": round(self.delay, 3),
+            "safe_floor": round(self.safe_floor, 3),
+            "actions": self.actions,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "total_wait": round(self.total_wait, 2),
+            "avg_latency": round(self.total_latency / self.actions, 3) if self.actions else 0.0,
+            "saved_vs_fixed": round(baseline - self.total_wait, 2),
+        }
+
+
+class PacerRegistry:
+    """按账户和按代理分别维护的 AdaptivePacer 集合"""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.accounts: dict[int, AdaptivePacer] = {}
+        self.proxies: dict[str, AdaptivePacer] = {}
+
+    def _new_pacer(self, name: str, initial_delay: float, min_delay: float) -> AdaptivePacer:
+        pacing = self.config.PACING
+        if not pacing.ENABLED:
+            # 关闭时保持固定间隔
+            return AdaptivePacer(
+                name, initial_delay=initial_delay, min_delay=initial_delay, max_delay=initial_delay,
+                baseline_delay=pacing.BASELINE_DELAY,
+            )
+        return AdaptivePacer(
+            name,
+            initial_delay=initial_delay,
+            min_delay=min_delay,
+            max_delay=pacing.MAX_DELAY,
+            decrease_factor=pacing.DECREASE_FACTOR,
+            increase_factor=pacing.INCREASE_FACTOR,
+            backoff_step=pacing.BACKOFF_STEP,
+            latency_threshold=pacing.LATENCY_THRESHOLD,
+            recovery_successes=pacing.RECOVERY_SUCCESSES,
+            baseline_delay=pacing.BASELINE_DELAY,
+        )
+
+    def for_account(self, index: int) -> AdaptivePacer:
+        pacer = self.accounts.get(index)
+        if pacer is None:
+            pacing = self.config.PACING
+            pacer = self._new_pacer(f"account-{index}", pacing.BASELINE_DELAY, pacing.MIN_DELAY)
+            self.accounts[index] = pacer
+        return pacer
+
+    def for_proxy(self, proxy: str) -> AdaptivePacer:
+        pacer = self.proxies.get(proxy)
+        if pacer is None:
+            pacing = self.config.PACING
+            pacer = self._new_pacer(f"proxy-{proxy or 'direct'}", pacing.PROXY_MIN_DELAY, pacing.PROXY_MIN_DELAY)
+            self.proxies[proxy] = pacer
+        return pacer
+
+    def stats(self) -> dict:
+        accounts = [pacer.stats() for pacer in self.accounts.values()]
+        actions = sum(item["actions"] for item in accounts)
+        return {
+            "accounts": len(accounts),
+            "actions": actions,
+            "total_wait": round(sum(item["total_wait"] for item in accounts), 2),
+            "saved_vs_fixed": round(sum(item["saved_vs_fixed"] for item in accounts), 2),
+            "avg_delay": round(sum(item["delay"] for item in accounts) / len(accounts), 3) if accounts else 0.0,
+            "throttled": sum(item["throttled"] for item in accounts),
+            "errors": sum(item["errors"] for item in accounts),
+        }
+
+
+# Singleton pattern
+def get_pacers() -> PacerRegistry:
+    """Get pacer registry singleton"""
+    if not hasattr(get_pacers, "_registry"):
+        get_pacers._registry = PacerRegistry(get_config())
+    return get_pacers._registry
+
+
+def log_pacing_stats():
+    """输出节奏统计（程序退出时调用）"""
+    if hasattr(get_pacers, "_registry"):
+        logger.info(f"Pacing stats: {get_pacers._registry.stats()}")
@@ -0,0 +1,368 @@
+"""
+代理健康管理。
+
+- 探测：启动时并发探测所有代理，之后按 probe_interval 定期探测；只要能收到 HTTP 响应（407 除外）即视为可用
+- 评分：探测与实际游戏请求都会更新代理的延迟与错误率（指数加权移动平均）
+- 隔离：连续失败达到阈值或错误率过高的代理被隔离，隔离时间按次数指数增长；
+  隔离期间不会发出任何请求，到期后先探测成功才恢复使用
+- 并发上限：每个代理同时进行的游戏请求数量有上限
+- 故障转移（可选）：账户代理被隔离时改用备用代理中评分最好的一个，原代理恢复后切回
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from loguru import logger
+
+from src.utils.config import Config, get_config
+from src.utils.constants import Account
+from src.utils.metrics import PROXY_FAILOVERS, PROXY_PROBES, PROXY_STATES
+from src.utils.reader import read_txt_file
+from src.utils.retry import RetryableError
+from src.utils.transport import get_transport_pool, mask_proxy, normalize_proxy
+
+# 代理本身拒绝请求（认证失败）
+PROXY_AUTH_REQUIRED = 407
+
+# 只有连接不上代理或代理报错才算代理的问题；读超时、连接被服务器重置等是上游的问题，不计入代理评分
+PROXY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ProxyError)
+
+
+def is_proxy_failure(error: BaseException) -> bool:
+    return isinstance(error, PROXY_ERRORS)
+
+
+class ProxyUnavailableError(RetryableError):
+    """账户的代理处于隔离期（或拒绝认证）且没有可用的备用代理，retry_after 为剩余隔离时间"""
+
+    # 代理的问题不代表上游接口故障，不计入熔断器
+    counts_for_breaker = False
+
+
+class ProxyState:
+    """单个代理的健康状态"""
+
+    __slots__ = (
+        "proxy", "latency", "error_rate", "samples", "consecutive_failures", "strikes",
+        "quarantined_until", "last_quarantined", "next_probe", "probing", "in_flight", "semaphore",
+    )
+
+    def __init__(self, proxy: str, max_concurrency: int = 0):
+        self.proxy = proxy
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.samples = 0
+        self.consecutive_failures = 0
+        # 连续被隔离的次数，决定下一次隔离时长
+        self.strikes = 0
+        self.quarantined_until = 0.0
+        self.last_quarantined = 0.0
+        self.next_probe = 0.0
+        self.probing = False
+        self.in_flight = 0
+        self.semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+
+    @property
+    def quarantined(self) -> bool:
+        return self.quarantined_until > 0
+
+    def score(self) -> float:
+        """越小越好：延迟按错误率与当前并发放大，未探测过的代理排在已知健康的代理之后"""
+        latency = self.latency if self.latency is not None else 10.0
+        return latency * (1 + 4 * self.error_rate) * (1 + self.in_flight)
+
+
+class ProxyManager:
+    """
+    Args:
+        probe_url: 探测请求地址
+        probe_interval: 健康代理的探测间隔（秒）
+        probe_timeout: 探测请求超时（秒）
+        probe_concurrency: 同时进行的探测数量
+        ewma_alpha: 延迟与错误率的平滑系数
+        failure_threshold: 连续失败多少次后隔离
+        max_error_rate: 错误率（至少 failure_threshold 个样本）超过该值时隔离
+        quarantine_base: 第一次隔离的时长（秒），之后每次翻倍
+        quarantine_max: 隔离时长上限（秒）
+        max_concurrency: 每个代理同时进行的请求数上限，0 表示不限制
+        spares: 备用代理，为空时不做故障转移
+    """
+
+    def __init__(
+        self,
+        probe_url: str,
+        probe_interval: float = 300,
+        probe_timeout: float = 10,
+        probe_concurrency: int = 50,
+        ewma_alpha: float = 0.2,
+        failure_threshold: int = 3,
+        max_error_rate: float = 0.5,
+        quarantine_base: float = 60,
+        quarantine_max: float = 3600,
+        max_concurrency: int = 0,
+        spares: Iterable[str] = (),
+    ):
+        self.probe_url = probe_url
+        self.probe_interval = probe_interval
+        self.probe_timeout = probe_timeout
+        self.probe_semaphore = asyncio.Semaphore(max(1, probe_concurrency))
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = max(1, failure_threshold)
+        self.max_error_rate = max_error_rate
+        self.quarantine_base = quarantine_base
+        self.quarantine_max = max(quarantine_max, quarantine_base)
+        self.max_concurrency = max_concurrency
+
+        self.states: Dict[str, ProxyState] = {}
+        self.spares: List[str] = []
+        for proxy in spares:
+            self.spares.append(self.state(proxy).proxy)
+        # 账户序号 -> 当前使用的备用代理（同一账户尽量保持同一出口）
+        self._failover: Dict[int, str] = {}
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ProxyManager":
+        spares = []
+        if config.PROXIES.FAILOVER and config.PROXIES.SPARE_PROXIES_FILE:
+            spares = read_txt_file("spare proxies", config.PROXIES.SPARE_PROXIES_FILE)
+        probe_url = config.PROXIES.PROBE_URL
+        if not probe_url:
+            # 默认探测游戏接口所在的站点
+            parts = urlsplit(config.NETWORK.GAME_API_URL)
+            probe_url = f"{parts.scheme}://{parts.netloc}/"
+        return cls(
+            probe_url=probe_url,
+            probe_interval=config.PROXIES.PROBE_INTERVAL,
+            probe_timeout=config.PROXIES.PROBE_TIMEOUT,
+            probe_concurrency=config.PROXIES.PROBE_CONCURRENCY,
+            ewma_alpha=config.PROXIES.EWMA_ALPHA,
+            failure_threshold=config.PROXIES.FAILURE_THRESHOLD,
+            max_error_rate=config.PROXIES.MAX_ERROR_RATE,
+            quarantine_base=config.PROXIES.QUARANTINE_BASE,
+            quarantine_max=config.PROXIES.QUARANTINE_MAX,
+            max_concurrency=config.PROXIES.MAX_CONCURRENCY_PER_PROXY,
+            spares=spares,
+        )
+
+    def state(self, proxy: str) -> ProxyState:
+        """获取代理的状态，首次出现的代理（例如热加载新增）自动登记"""
+        proxy = normalize_proxy(proxy)
+        state = self.states.get(proxy)
+        if state is None:
+            state = self.states[proxy] = ProxyState(proxy, self.max_concurrency)
+        return state
+
+    def register(self, proxies: Iterable[str]):
+        for proxy in proxies:
+            self.state(proxy)
+
+    # ---------- 记录结果 ----------
+
+    def record(self, proxy: str, latency: Optional[float], ok: bool):
+        """记录一次探测或实际请求的结果"""
+        state = self.state(proxy)
+        alpha = self.ewma_alpha
+        state.samples += 1
+        state.error_rate += alpha * ((0.0 if ok else 1.0) - state.error_rate)
+        if ok:
+            if latency is not None:
+                state.latency = latency if state.latency is None else state.latency + alpha * (latency - state.latency)
+            state.consecutive_failures = 0
+            return
+
+        state.consecutive_failures += 1
+        if state.quarantined or not state.proxy:
+            # 直连（未配置代理）没有可切换的出口，只记录不隔离
+            return
+        if state.consecutive_failures >= self.failure_threshold or (
+            state.samples >= self.failure_threshold and state.error_rate > self.max_error_rate
+        ):
+            self._quarantine(state)
+
+    def _quarantine(self, state: ProxyState):
+        now = time.monotonic()
+        if now - state.last_quarantined > self.quarantine_max + self.probe_interval:
+            # 距上次隔离已经很久，重新从最短隔离时间开始
+            state.strikes = 0
+        duration = min(self.quarantine_max, self.quarantine_base * 2 ** min(state.strikes, 32))
+        state.strikes += 1
+        state.quarantined_until = now + duration
+        state.last_quarantined = now
+        state.next_probe = state.quarantined_until
+        PROXY_STATES.set(self.quarantined_count(), "quarantined")
+        logger.warning(
+            f"Proxy {mask_proxy(state.proxy)} quarantined for {duration:.0f}s "
+            f"({state.consecutive_failures} consecutive failures, error rate {state.error_rate:.0%})"
+        )
+
+    def _release(self, state: ProxyState):
+        state.quarantined_until = 0.0
+        state.error_rate = 0.0
+        state.consecutive_failures = 0
+        PROXY_STATES.set(self.quarantined_count(), "quarantined")
+        logger.info(f"Proxy {mask_proxy(state.proxy)} passed its probe and is back in rotation")
+
+    # ---------- 探测 ----------
+
+    async def probe(self, proxy: str) -> bool:
+        state = self.state(proxy)
+        if state.probing:
+            return not state.quarantined
+        state.probing = True
+        try:
+            async with self.probe_semaphore:
+                client = get_transport_pool().get(state.proxy)
+                started = time.monotonic()
+                try:
+                    response = await client.get(self.probe_url, timeout=self.probe_timeout)
+                    ok = response.status_code != PROXY_AUTH_REQUIRED
+                except Exception as e:
+                    logger.debug(f"Probe via {mask_proxy(state.proxy)} failed: {e}")
+                    ok = False
+                latency = time.monotonic() - started
+        finally:
+            state.probing = False
+
+        PROXY_PROBES.inc("ok" if ok else "failed")
+        if state.quarantined:
+            if ok:
+                self._release(state)
+                self.record(state.proxy, latency, True)
+            elif time.monotonic() >= state.quarantined_until:
+                # 隔离期满但仍然不可用：延长隔离
+                state.quarantined_until = 0.0
+                state.consecutive_failures = self.failure_threshold
+                self._quarantine(state)
+        else:
+            self.record(state.proxy, latency, ok)
+        # 隔离中的代理在隔离期满时再探测，不提前
+        if state.quarantined:
+            state.next_probe = max(state.quarantined_until, state.next_probe)
+        else:
+            state.next_probe = time.monotonic() + self.probe_interval
+        return ok
+
+    async def probe_all(self, proxies: Optional[Iterable[str]] = None):
+        """并发探测（默认所有已登记的）代理，并输出结果"""
+        proxies = list(self.states) if proxies is None else [normalize_proxy(proxy) for proxy in proxies]
+        started = time.monotonic()
+        results = await asyncio.gather(*(self.probe(proxy) for proxy in proxies), return_exceptions=True)
+        healthy = sum(result is True for result in results)
+        PROXY_STATES.set(len(self.states) - self.quarantined_count(), "healthy")
+        logger.info(
+            f"Probed {len(proxies)} proxies in {time.monotonic() - started:.1f}s: "
+            f"{healthy} healthy, {len(proxies) - healthy} failing"
+        )
+
+    async def run(self, tick: float = 5.0):
+        """后台探测：健康的代理每 probe_interval 秒探测一次，隔离期满的代理立即探测"""
+        while True:
+            await asyncio.sleep(min(tick, self.probe_interval))
+            now = time.monotonic()
+            due = [state.proxy for state in self.states.values() if state.next_probe <= now and not state.probing]
+            if due:
+                await asyncio.gather(*(self.probe(proxy) for proxy in due), return_exceptions=True)
+                PROXY_STATES.set(len(self.states) - self.quarantined_count(), "healthy")
+
+    # ---------- 选择与并发控制 ----------
+
+    def available(self, proxy: str) -> bool:
+        return not self.state(proxy).quarantined
+
+    def select(self, account: Account) -> Optional[str]:
+        """
+        返回账户本次应使用的代理（已规范化）。
+        账户代理可用时使用账户代理；被隔离时使用备用代理（若有），否则返回None。
+        """
+        primary = self.state(account.proxy)
+        if not primary.quarantined:
+            if self._failover.pop(account.index, None) is not None:
+                logger.info(f"[{account.index}] Proxy {mask_proxy(primary.proxy)} recovered, switching back")
+            return primary.proxy
+
+        current = self._failover.get(account.index)
+        if current is not None and not self.states[current].quarantined:
+            return current
+        candidates = [self.states[spare] for spare in self.spares if not self.states[spare].quarantined]
+        if not candidates:
+            self._failover.pop(account.index, None)
+            return None
+        spare = min(candidates, key=ProxyState.score).proxy
+        self._failover[account.index] = spare
+        PROXY_FAILOVERS.inc()
+        logger.warning(f"[{account.index}] Proxy {mask_proxy(primary.proxy)} is quarantined, "
+                       f"failing over to {mask_proxy(spare)}")
+        return spare
+
+    def require(self, account: Account) -> str:
+        """同 select()，没有可用代理时抛出 ProxyUnavailableError"""
+        proxy = self.select(account)
+        if proxy is None:
+            state = self.state(account.proxy)
+            remaining = max(state.quarantined_until - time.monotonic(), 1.0)
+            raise ProxyUnavailableError(
+                f"代理 {mask_proxy(state.proxy)} 隔离中，{remaining:.0f} 秒后重新探测", retry_after=remaining
+            )
+        return proxy
+
+    @asynccontextmanager
+    async def slot(self, proxy: str):
+        """占用代理的一个并发名额"""
+        state = self.state(proxy)
+        if state.semaphore is None:
+            state.in_flight += 1
+            try:
+                yield
+            finally:
+                state.in_flight -= 1
+            return
+        async with state.semaphore:
+            state.in_flight += 1
+            try:
+                yield
+            finally:
+                state.in_flight -= 1
+
+    # ---------- 统计 ----------
+
+    def quarantined_count(self) -> int:
+        return sum(state.quarantined for state in self.states.values())
+
+    def stats(self) -> dict:
+        return {
+            "proxies": len(self.states),
+            "quarantined": self.quarantined_count(),
+            "failovers": len(self._failover),
+        }
+
+    def report(self, limit: int = 10) -> List[dict]:
+        """评分最差的代理（隔离中的排在最前）"""
+        states = sorted(self.states.values(), key=lambda state: (not state.quarantined, -state.score()))
+        return [
+            {
+                "proxy": mask_proxy(state.proxy),
+                "quarantined": state.quarantined,
+                "latency": None if state.latency is None else round(state.latency, 3),
+                "error_rate": round(state.error_rate, 3),
+                "in_flight": state.in_flight,
+            }
+            for state in states[:limit]
+        ]
+
+
+# Singleton pattern
+def get_proxy_manager() -> ProxyManager:
+    """Get proxy manager singleton"""
+    if not hasattr(get_proxy_manager, "_manager"):
+        get_proxy_manager._manager = ProxyManager.from_config(get_config())
+    return get_proxy_manager._manager
+
+
+def log_proxy_stats():
+    """输出代理统计（程序退出时调用）"""
+    if hasattr(get_proxy_manager, "_manager"):
+        manager = get_proxy_manager._manager
+        logger.info(f"Proxy stats: {manager.stats()}, worst: {manager.report(5)}")
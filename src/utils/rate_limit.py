@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    异步令牌桶限速器。
+
+    以 rate 个/秒的速度补充令牌，最多累积 capacity 个。
+    等待者按到达顺序依次获取令牌，避免同时唤醒造成突发请求。
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """获取令牌，返回等待的秒数。rate <= 0 时不限速"""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                delay = (tokens - self._tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+                self._refill()
+            self._tokens -= tokens
+        return waited
+
+    @property
+    def available(self) -> float:
+        self._refill()
+        return self._tokens
+
+
+class KeyedRateLimiter:
+    """为每个键（例如API密钥）维护独立的令牌桶"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.rate, self.capacity)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, key: str, tokens: float = 1.0) -> float:
+        return await self.bucket(key).acquire(tokens)
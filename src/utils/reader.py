@@ -5,7 +5,7 @@ import yaml
 import threading
 import csv
 from loguru import logger
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from src.utils.constants import Account
 
 # 创建全局锁用于同步文件访问
@@ -46,49 +46,95 @@ def read_txt_file(file_name: str, file_path: str) -> list:
             return []
 
 
-def read_csv_accounts(file_path: str) -> List[Account]:
+class AccountSelector:
     """
-    从CSV文件读取账号数据。
-    读取直到遇到第一个空的DISCORD_TOKEN字段。
+    按账户序号筛选账户：ACCOUNTS_RANGE 不为 [0, 0] 时按范围选择，
+    否则 EXACT_ACCOUNTS_TO_USE 不为空时按集合选择，都为空时选择全部。
 
-    CSV文件必须具有以下格式：
-    DISCORD_TOKEN,PROXY,USERNAME,STATUS,PASSWORD,NEW_PASSWORD,NEW_NAME,NEW_USERNAME,MESSAGES_TXT_NAME
+    判断是否选中为 O(1)；last_index 为可能被选中的最大序号，读取到此为止即可停止。
+    """
+
+    def __init__(self, accounts_range: Tuple[int, int] = (0, 0), exact: Iterable[int] = ()):
+        start, end = accounts_range
+        self.range: Optional[Tuple[int, int]] = None if start == 0 and end == 0 else (start, end)
+        self.exact = frozenset(exact) if self.range is None else frozenset()
+
+        if self.range:
+            self.last_index: Optional[int] = self.range[1]
+        elif self.exact:
+            self.last_index = max(self.exact)
+        else:
+            self.last_index = None
+
+    @classmethod
+    def from_config(cls, config) -> "AccountSelector":
+        return cls(config.SETTINGS.ACCOUNTS_RANGE, config.SETTINGS.EXACT_ACCOUNTS_TO_USE)
+
+    def __contains__(self, index: int) -> bool:
+        if self.range:
+            return self.range[0] <= index <= self.range[1]
+        if self.exact:
+            return index in self.exact
+        return True
+
+    def __repr__(self) -> str:
+        if self.range:
+            return f"range {self.range[0]}-{self.range[1]}"
+        if self.exact:
+            return f"accounts {sorted(self.exact)}"
+        return "all accounts"
+
+
+def iter_csv_accounts(file_path: str, selector: Optional[AccountSelector] = None) -> Iterator[Account]:
+    """
+    逐行读取CSV中的账号，只返回被 selector 选中的账号，不会把整个文件读入内存。
+    遇到第一个空的GIGA_TOKEN字段或超过 selector.last_index 时停止。
+
+    CSV文件必须包含 GIGA_TOKEN 和 PROXY 两列，账号序号为数据行的行号（从1开始）。
+
+    Args:
+        file_path (str): CSV文件路径
+        selector (AccountSelector): 账号筛选条件，为None时返回全部账号
+    """
+    last_index = selector.last_index if selector else None
+    with open(file_path, 'r', encoding='utf-8', newline='') as file:
+        reader = csv.DictReader(file)
+
+        for row_index, row in enumerate(reader, 1):
+            if last_index is not None and row_index > last_index:
+                break
+
+            # 如果token为空，停止读取
+            token = (row.get('GIGA_TOKEN') or '').strip()
+            if not token:
+                break
+
+            if selector is not None and row_index not in selector:
+                continue
+
+            yield Account(
+                index=row_index,
+                token=token,
+                proxy=(row.get('PROXY') or '').strip(),
+            )
+
+
+def read_csv_accounts(file_path: str, selector: Optional[AccountSelector] = None) -> List[Account]:
+    """
+    从CSV文件读取账号数据（见 iter_csv_accounts）。
 
     Args:
         file_path (str): CSV文件路径
+        selector (AccountSelector): 账号筛选条件，为None时读取全部账号
 
     Returns:
         List[Account]: 账号对象列表
     """
-    accounts = []
-    
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            # 跳过标题行
-            print(file)
-            reader = csv.DictReader(file)
-            
-            for row_index, row in enumerate(reader, 1):
-                # 获取token值（第一列）
-                token = row.get('GIGA_TOKEN', '').strip()
-                
-                # 如果token为空，停止读取
-                if not token:
-                    break
-                
-                # 获取其他值，将None替换为空字符串
-                proxy = row.get('PROXY', '').strip()
-
-                account = Account(
-                    index=row_index,
-                    token=token.strip(),
-                    proxy=proxy.strip(),
-                )
-                accounts.append(account)
-        
-        logger.success(f"Successfully loaded {len(accounts)} accounts from data/accounts.csv")
+        accounts = list(iter_csv_accounts(file_path, selector))
+        logger.success(f"Successfully loaded {len(accounts)} accounts from {file_path}")
         return accounts
-        
+
     except FileNotFoundError:
         logger.error(f"File {file_path} does not exist.")
         return []
@@ -0,0 +1,212 @@
+"""
+地牢动作录制：把每次 /api/game/dungeon/action 的请求与响应（账户、局、地牢、步数、耗时）
+追加写入分段的 zstd 压缩 JSONL 文件，供离线调优策略使用，不需要再消耗线上请求。
+
+- 写入：调用方只把原始数据放入队列，由后台线程按批次编码、压缩并写盘。
+  每个批次是一个独立的 zstd 帧，进程异常退出时最多丢失最后一个未写完的批次。
+- 读取：iter_records() 以内存映射方式打开分段文件，跨帧流式解压并逐条返回记录。
+"""
+import io
+import json
+import mmap
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+
+import zstandard
+from loguru import logger
+
+from src.utils.config import Config, get_config
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+SEGMENT_SUFFIX = ".jsonl.zst"
+RECORD_VERSION = 1
+
+if msgspec is not None:
+    _encode = msgspec.json.Encoder().encode
+    _decode = msgspec.json.decode
+else:
+    def _encode(record: dict) -> bytes:
+        return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    _decode = json.loads
+
+
+def _encode_line(record: dict, content: bytes) -> bytes:
+    """在写出线程中解析响应体并编码为一行 JSON；非 JSON 响应按文本保存"""
+    if content:
+        try:
+            record["response"] = _decode(content)
+        except ValueError:
+            record["response_text"] = content.decode("utf-8", errors="replace")
+    return _encode(record) + b"\n"
+
+
+class RunRecorder:
+    """
+    追加写入的动作录制器。
+
+    record() 只做一次入队；编码、压缩、写盘都在后台线程完成。
+    后台线程每攒够 batch_size 条或等待满 flush_interval 秒写出一个 zstd 帧，
+    当前分段达到 segment_records 条后切换到新的分段文件。
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_records: int = 100000,
+        level: int = 3,
+        batch_size: int = 500,
+        flush_interval: float = 2.0,
+    ):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.thread: Optional[threading.Thread] = None
+
+        self._file = None
+        self._segment = 0
+        self._segment_count = 0
+        self.records = 0
+        self.bytes_written = 0
+
+    @classmethod
+    def from_config(cls, config: Config) -> "RunRecorder":
+        return cls(
+            directory=config.RECORDER.DIRECTORY,
+            segment_records=config.RECORDER.SEGMENT_MAX_RECORDS,
+            level=config.RECORDER.COMPRESSION_LEVEL,
+            batch_size=config.RECORDER.BATCH_SIZE,
+            flush_interval=config.RECORDER.FLUSH_INTERVAL,
+        )
+
+    def record(self, record: dict, content: bytes = b""):
+        """录制一条记录；content 为原始响应体，在写出线程中解析"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="run-recorder", daemon=True)
+            self.thread.start()
+        self.queue.put((record, content))
+
+    def _open_segment(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._segment += 1
+        name = f"run-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._segment:04d}{SEGMENT_SUFFIX}"
+        self._file = open(os.path.join(self.directory, name), "ab")
+        self._segment_count = 0
+
+    def _write_batch(self, batch: list):
+        lines = []
+        for record, content in batch:
+            try:
+                lines.append(_encode_line(record, content))
+            except Exception as e:
+                logger.warning(f"Failed to encode recorded action: {e}")
+        while lines:
+            if self._file is None or self._segment_count >= self.segment_records:
+                self._close_segment()
+                self._open_segment()
+            take = lines[:self.segment_records - self._segment_count]
+            lines = lines[len(take):]
+            frame = self.compressor.compress(b"".join(take))
+            self._file.write(frame)
+            self._file.flush()
+            self._segment_count += len(take)
+            self.records += len(take)
+            self.bytes_written += len(frame)
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.error(f"Failed to write recorded actions to {self.directory}: {e}")
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+        self._close_segment()
+
+    def close(self):
+        """写出剩余记录并关闭当前分段"""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout=30)
+            self.thread = None
+
+    def stats(self) -> dict:
+        return {"records": self.records, "compressed_bytes": self.bytes_written, "segments": self._segment}
+
+
+def list_segments(path: str) -> list[Path]:
+    """path 为目录时返回其中按名称排序的分段文件，为文件时返回其本身"""
+    path = Path(path)
+    if path.is_file():
+        return [path]
+    return sorted(path.glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def iter_segment(segment: Path) -> Iterator[dict]:
+    """以内存映射方式读取单个分段，逐条返回记录；末尾未写完的帧或损坏的行会被跳过"""
+    if segment.stat().st_size == 0:
+        return
+    with open(segment, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        reader = zstandard.ZstdDecompressor().stream_reader(mapped, read_across_frames=True)
+        lines = io.BufferedReader(reader, buffer_size=1 << 20)
+        try:
+            for line in lines:
+                try:
+                    yield _decode(line)
+                except ValueError:
+                    logger.warning(f"Skipping malformed record in {segment.name}")
+        except zstandard.ZstdError as e:
+            logger.warning(f"Segment {segment.name} ends with an incomplete frame: {e}")
+        finally:
+            lines.close()
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    """按文件名顺序惰性读取目录（或单个文件）中的所有录制记录"""
+    for segment in list_segments(path):
+        yield from iter_segment(segment)
+
+
+# Singleton pattern
+def get_recorder() -> RunRecorder:
+    """Get run recorder singleton"""
+    if not hasattr(get_recorder, "_recorder"):
+        get_recorder._recorder = RunRecorder.from_config(get_config())
+    return get_recorder._recorder
+
+
+def close_recorder():
+    """写出剩余记录并输出统计（程序退出时调用）"""
+    if hasattr(get_recorder, "_recorder"):
+        recorder = get_recorder._recorder
+        recorder.close()
+        logger.info(f"Run recorder stats: {recorder.stats()}")
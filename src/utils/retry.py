@@ -0,0 +1,255 @@
+"""
+统一的重试与熔断。
+
+- RetryPolicy：指数退避 + 完全抖动（每次等待 uniform(0, min(上限, 基数 * 2^n))），
+  避免大量账户在同一时刻同时重试
+- 错误分类：可重试（服务器错误、限流、网络异常）与不可重试（token 过期、请求无效、响应结构不符），
+  不可重试的错误立即抛出
+- CircuitBreaker：按上游接口共享（所有账户共用），连续失败达到阈值后熔断；
+  熔断期间游戏请求暂停等待、LLM 请求直接失败，冷却结束后放行一个探测请求，成功则恢复
+"""
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from loguru import logger
+
+from src.utils.config import Config, get_config
+from src.utils.metrics import BREAKER_TRANSITIONS, RETRIES
+
+T = TypeVar("T")
+
+# 可重试的状态码：超时、限流、服务器错误
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+# 重试也不会成功的状态码：请求无效、token 过期或无权限、余额不足
+FATAL_STATUSES = {400, 401, 402, 403, 404, 422}
+
+
+class RetryableError(RuntimeError):
+    """可重试的错误，status 为 HTTP 状态码（网络异常时为 None）"""
+
+    retryable = True
+
+    def __init__(self, message: str, status: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class FatalError(RuntimeError):
+    """不可重试的错误（如 token 过期），status 为 HTTP 状态码"""
+
+    retryable = False
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断期间被拒绝的请求"""
+
+    retryable = False
+
+
+def error_for_status(status: int, message: str, retry_after: Optional[float] = None) -> Exception:
+    """按状态码生成对应类型的异常；未列出的 4xx 视为不可重试，其余视为可重试"""
+    if status in FATAL_STATUSES or (400 <= status < 500 and status not in RETRYABLE_STATUSES):
+        return FatalError(message, status)
+    return RetryableError(message, status, retry_after)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """异常可通过 retryable 类属性声明是否可重试，未声明的异常视为可重试"""
+    return getattr(error, "retryable", True)
+
+
+class CircuitBreaker:
+    """
+    单个上游接口的熔断器。
+
+    - closed：正常放行；连续 failure_threshold 次可重试错误后进入 open
+    - open：拒绝或暂停所有请求，cooldown 秒后进入 half_open
+    - half_open：只放行一个探测请求；成功则回到 closed，失败则以加倍的冷却时间回到 open
+      （探测请求在冷却时间内没有结果时允许新的探测，避免被取消的探测卡住熔断器）
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 10, cooldown: float = 30, max_cooldown: float = 300):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(max_cooldown, cooldown)
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self._changed = asyncio.Event()
+
+        self.opened = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_config(cls, name: str, config: Config) -> "CircuitBreaker":
+        return cls(
+            name,
+            failure_threshold=config.RETRY.BREAKER_FAILURE_THRESHOLD,
+            cooldown=config.RETRY.BREAKER_COOLDOWN,
+            max_cooldown=config.RETRY.BREAKER_MAX_COOLDOWN,
+        )
+
+    def _transition(self, state: str):
+        self.state = state
+        BREAKER_TRANSITIONS.inc(self.name, state)
+        # 唤醒所有等待中的请求，让它们重新检查状态
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def remaining(self) -> float:
+        return max(0.0, self.open_until - time.monotonic())
+
+    async def acquire(self, wait: bool = True):
+        """
+        请求前调用。熔断期间 wait=True 时等待到恢复（或轮到自己探测），
+        wait=False 时抛出 CircuitOpenError。
+        """
+        while self.state != self.CLOSED:
+            if time.monotonic() >= self.open_until:
+                # 冷却结束：当前请求作为探测请求放行
+                self.open_until = time.monotonic() + self.cooldown
+                if self.state != self.HALF_OPEN:
+                    self._transition(self.HALF_OPEN)
+                logger.info(f"Circuit {self.name} half-open, sending a probe request")
+                return
+            if not wait:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} 熔断中，{self.remaining():.0f} 秒后恢复")
+            # 等待状态变化或冷却结束，附加抖动避免同时醒来
+            timeout = self.remaining() + random.uniform(0, min(1.0, self.cooldown))
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != self.CLOSED:
+            self.cooldown = self.base_cooldown
+            self._transition(self.CLOSED)
+            logger.info(f"Circuit {self.name} closed, upstream recovered")
+
+    def record_failure(self):
+        if self.state == self.HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == self.CLOSED:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.open_until = time.monotonic() + self.cooldown
+        self.opened += 1
+        self._transition(self.OPEN)
+        logger.warning(
+            f"Circuit {self.name} open after {self.failures} consecutive failures, "
+            f"pausing requests for {self.cooldown:.0f}s"
+        )
+
+    def stats(self) -> dict:
+        return {"state": self.state, "opened": self.opened, "rejected": self.rejected, "failures": self.failures}
+
+
+class RetryPolicy:
+    """
+    指数退避 + 完全抖动的重试策略。
+
+    Args:
+        attempts: 最多尝试次数（含第一次）
+        base_delay: 第一次重试等待时间的上限（秒），之后每次翻倍
+        max_delay: 单次等待时间的上限（秒）
+        min_delay: 单次等待时间的下限（秒），抖动范围为 [min_delay, 上限]
+    """
+
+    def __init__(self, attempts: int = 5, base_delay: float = 1.0, max_delay: float = 60.0, min_delay: float = 0.0):
+        self.attempts = max(1, attempts)
+        self.base_delay = base_delay
+        self.max_delay = max(max_delay, base_delay)
+        self.min_delay = min(min_delay, self.max_delay)
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次（从 0 开始）失败后的等待时间"""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** min(attempt, 32))
+        return random.uniform(self.min_delay, max(self.min_delay, ceiling))
+
+    async def call(
+        self,
+        operation: Callable[[], Awaitable[T]],
+        name: str,
+        breaker: Optional[CircuitBreaker] = None,
+        wait_for_breaker: bool = True,
+    ) -> T:
+        """执行 operation，可重试的错误按退避等待后重试，其余错误和最后一次失败直接抛出"""
+        for attempt in range(self.attempts):
+            if breaker:
+                await breaker.acquire(wait_for_breaker)
+            try:
+                result = await operation()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                retryable = is_retryable(e)
+                if breaker and retryable:
+                    # 异常可通过 counts_for_breaker 类属性声明与上游无关（例如代理故障）
+                    if getattr(e, "counts_for_breaker", True):
+                        breaker.record_failure()
+                elif breaker:
+                    # 不可重试的错误说明上游仍在正常响应
+                    breaker.record_success()
+                if not retryable or attempt == self.attempts - 1:
+                    raise
+                retry_after = getattr(e, "retry_after", None) or 0.0
+                if retry_after > self.max_delay:
+                    # 需要等待的时间超过单次等待上限（例如代理隔离中），不占用调用方，由调度器按 retry_after 重新安排
+                    raise
+                delay = max(self.backoff(attempt), retry_after)
+                RETRIES.inc(name, type(e).__name__)
+                logger.warning(f"{name} failed ({e}), retry {attempt + 1}/{self.attempts - 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            if breaker:
+                breaker.record_success()
+            return result
+        raise RuntimeError("unreachable")
+
+
+def retry_policy(kind: str, config: Optional[Config] = None) -> RetryPolicy:
+    """按 RETRY 配置创建重试策略，kind 为 game 或 llm"""
+    config = config or get_config()
+    attempts = config.RETRY.GAME_ATTEMPTS if kind == "game" else config.RETRY.LLM_ATTEMPTS
+    return RetryPolicy(attempts, config.RETRY.BASE_DELAY, config.RETRY.MAX_DELAY)
+
+
+# Singleton pattern
+def get_breaker(name: str) -> CircuitBreaker:
+    """Get the shared circuit breaker for an upstream endpoint"""
+    if not hasattr(get_breaker, "_breakers"):
+        get_breaker._breakers = {}
+    breaker = get_breaker._breakers.get(name)
+    if breaker is None:
+        breaker = get_breaker._breakers[name] = CircuitBreaker.from_config(name, get_config())
+    return breaker
+
+
+def breaker_stats() -> dict:
+    return {name: breaker.stats() for name, breaker in getattr(get_breaker, "_breakers", {}).items()}
+
+
+def log_breaker_stats():
+    """输出各熔断器的统计（程序退出时调用）"""
+    stats = breaker_stats()
+    if stats:
+        logger.info(f"Circuit breaker stats: {stats}")
@@ -0,0 +1,296 @@
+import asyncio
+import heapq
+import itertools
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+from loguru import logger
+
+from src.utils.config import Config
+from src.utils.constants import Account
+from src.utils.metrics import SCHEDULER_WAIT
+from src.utils.retry import RetryPolicy, is_retryable
+from src.utils.tokens import token_expiry
+
+
+@dataclass
+class ScheduledAccount:
+    """调度器中的账户状态"""
+
+    account: Account
+    runs: int = 0
+    failures: int = 0
+    # token 过期时间（unix 时间戳），未知时为 None
+    expires_at: Optional[float] = None
+    # expires_at 对应的 token；热加载更换 token 后重新解析
+    token: str = ""
+    last_finished_at: float = 0.0
+    # 进入就绪队列的时间（monotonic），用于统计等待空闲工作协程的时长
+    ready_at: float = 0.0
+    # 因不可重试的错误被移出调度时的 (token, proxy)；热加载更换其中之一后重新调度
+    retired_with: Optional[tuple] = None
+
+
+class TimerWheel:
+    """
+    单层时间轮，用于存放休眠中的账户。
+
+    近期（slots * tick 秒内）到期的条目放入对应槽位，添加和取出都是 O(1)；
+    更远的条目暂存在按到期时间排序的溢出堆中，时间轮转到附近时再移入槽位。
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 512):
+        self.tick = tick
+        self.slots: list[list] = [[] for _ in range(slots)]
+        self.current_tick = math.floor(time.monotonic() / tick)
+        self._overflow: list = []
+        self._counter = itertools.count()
+        self._size = 0
+
+    def add(self, due: float, item):
+        self._size += 1
+        self._place(due, item)
+
+    def _place(self, due: float, item):
+        target = max(math.ceil(due / self.tick), self.current_tick + 1)
+        if target - self.current_tick < len(self.slots):
+            self.slots[target % len(self.slots)].append(item)
+        else:
+            heapq.heappush(self._overflow, (due, next(self._counter), item))
+
+    def advance(self, now: float) -> list:
+        """推进到 now，返回所有已到期的条目"""
+        target = math.floor(now / self.tick)
+        due = []
+        steps = min(target - self.current_tick, len(self.slots))
+        for _ in range(steps):
+            self.current_tick += 1
+            slot = self.slots[self.current_tick % len(self.slots)]
+            if slot:
+                due.extend(slot)
+                slot.clear()
+        self.current_tick = max(self.current_tick, target)
+
+        # 溢出堆中进入时间轮范围的条目
+        horizon = (self.current_tick + len(self.slots) - 1) * self.tick
+        while self._overflow and self._overflow[0][0] <= horizon:
+            item_due, _, item = heapq.heappop(self._overflow)
+            if item_due <= now:
+                due.append(item)
+            else:
+                self._place(item_due, item)
+
+        self._size -= len(due)
+        return due
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class AccountScheduler:
+    """
+    账户调度器，取代“每个账户一个任务 + Semaphore”的模式。
+
+    固定数量的 worker 从就绪堆中取出优先级最高的账户执行；
+    执行完成的账户进入时间轮休眠，到期后重新进入就绪堆。
+    每个就绪账户只唤醒一个 worker，不会出现惊群。
+
+    优先级（数值越小越优先）：
+    - token 即将过期的账户优先
+    - 最近连续失败的账户靠后
+    - 已运行次数多的账户靠后（公平性）
+
+    token 已过期（或在 expiry_margin 秒内过期）的账户不会执行，不发送任何请求，
+    每隔 expired_recheck 秒检查一次 token 是否已被热加载更新；
+    因不可重试的错误（如 token 被撤销）移出调度的账户同样每隔 expired_recheck 秒检查一次，
+    token 或代理被热加载更换后重新调度；
+    其余账户的休眠时间不会超过其 token 的剩余有效时间，保证在过期前完成执行。
+    """
+
+    def __init__(
+        self,
+        accounts: List[Account],
+        workers: int,
+        tick: float = 1.0,
+        wheel_slots: int = 512,
+        sleep_after_run: tuple[float, float] = (0, 60),
+        sleep_after_error: float = 300,
+        max_sleep_after_error: float = 3600,
+        failure_weight: float = 1.0,
+        fairness_weight: float = 0.1,
+        expiry_weight: float = 1.0,
+        expiry_margin: float = 600,
+        expired_recheck: float = 600,
+    ):
+        self.entries = [ScheduledAccount(account) for account in accounts]
+        self.workers = max(1, workers)
+        self.sleep_after_run = sleep_after_run
+        # 连续出错的账户至少休眠 sleep_after_error 秒，之后按指数退避 + 抖动休眠，避免所有账户在同一时刻重新请求
+        self.error_backoff = RetryPolicy(
+            base_delay=sleep_after_error, max_delay=max_sleep_after_error, min_delay=sleep_after_error
+        )
+        self.failure_weight = failure_weight
+        self.fairness_weight = fairness_weight
+        self.expiry_weight = expiry_weight
+        self.expiry_margin = expiry_margin
+        self.expired_recheck = expired_recheck
+
+        self.wheel = TimerWheel(tick, wheel_slots)
+        self._ready: list = []
+        self._counter = itertools.count()
+        self._available: Optional[asyncio.Semaphore] = None
+
+        self.completed = 0
+        self.failed = 0
+        self.retired = 0
+        self.revived = 0
+        self.expired_skips = 0
+
+    @classmethod
+    def from_config(cls, accounts: List[Account], config: Config) -> "AccountScheduler":
+        return cls(
+            accounts,
+            workers=config.SETTINGS.THREADS,
+            tick=config.SCHEDULER.TICK,
+            wheel_slots=config.SCHEDULER.WHEEL_SLOTS,
+            sleep_after_run=tuple(config.SCHEDULER.SLEEP_AFTER_RUN),
+            sleep_after_error=config.SCHEDULER.SLEEP_AFTER_ERROR,
+            max_sleep_after_error=config.RETRY.ACCOUNT_MAX_DELAY,
+            failure_weight=config.SCHEDULER.FAILURE_WEIGHT,
+            fairness_weight=config.SCHEDULER.FAIRNESS_WEIGHT,
+            expiry_weight=config.SCHEDULER.EXPIRY_WEIGHT,
+            expiry_margin=config.SCHEDULER.EXPIRY_MARGIN,
+            expired_recheck=config.SCHEDULER.EXPIRED_RECHECK,
+        )
+
+    def _time_left(self, entry: ScheduledAccount) -> Optional[float]:
+        """token 在扣除 expiry_margin 后的剩余有效时间（秒），过期时间未知时为 None"""
+        account = entry.account
+        if entry.token != account.token:
+            entry.token = account.token
+            entry.expires_at = token_expiry(account.token)
+        if entry.expires_at is None:
+            return None
+        return entry.expires_at - self.expiry_margin - time.time()
+
+    def _enqueue(self, entry: ScheduledAccount):
+        """账户就绪；token 已过期或已被移出调度的账户直接进入时间轮，等待 token 更新"""
+        if entry.retired_with is not None:
+            account = entry.account
+            if (account.token, account.proxy) == entry.retired_with:
+                self.wheel.add(time.monotonic() + self.expired_recheck, entry)
+                return
+            entry.retired_with = None
+            entry.failures = 0
+            self.revived += 1
+            logger.info(f"[{account.index}] Token or proxy updated, account is back in rotation")
+        time_left = self._time_left(entry)
+        if time_left is not None and time_left <= 0:
+            self.expired_skips += 1
+            self.wheel.add(time.monotonic() + self.expired_recheck, entry)
+        else:
+            self._push_ready(entry)
+
+    def priority(self, entry: ScheduledAccount) -> float:
+        score = entry.failures * self.failure_weight + entry.runs * self.fairness_weight
+        if entry.expires_at is not None:
+            hours_left = max((entry.expires_at - time.time()) / 3600, 0.01)
+            score -= self.expiry_weight / hours_left
+        return score
+
+    def _push_ready(self, entry: ScheduledAccount):
+        entry.ready_at = time.monotonic()
+        heapq.heappush(self._ready, (self.priority(entry), next(self._counter), entry))
+        self._available.release()
+
+    def add(self, account: Account):
+        """运行中加入新账户（如账户文件热加载新增的账号），立即进入就绪堆"""
+        entry = ScheduledAccount(account)
+        self.entries.append(entry)
+        if self._available is not None:
+            self._enqueue(entry)
+
+    def schedule(self, entry: ScheduledAccount, delay: float):
+        """delay 秒后让账户重新就绪"""
+        if delay <= 0:
+            self._push_ready(entry)
+        else:
+            self.wheel.add(time.monotonic() + delay, entry)
+
+    async def _ticker(self):
+        while True:
+            await asyncio.sleep(self.wheel.tick)
+            for entry in self.wheel.advance(time.monotonic()):
+                self._enqueue(entry)
+
+    async def _worker(self, flow: Callable[[Account], Awaitable]):
+        while True:
+            await self._available.acquire()
+            _, _, entry = heapq.heappop(self._ready)
+            SCHEDULER_WAIT.observe(time.monotonic() - entry.ready_at)
+            account = entry.account
+            time_left = self._time_left(entry)
+            if time_left is not None and time_left <= 0:
+                # token 已过期：不发送请求，等待热加载更新 token 后再执行
+                self.expired_skips += 1
+                logger.warning(f"[{account.index}] Token expired, skipping until it is updated")
+                self.schedule(entry, self.expired_recheck)
+                continue
+            try:
+                await flow(account)
+                entry.failures = 0
+                self.completed += 1
+                delay = random.uniform(*self.sleep_after_run)
+                time_left = self._time_left(entry)
+                if time_left is not None:
+                    # 在 token 过期前再执行一次
+                    delay = max(0.0, min(delay, time_left))
+                logger.info(f"[{account.index}] Completed execution, sleeping for {delay / 60:.2f} minutes")
+            except Exception as err:
+                entry.failures += 1
+                self.failed += 1
+                if not is_retryable(err):
+                    # token 过期等错误重试也不会成功，在 token 或代理被热加载更换之前不再执行该账户
+                    self.retired += 1
+                    entry.retired_with = (account.token, account.proxy)
+                    logger.error(f"[{account.index}] Fatal error, account removed from rotation "
+                                 f"until its token or proxy is updated: {err}")
+                    entry.last_finished_at = time.time()
+                    self.schedule(entry, self.expired_recheck)
+                    continue
+                # 错误带有等待时间（如代理隔离剩余时间）时按其等待，否则按指数退避
+                delay = getattr(err, "retry_after", None) or self.error_backoff.backoff(entry.failures - 1)
+                logger.error(f"[{account.index}] Loop error: {err}, retrying in {delay / 60:.2f} minutes")
+            entry.runs += 1
+            entry.last_finished_at = time.time()
+            self.schedule(entry, delay)
+
+    async def run(self, flow: Callable[[Account], Awaitable]):
+        """启动调度，flow(account) 为单个账户的一次完整执行"""
+        self._available = asyncio.Semaphore(0)
+        for entry in self.entries:
+            self._enqueue(entry)
+
+        tasks = [asyncio.create_task(self._ticker())]
+        tasks += [asyncio.create_task(self._worker(flow)) for _ in range(self.workers)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "accounts": len(self.entries),
+            "ready": len(self._ready),
+            "sleeping": len(self.wheel),
+            "completed": self.completed,
+            "failed": self.failed,
+            "retired": self.retired,
+            "revived": self.revived,
+            "expired_skips": self.expired_skips,
+        }
@@ -0,0 +1,218 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import time
+from collections import defaultdict
+from typing import List
+
+from loguru import logger
+
+from src.utils.config import Config
+from src.utils.constants import Account, DataForTasks
+
+
+def shard_accounts(accounts: List[Account], shards: int, by: str = "index") -> List[List[Account]]:
+    """
+    将账户拆分为 shards 份。
+
+    by="index": 按顺序轮流分配，各分片账户数相同
+    by="proxy": 同一代理的账户分到同一分片（复用同一连接池），按账户数贪心均衡
+    """
+    shards = max(1, min(shards, len(accounts)))
+    if by == "proxy":
+        groups = defaultdict(list)
+        for account in accounts:
+            groups[account.proxy].append(account)
+
+        result: List[List[Account]] = [[] for _ in range(shards)]
+        for group in sorted(groups.values(), key=len, reverse=True):
+            min(result, key=len).extend(group)
+        return [shard for shard in result if shard]
+
+    return [accounts[i::shards] for i in range(shards)]
+
+
+# 比率和平均值不能直接求和：比率由合计后的计数重新计算，平均值按样本数加权
+RATE_FIELDS = {"hit_rate": ("hits", "misses")}
+AVERAGE_FIELDS = {"avg_delay": "accounts", "avg_latency": "actions", "avg_batch_size": "batches"}
+
+
+def _merge_stats(snapshots: dict) -> dict:
+    """汇总各分片最近一次上报的统计：计数求和，比率和平均值重新计算"""
+    merged: dict = defaultdict(lambda: defaultdict(int))
+    weighted: dict = defaultdict(lambda: defaultdict(float))
+    for snapshot in snapshots.values():
+        for section, values in snapshot.items():
+            for key, value in values.items():
+                if not isinstance(value, (int, float)) or key in RATE_FIELDS:
+                    continue
+                if key in AVERAGE_FIELDS:
+                    weighted[section][key] += value * values.get(AVERAGE_FIELDS[key], 0)
+                else:
+                    merged[section][key] += value
+
+    for section, values in merged.items():
+        for key, weight in AVERAGE_FIELDS.items():
+            if key in weighted[section]:
+                total = values.get(weight, 0)
+                values[key] = weighted[section][key] / total if total else 0.0
+        for key, (hits, misses) in RATE_FIELDS.items():
+            if hits in values:
+                lookups = values[hits] + values.get(misses, 0)
+                values[key] = values[hits] / lookups if lookups else 0.0
+    return {
+        section: {key: round(value, 4 if key in RATE_FIELDS else 3) for key, value in values.items()}
+        for section, values in merged.items()
+    }
+
+
+def _shard_path(path: str, shard_id: int) -> str:
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{shard_id}{ext}"
+
+
+def _shard_entry(shard_id: int, accounts: List[Account], task: str, data: DataForTasks, stats_queue):
+    """子进程入口：独立的事件循环、连接池与调度器"""
+    import main
+
+    main.configuration()
+    asyncio.run(_shard_main(shard_id, accounts, task, data, stats_queue))
+
+
+async def _shard_main(shard_id: int, accounts: List[Account], task: str, data: DataForTasks, stats_queue):
+    import process
+    from src.utils.config import get_config
+    from src.utils.decision_cache import get_decision_cache
+    from src.utils.pacing import get_pacers
+    from src.utils.scheduler import AccountScheduler
+
+    config = get_config()
+    config.TASK = task
+    config.DATA_FOR_TASKS = data
+    # 每个分片进程使用独立的指标端口和快照文件；决策缓存快照只包含本分片的条目，
+    # 共用同一个文件时后写入的分片会覆盖其他分片的缓存
+    if config.METRICS.PORT:
+        config.METRICS.PORT += shard_id + 1
+    if config.METRICS.SNAPSHOT_FILE:
+        config.METRICS.SNAPSHOT_FILE = _shard_path(config.METRICS.SNAPSHOT_FILE, shard_id)
+    if config.DECISION_CACHE.SNAPSHOT_FILE:
+        config.DECISION_CACHE.SNAPSHOT_FILE = _shard_path(config.DECISION_CACHE.SNAPSHOT_FILE, shard_id)
+    scheduler = AccountScheduler.from_config(accounts, config)
+    logger.info(f"Shard {shard_id} started with {len(accounts)} accounts")
+
+    async def report():
+        while True:
+            await asyncio.sleep(config.SHARDING.STATS_INTERVAL)
+            snapshot = {"scheduler": scheduler.stats(), "pacing": get_pacers().stats()}
+            if config.DECISION_CACHE.ENABLED:
+                snapshot["decision_cache"] = get_decision_cache().stats()
+            stats_queue.put((shard_id, snapshot))
+
+    reporter = asyncio.create_task(report())
+    try:
+        await process.run_account_loops(accounts, config, scheduler)
+    finally:
+        reporter.cancel()
+        await process.shutdown()
+
+
+class ShardSupervisor:
+    """
+    父进程中的分片监督者：启动各分片子进程，异常退出时自动重启，并汇总各分片上报的统计。
+    """
+
+    def __init__(self, shards: List[List[Account]], config: Config):
+        self.shards = shards
+        self.config = config
+        self.context = multiprocessing.get_context("spawn")
+        self.stats_queue = self.context.Queue()
+        self.processes: dict[int, multiprocessing.Process] = {}
+        self.restarts: dict[int, int] = defaultdict(int)
+        self.snapshots: dict[int, dict] = {}
+
+    def _spawn(self, shard_id: int):
+        proc = self.context.Process(
+            target=_shard_entry,
+            args=(shard_id, self.shards[shard_id], self.config.TASK, self.config.DATA_FOR_TASKS, self.stats_queue),
+            name=f"giga-shard-{shard_id}",
+            daemon=True,
+        )
+        proc.start()
+        self.processes[shard_id] = proc
+        logger.info(f"Started shard {shard_id} (pid {proc.pid}) with {len(self.shards[shard_id])} accounts")
+
+    def _drain_stats(self):
+        while True:
+            try:
+                shard_id, snapshot = self.stats_queue.get_nowait()
+            except queue.Empty:
+                return
+            self.snapshots[shard_id] = snapshot
+
+    def merged_stats(self) -> dict:
+        return _merge_stats(self.snapshots)
+
+    async def run(self):
+        for shard_id in range(len(self.shards)):
+            self._spawn(shard_id)
+
+        pending_restarts: dict[int, float] = {}
+        finished: set[int] = set()
+        last_report = time.monotonic()
+        try:
+            while True:
+                await asyncio.sleep(1)
+                self._drain_stats()
+
+                for shard_id, proc in self.processes.items():
+                    if proc.is_alive() or shard_id in pending_restarts or shard_id in finished:
+                        continue
+                    if proc.exitcode == 0:
+                        # 正常退出（账户全部处理完毕）的分片不重启
+                        finished.add(shard_id)
+                        logger.info(f"Shard {shard_id} finished")
+                        continue
+                    if self.restarts[shard_id] >= self.config.SHARDING.MAX_RESTARTS:
+                        continue
+                    logger.error(f"Shard {shard_id} exited with code {proc.exitcode}, restarting "
+                                 f"in {self.config.SHARDING.RESTART_DELAY}s")
+                    pending_restarts[shard_id] = time.monotonic() + self.config.SHARDING.RESTART_DELAY
+
+                for shard_id, restart_at in list(pending_restarts.items()):
+                    if time.monotonic() >= restart_at:
+                        del pending_restarts[shard_id]
+                        self.restarts[shard_id] += 1
+                        self._spawn(shard_id)
+
+                if not any(proc.is_alive() for proc in self.processes.values()) and not pending_restarts:
+                    if len(finished) == len(self.processes):
+                        logger.info("All shards finished")
+                    else:
+                        logger.error(f"All shards exited, {len(self.processes) - len(finished)} "
+                                     f"after reaching the restart limit")
+                    return
+
+                if time.monotonic() - last_report >= self.config.SHARDING.STATS_INTERVAL:
+                    last_report = time.monotonic()
+                    logger.info(f"Shard stats ({len(self.snapshots)}/{len(self.shards)} reporting): "
+                                f"{self.merged_stats()}")
+        finally:
+            self.stop()
+
+    def stop(self):
+        for proc in self.processes.values():
+            if proc.is_alive():
+                proc.terminate()
+        for proc in self.processes.values():
+            proc.join(timeout=10)
+        self._drain_stats()
+        logger.info(f"Shard restarts: {dict(self.restarts)}, final stats: {self.merged_stats()}")
+
+
+async def run_sharded(accounts: List[Account], config: Config):
+    """按 SHARDING 配置将账户拆分到多个子进程中运行"""
+    shards = shard_accounts(accounts, config.SHARDING.PROCESSES, config.SHARDING.SHARD_BY)
+    logger.info(f"Running {len(accounts)} accounts in {len(shards)} processes "
+                f"(by {config.SHARDING.SHARD_BY}): {[len(shard) for shard in shards]}")
+    await ShardSupervisor(shards, config).run()
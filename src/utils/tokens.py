@@ -0,0 +1,114 @@
+"""
+GIGA token（JWT）本地解析。
+
+token 的有效期为 24 小时，过期时间写在 payload 的 exp 字段中。
+只做 base64 解码、不校验签名，因此无需任何网络请求就能在加载时判断 token 是否已过期。
+
+用法（在项目根目录）：
+    python -m src.utils.tokens [data/accounts.csv] [--limit 20]
+"""
+import argparse
+import base64
+import binascii
+import json
+import time
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from loguru import logger
+
+from src.utils.constants import ACCOUNTS_FILE, Account
+
+
+def decode_jwt_payload(token: str) -> Optional[dict]:
+    """解码 JWT 的 payload（不校验签名），格式不正确时返回None"""
+    token = token.strip()
+    if token.lower().startswith("bearer "):
+        token = token[7:].strip()
+    parts = token.split(".")
+    if len(parts) != 3:
+        return None
+    payload = parts[1]
+    try:
+        data = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (binascii.Error, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def token_expiry(token: str) -> Optional[float]:
+    """token 的过期时间（unix 时间戳），无法解析或没有 exp 时返回None"""
+    payload = decode_jwt_payload(token)
+    if payload is None:
+        return None
+    exp = payload.get("exp")
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+
+def is_expired(token: str, margin: float = 0, now: Optional[float] = None) -> bool:
+    """token 是否已过期（或在 margin 秒内过期）；过期时间未知时视为有效"""
+    expires_at = token_expiry(token)
+    return expires_at is not None and (now or time.time()) >= expires_at - margin
+
+
+def expiry_report(accounts: Iterable[Account], now: Optional[float] = None) -> List[dict]:
+    """按过期时间从早到晚排列的账户列表，过期时间未知的排在最后"""
+    now = now or time.time()
+    rows = []
+    for account in accounts:
+        expires_at = token_expiry(account.token)
+        rows.append({
+            "index": account.index,
+            "token": f"{account.token[:10]}...",
+            "expires_at": expires_at,
+            "hours_left": None if expires_at is None else round((expires_at - now) / 3600, 2),
+        })
+    rows.sort(key=lambda row: (row["expires_at"] is None, row["expires_at"] or 0))
+    return rows
+
+
+def _format_time(expires_at: Optional[float]) -> str:
+    return "unknown" if expires_at is None else datetime.fromtimestamp(expires_at).strftime("%Y-%m-%d %H:%M")
+
+
+def log_expiry_report(accounts: List[Account], limit: int = 10, margin: float = 0):
+    """输出已过期的账户数量和最早过期的 limit 个 token"""
+    rows = expiry_report(accounts)
+    expired = [row for row in rows if row["hours_left"] is not None and row["hours_left"] * 3600 <= margin]
+    unknown = sum(row["expires_at"] is None for row in rows)
+    if expired:
+        logger.warning(
+            f"{len(expired)}/{len(rows)} tokens are expired, these accounts are skipped until their token is "
+            f"updated: {' '.join(str(row['index']) for row in expired)}"
+        )
+    if unknown:
+        logger.warning(f"{unknown} tokens have no readable expiry")
+    for row in rows[:limit]:
+        if row["expires_at"] is not None:
+            logger.info(f"[{row['index']}] Token expires {_format_time(row['expires_at'])} "
+                        f"({row['hours_left']:.1f}h left)")
+
+
+def main():
+    from tabulate import tabulate
+
+    from src.utils.reader import read_csv_accounts
+
+    parser = argparse.ArgumentParser(description="List GIGA tokens by expiry time")
+    parser.add_argument("csv", nargs="?", default=ACCOUNTS_FILE)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = expiry_report(read_csv_accounts(args.csv))
+    print(tabulate(
+        [
+            (row["index"], row["token"], _format_time(row["expires_at"]),
+             "" if row["hours_left"] is None else f"{row['hours_left']:.1f}")
+            for row in rows[:args.limit]
+        ],
+        headers=["account", "token", "expires", "hours left"],
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import asyncio
+import httpx
+from loguru import logger
+
+from src.utils.config import Config, get_config
+
+PROXY_SCHEMES = ("http://", "https://", "socks5://", "socks5h://")
+
+
+def normalize_proxy(proxy: str) -> str:
+    """为代理地址补全协议前缀，未配置代理时返回空字符串"""
+    if not proxy:
+        return ""
+    if not proxy.startswith(PROXY_SCHEMES):
+        # 默认添加 http:// 前缀（向后兼容 user:pass@ip:port 格式）
+        proxy = f"http://{proxy}"
+    return proxy
+
+
+def http2_available() -> bool:
+    """检查是否安装了 HTTP/2 所需的 h2 包"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        logger.warning("HTTP2 is enabled but the 'h2' package is not installed, falling back to HTTP/1.1")
+        return False
+
+
+def mask_proxy(proxy: str) -> str:
+    """隐藏代理中的认证信息，用于日志输出"""
+    if not proxy:
+        return "None"
+    if "@" not in proxy:
+        return proxy
+    return f"{proxy.split('://')[0]}://[hidden]@{proxy.split('@')[-1]}"
+
+
+class TransportPool:
+    """
+    按代理共享的长连接 HTTP 客户端池。
+
+    同一代理下的所有账户复用同一个 httpx.AsyncClient，
+    保持 keep-alive 连接并限制并发连接数，可选启用 HTTP/2 多路复用。
+    """
+
+    def __init__(
+        self,
+        http2: bool = False,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 30.0,
+    ):
+        self.http2 = http2 and http2_available()
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(timeout)
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "TransportPool":
+        return cls(
+            http2=config.NETWORK.HTTP2,
+            max_connections=config.NETWORK.MAX_CONNECTIONS,
+            max_keepalive_connections=config.NETWORK.MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=config.NETWORK.KEEPALIVE_EXPIRY,
+            timeout=config.NETWORK.REQUEST_TIMEOUT,
+        )
+
+    def get(self, proxy: str = "") -> httpx.AsyncClient:
+        """获取指定代理对应的共享客户端，不存在时创建"""
+        proxy = normalize_proxy(proxy)
+        client = self._clients.get(proxy)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=self.limits,
+                timeout=self.timeout,
+                proxy=proxy or None,
+                verify=False,
+            )
+            self._clients[proxy] = client
+            logger.info(f"Opened pooled transport for proxy {mask_proxy(proxy)} (http2={self.http2})")
+        return client
+
+    async def close(self):
+        """关闭所有共享客户端"""
+        async with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+# Singleton pattern
+def get_transport_pool() -> TransportPool:
+    """Get transport pool singleton"""
+    if not hasattr(get_transport_pool, "_pool"):
+        get_transport_pool._pool = TransportPool.from_config(get_config())
+    return get_transport_pool._pool
+
+
+async def close_transports():
+    """关闭共享连接池（程序退出时调用）"""
+    if hasattr(get_transport_pool, "_pool"):
+        await get_transport_pool._pool.close()
+        del get_transport_pool._pool
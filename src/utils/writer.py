@@ -1,66 +1,31 @@
-import asyncio
-from openpyxl import load_workbook
 from loguru import logger
-from src.utils.constants import ACCOUNTS_FILE
-
-# Создаем глобальный асинхронный lock
-file_lock = asyncio.Lock()
+from src.utils.account_store import get_account_store
 
 
 async def update_account(token: str, field: str, value: str) -> bool:
     """
-    Безопасно обновляет поле аккаунта в XLSX файле.
+    Обновляет поле аккаунта в хранилище аккаунтов (SQLite).
+
+    Поиск по индексу токена, обновления от разных корутин объединяются
+    в одну транзакцию фоновым потоком и не блокируют event loop.
+    Для выгрузки в CSV: python -m src.utils.account_store export
 
     Args:
         token (str): GIGA токен аккаунта
-        field (str): Название поля для обновления (GIGA_TOKEN, PROXY, USERNAME, STATUS)
+        field (str): Название поля для обновления (GIGA_TOKEN, PROXY, STATUS)
         value (str): Новое значение поля
 
     Returns:
         bool: True если обновление успешно, False если аккаунт не найден
     """
-    # Маппинг названий полей к индексам колонок
-    field_mapping = {
-        "GIGA_TOKEN": 0,
-        "PROXY": 1
-    }
-
-    if field not in field_mapping:
-        logger.error(f"Invalid field name: {field}")
+    try:
+        updated = await get_account_store().update(token, field, value)
+    except Exception as e:
+        logger.error(f"Error updating account: {str(e)}")
         return False
 
-    column_index = field_mapping[field]
-
-    async with file_lock:  # Используем асинхронный контекстный менеджер
-        try:
-            # Используем loop.run_in_executor для блокирующих операций с файлом
-            loop = asyncio.get_event_loop()
-            workbook = await loop.run_in_executor(
-                None, load_workbook, ACCOUNTS_FILE
-            )
-            sheet = workbook.active
-
-            # Ищем строку с нужным токеном
-            token_found = False
-            for row_index, row in enumerate(sheet.rows, 1):
-                if row[0].value == token:
-                    # Обновляем значение в нужной ячейке
-                    sheet.cell(row=row_index, column=column_index + 1, value=value)
-                    token_found = True
-                    break
-
-            if not token_found:
-                logger.error(f"Account with token {token[:10]}... not found")
-                await loop.run_in_executor(None, workbook.close)
-                return False
-
-            # Сохраняем изменения
-            await loop.run_in_executor(None, workbook.save, ACCOUNTS_FILE)
-            await loop.run_in_executor(None, workbook.close)
-
-            logger.success(f"Successfully updated {field} for account {token[:10]}...")
-            return True
-
-        except Exception as e:
-            logger.error(f"Error updating account: {str(e)}")
-            return False
+    if not updated:
+        logger.error(f"Account with token {token[:10]}... not found")
+        return False
+    logger.success(f"Successfully updated {field} for account {token[:10]}...")
+    return True